@@ -0,0 +1,48 @@
+"""航运路线环境吞吐量基准测试: ShippingRouteEnv 逐步循环 vs VectorShippingRouteEnv
+
+用法: python -m benchmarks.bench_route_env [--envs N] [--steps K]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from config.settings import Config
+from modules.reinforcement_learning import ShippingRouteEnv, VectorShippingRouteEnv
+
+
+def random_actions(rng, n):
+    return np.column_stack([rng.uniform(0, 360, n), rng.uniform(5, 20, n)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--envs', type=int, default=4096)
+    parser.add_argument('--steps', type=int, default=1000)
+    args = parser.parse_args()
+
+    config = Config()
+    rng = np.random.default_rng(0)
+
+    env = ShippingRouteEnv(config)
+    actions = random_actions(rng, args.steps)
+    start = time.perf_counter()
+    for action in actions:
+        _, _, done, _ = env.step(action)
+        if done:
+            env.reset()
+    scalar = args.steps / (time.perf_counter() - start)
+
+    vector_env = VectorShippingRouteEnv(config, args.envs)
+    batches = [random_actions(rng, args.envs) for _ in range(min(args.steps, 200))]
+    start = time.perf_counter()
+    for batch in batches:
+        vector_env.step(batch)
+    vector = len(batches) * args.envs / (time.perf_counter() - start)
+
+    print(f"scalar={scalar:,.0f} steps/s  vector(N={args.envs})={vector:,.0f} steps/s  "
+          f"speedup={vector / scalar:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""可扩展的合成数据生成器
+
+AIS 轨迹为相关随机游走: 每艘船的航向、航速在上一时刻基础上小幅扰动,
+位置按航向航速积分并在 MAP_BOUNDS 内反射。全部计算按列向量化,
+千万行量级也能在数秒内生成; 更大规模可用 write_ais_csv 按船分块写出。
+"""
+import numpy as np
+import pandas as pd
+
+from config.settings import Config
+
+START_TIME = pd.Timestamp('2024-01-01')
+
+
+def _grouped(values, counts):
+    """组内累积和: 每组从 0 开始累加"""
+    total = np.cumsum(values)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    base = np.repeat(total[starts] - values[starts], counts)
+    return total - base
+
+
+def _reflect(values, low, high):
+    """将数值按三角波折回 [low, high]"""
+    span = high - low
+    phase = np.mod(values - low, 2 * span)
+    return low + np.where(phase > span, 2 * span - phase, phase)
+
+
+def generate_ais(num_rows, num_vessels=1000, seed=0, bounds=None, first_mmsi=412000000):
+    """生成原始AIS报文 (mmsi, timestamp, latitude, longitude), 按 MMSI、时间排序"""
+    rng = np.random.default_rng(seed)
+    lat_min, lat_max, lon_min, lon_max = bounds or Config.MAP_BOUNDS
+
+    counts = rng.multinomial(num_rows, np.full(num_vessels, 1.0 / num_vessels))
+    vessel = np.repeat(np.arange(num_vessels), counts)
+
+    # 每艘船的初始状态
+    lat0 = rng.uniform(lat_min, lat_max, num_vessels)
+    lon0 = rng.uniform(lon_min, lon_max, num_vessels)
+    heading0 = rng.uniform(0, 360, num_vessels)
+    speed0 = rng.uniform(4, 14, num_vessels)
+    start0 = rng.integers(0, 6 * 3600, num_vessels)
+
+    # 航向、航速为组内随机游走, 报文间隔 10-180 秒
+    heading = np.repeat(heading0, counts) + _grouped(rng.normal(0, 4, num_rows), counts)
+    speed = np.clip(np.repeat(speed0, counts) + _grouped(rng.normal(0, 0.2, num_rows), counts), 0, 25)
+    dt = rng.integers(10, 180, num_rows)
+    seconds = np.repeat(start0, counts) + _grouped(dt, counts)
+
+    # 位移 (海里) 积分为经纬度
+    dist = speed * dt / 3600
+    rad = np.radians(heading)
+    lat = np.repeat(lat0, counts) + _grouped(dist * np.cos(rad) / 60, counts)
+    lon = np.repeat(lon0, counts) + _grouped(
+        dist * np.sin(rad) / (60 * np.cos(np.radians(np.repeat(lat0, counts)))), counts)
+
+    return pd.DataFrame({
+        'mmsi': first_mmsi + vessel,
+        'timestamp': START_TIME + pd.to_timedelta(seconds, unit='s'),
+        'latitude': _reflect(lat, lat_min, lat_max),
+        'longitude': _reflect(lon, lon_min, lon_max)
+    })
+
+
+def write_ais_csv(path, num_rows, num_vessels=10000, vessels_per_chunk=1000, seed=0):
+    """按船分块生成并写出超大AIS文件, 内存占用与单块大小成正比"""
+    rng = np.random.default_rng(seed)
+    chunks = max(1, num_vessels // vessels_per_chunk)
+    rows = rng.multinomial(num_rows, np.full(chunks, 1.0 / chunks))
+    for k, chunk_rows in enumerate(rows):
+        df = generate_ais(int(chunk_rows), vessels_per_chunk, seed=seed + k + 1,
+                          first_mmsi=412000000 + k * vessels_per_chunk)
+        df.to_csv(path, mode='w' if k == 0 else 'a', header=k == 0, index=False)
+
+
+def generate_trajectories(num_trajectories, length=100, num_routes=None, seed=0):
+    """生成轨迹集合 {轨迹ID: {points, timestamps, directions}}
+
+    轨迹围绕 num_routes 条公共航线加噪声和时间偏移生成, 使关联聚类有真实的匹配。
+    """
+    rng = np.random.default_rng(seed)
+    num_routes = num_routes or max(1, num_trajectories // 10)
+    routes = generate_ais(num_routes * length, num_routes, seed=seed)
+    routes = routes.groupby('mmsi', sort=False)
+
+    bases = []
+    for _, group in routes:
+        if len(group) >= 2:
+            bases.append(group)
+
+    trajectories = {}
+    for i in range(num_trajectories):
+        base = bases[i % len(bases)]
+        points = base[['latitude', 'longitude']].to_numpy() + rng.normal(0, 0.01, size=(len(base), 2))
+        shift = pd.to_timedelta(int(rng.integers(0, 1800)), unit='s')
+        delta = np.diff(points, axis=0, prepend=points[:1])
+        trajectories[f"T{i}"] = {
+            'points': points,
+            'timestamps': (base['timestamp'] + shift).to_numpy(),
+            'directions': np.degrees(np.arctan2(delta[:, 1], delta[:, 0])) % 360
+        }
+    return trajectories
+
+
+def generate_maintenance_logs(num_rows, num_vessels=200, equipment_per_vessel=10, seed=0):
+    """生成维护日志 (与 DataProcessor.generate_sample_maintenance_logs 同结构)"""
+    rng = np.random.default_rng(seed)
+    vessel = rng.integers(0, num_vessels, num_rows)
+    equipment = vessel * equipment_per_vessel + rng.integers(0, equipment_per_vessel, num_rows)
+    return pd.DataFrame({
+        'timestamp': START_TIME + pd.to_timedelta(rng.integers(0, 720, num_rows), unit='h'),
+        'vessel_id': pd.Series(vessel).map("Vessel_{}".format),
+        'vessel_type': np.array(['trawler', 'longliner', 'seiner'])[vessel % 3],
+        'equipment_id': pd.Series(equipment).map("Equipment_{}".format),
+        'equipment_type': np.array(['engine', 'pump', 'winch', 'generator', 'radar'])[equipment % 5],
+        'action': rng.choice(['inspection', 'repair', 'replacement'], num_rows)
+    })
+
+
+def generate_equipment_sensors(num_rows, num_sensors=4000, seed=0):
+    """生成设备传感器读数 (与 DataProcessor.generate_sample_equipment_sensors 同结构)"""
+    rng = np.random.default_rng(seed)
+    sensor = rng.integers(0, num_sensors, num_rows)
+    return pd.DataFrame({
+        'timestamp': START_TIME + pd.to_timedelta(rng.integers(0, 3600, num_rows), unit='s'),
+        'sensor_id': pd.Series(sensor).map("Sensor_{}".format),
+        'equipment_id': pd.Series(sensor // 2).map("Equipment_{}".format),
+        'sensor_type': np.array(['temperature', 'vibration'])[sensor % 2],
+        'value': rng.normal(50, 10, num_rows)
+    })
+
+
+def generate_sensor_ticks(num_vessels, num_ticks, components=('engine', 'hull'), seed=0):
+    """生成船队部件健康指标 (vessel_sensors 长表): 日周期 + 部分船舶缓慢劣化"""
+    rng = np.random.default_rng(seed)
+    m = len(components)
+    hours = np.arange(num_ticks)
+    daily = 0.15 * np.sin(2 * np.pi * hours / 24)
+    drift = rng.uniform(0, 0.4, (num_vessels, m)) * (rng.random((num_vessels, m)) < 0.1)
+
+    values = (0.45 + daily[:, None, None] + drift[None] * hours[:, None, None] / max(num_ticks, 1)
+              + rng.normal(0, 0.03, (num_ticks, num_vessels, m)))
+    return pd.DataFrame({
+        'timestamp': np.repeat(START_TIME + pd.to_timedelta(hours, unit='h'), num_vessels * m),
+        'vessel_id': np.tile(np.repeat([f"Vessel_{v}" for v in range(num_vessels)], m), num_ticks),
+        'component': np.tile(np.array(components), num_ticks * num_vessels),
+        'value': np.clip(values, 0, 1).ravel()
+    })
@@ -0,0 +1,211 @@
+"""各模块热路径基准测试套件, 与保存的基线比较, 出现性能回退时以非零状态退出
+
+用法:
+    python -m benchmarks.suite [--scale small|medium|large] [--only 名称 ...]
+                               [--tolerance 0.3] [--update-baselines]
+
+基线保存在 benchmarks/baselines.json, 按 "用例@规模" 记录秒数;
+耗时超过基线 (1 + tolerance) 倍视为回退。基线与机器相关, 换机器后应重新生成。
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from benchmarks import generators
+from config.settings import Config
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+# 各规模下每个用例的数据量
+SCALES = {
+    "small": {
+        "preprocess_ais": 100_000, "calculate_similarity": 200, "associate_trajectories": 200,
+        "update_models": 2_000, "update_graph": 20_000, "route_env_step": 20_000,
+        "vector_env_step": 1_000_000, "predict_fleet": 1_000
+    },
+    "medium": {
+        "preprocess_ais": 1_000_000, "calculate_similarity": 1_000, "associate_trajectories": 1_000,
+        "update_models": 20_000, "update_graph": 200_000, "route_env_step": 200_000,
+        "vector_env_step": 10_000_000, "predict_fleet": 10_000
+    },
+    "large": {
+        "preprocess_ais": 10_000_000, "calculate_similarity": 5_000, "associate_trajectories": 5_000,
+        "update_models": 100_000, "update_graph": 1_000_000, "route_env_step": 1_000_000,
+        "vector_env_step": 100_000_000, "predict_fleet": 50_000
+    }
+}
+
+
+def bench_config():
+    """基准测试使用的配置: 关闭磁盘缓存与持久化, 避免测到 I/O"""
+    config = Config()
+    config.CACHE_ENABLED = False
+    config.KG_PERSIST = False
+    config.CHECKPOINT_ENABLED = False
+    return config
+
+
+def setup_preprocess_ais(config, n):
+    from modules.data_processing import DataProcessor
+    processor = DataProcessor(config)
+    raw = generators.generate_ais(n, num_vessels=max(10, n // 1000))
+    return lambda: processor.preprocess_ais(raw.copy())
+
+
+def setup_calculate_similarity(config, n):
+    from modules.trajectory_association import TrajectoryAssociator
+    associator = TrajectoryAssociator(config)
+    trajectories = list(generators.generate_trajectories(n + 1, length=100).values())
+    pairs = list(zip(trajectories[:-1], trajectories[1:]))
+    return lambda: [associator.calculate_similarity(a, b) for a, b in pairs]
+
+
+def setup_associate_trajectories(config, n):
+    from modules.trajectory_association import TrajectoryAssociator
+    associator = TrajectoryAssociator(config)
+    trajectories = generators.generate_trajectories(n, length=100)
+    return lambda: associator.associate_trajectories(trajectories)
+
+
+def setup_update_models(config, n):
+    from modules.data_processing import DataProcessor
+    from modules.incremental_mining import IncrementalMiner
+    df = DataProcessor(config).preprocess_ais(generators.generate_ais(n, num_vessels=max(5, n // 200)))
+
+    def run():
+        # 每次重新构造模型, 使各轮测量的是同样的冷启动学习过程
+        IncrementalMiner(config).update_many(df)
+    return run
+
+
+def setup_update_graph(config, n):
+    from modules.knowledge_graph import KnowledgeGraph
+    logs = generators.generate_maintenance_logs(n, num_vessels=max(20, n // 100))
+    sensors = generators.generate_equipment_sensors(n, num_sensors=max(40, n // 50))
+
+    def run():
+        graph = KnowledgeGraph(config)
+        entities, relations = graph.extract_bulk(logs, sensors)
+        graph.update_graph(entities, relations)
+    return run
+
+
+def setup_route_env_step(config, n):
+    from modules.reinforcement_learning import ShippingRouteEnv
+    env = ShippingRouteEnv(config)
+    rng = np.random.default_rng(0)
+    actions = np.column_stack([rng.uniform(0, 360, n), rng.uniform(5, 20, n)])
+
+    def run():
+        env.reset()
+        for action in actions:
+            if env.step(action)[2]:
+                env.reset()
+    return run
+
+
+def setup_vector_env_step(config, n):
+    from modules.reinforcement_learning import VectorShippingRouteEnv
+    num_envs = 10_000
+    env = VectorShippingRouteEnv(config, num_envs)
+    rng = np.random.default_rng(0)
+    actions = np.column_stack([rng.uniform(0, 360, num_envs), rng.uniform(5, 20, num_envs)])
+    steps = max(1, n // num_envs)
+
+    def run():
+        env.reset()
+        for _ in range(steps):
+            env.step(actions)
+    return run
+
+
+def setup_predict_fleet(config, n):
+    from modules.predictive_maintenance import PredictiveMaintenance
+    ticks = generators.generate_sensor_ticks(n, 48)
+
+    def run():
+        PredictiveMaintenance(config).predict_fleet(ticks)
+    return run
+
+
+CASES = {
+    "preprocess_ais": setup_preprocess_ais,
+    "calculate_similarity": setup_calculate_similarity,
+    "associate_trajectories": setup_associate_trajectories,
+    "update_models": setup_update_models,
+    "update_graph": setup_update_graph,
+    "route_env_step": setup_route_env_step,
+    "vector_env_step": setup_vector_env_step,
+    "predict_fleet": setup_predict_fleet
+}
+
+
+def measure(run, repeat):
+    """取多轮中最短的一次, 降低调度噪声"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def load_baselines():
+    try:
+        with open(BASELINE_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=list(SCALES), default='small')
+    parser.add_argument('--only', nargs='*', choices=list(CASES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--tolerance', type=float, default=0.3)
+    parser.add_argument('--update-baselines', action='store_true')
+    args = parser.parse_args()
+
+    config = bench_config()
+    baselines = load_baselines()
+    regressions = []
+
+    for name in args.only or CASES:
+        size = SCALES[args.scale][name]
+        run = CASES[name](config, size)
+        seconds = measure(run, args.repeat)
+        key = f"{name}@{args.scale}"
+
+        baseline = baselines.get(key)
+        if args.update_baselines:
+            baselines[key] = round(seconds, 6)
+            status = "baseline updated"
+        elif baseline is None:
+            status = "no baseline"
+        else:
+            ratio = seconds / baseline
+            status = f"{ratio:5.2f}x baseline"
+            if ratio > 1 + args.tolerance:
+                status += "  REGRESSION"
+                regressions.append(key)
+
+        print(f"{name:<24s} n={size:<11,d} {seconds:9.4f}s  {size / seconds:14,.0f} items/s  {status}")
+
+    if args.update_baselines:
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(dict(sorted(baselines.items())), f, indent=2)
+            f.write("\n")
+        print(f"Baselines written to {BASELINE_PATH}")
+
+    if regressions:
+        print(f"Performance regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -37,8 +37,19 @@ RESEARCH_PROFILES = {
     "routing_optimization": {
         "name": "航运强化学习优化",
         "description": "使用强化学习优化船舶航行路线",
-        "data_sources": ["vessel_tracking", "weather", "port_data"],
+        "data_sources": ["vessel_tracking", "ocean_currents", "weather", "port_data"],
         "modules": ["data_processing", "reinforcement_learning"],
         "visualization": "routing_dashboard"
     }
-}
\ No newline at end of file
+}
+
+# 模块名到实现类名的映射
+MODULE_CLASSES = {
+    "data_processing": "DataProcessor",
+    "incremental_mining": "IncrementalMiner",
+    "trajectory_association": "TrajectoryAssociator",
+    "knowledge_graph": "KnowledgeGraph",
+    "predictive_maintenance": "PredictiveMaintenance",
+    "reinforcement_learning": "RoutingOptimizer",
+    "visualization": "Visualizer"
+}
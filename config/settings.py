@@ -4,26 +4,96 @@ class Config:
     # 数据参数
     DATA_PATH = "data/"
     DEFAULT_DATA_SOURCES = ["ais", "ocean_currents"]
+    LAZY_MODULES = True  # 分析模块及其依赖在首次执行时才导入
+    SCHEDULER_WORKERS = None  # 并发执行模块的线程数, None 表示每个模块一个线程
+    AIS_CHUNK_SIZE = 500000  # 流式读取时每块行数
+
+    # 预处理数据缓存参数
+    CACHE_ENABLED = True
+    CACHE_DIR = "cache/"
+    CACHE_MAX_BYTES = 2 * 1024 ** 3  # 缓存容量上限 (字节)
 
     # 轨迹关联参数
     MAX_DISTANCE = 500  # 米
     TIME_WINDOW = 60  # 秒
     SIMILARITY_THRESHOLD = 0.7
+    TRAJECTORY_INDEX_ENABLED = True  # 使用时空候选索引筛选待比较轨迹
+    DTW_BAND_RATIO = 0.1  # Sakoe-Chiba 带宽占轨迹长度的比例
+    SIMILARITY_PARALLEL = False  # 在进程池中计算稀疏相似度图后再聚类
+    SIMILARITY_WORKERS = None  # 工作进程数, 默认为 CPU 核数
+    SIMILARITY_BLOCK_SIZE = 256  # 每个任务块包含的候选轨迹对数
+    TRAJECTORY_COORD_DTYPE = "float64"  # 轨迹存储的经纬度精度, "float32" 可再减少内存 (精度约 1 米)
 
     # 增量挖掘参数
     MIN_SUPPORT = 0.1
     WINDOW_SIZE = 1000  # 事务数
     SLIDE_SIZE = 100  # 滑动窗口大小
+    PATTERN_GRID_SIZE = 0.5  # 事件离散化网格大小 (度)
+    PATTERN_SPEED_BANDS = [0.5, 3.0, 8.0]  # 速度分档边界 (米/秒)
+    CLUSTER_PREDICT_BATCH = 1  # 聚类模型学习多少条后统一预测一次; 1 表示学一条预测一条, 更大的值更快但预测会用到块内后续记录
+
+    # 流式执行参数
+    STREAM_BATCH_SIZE = 1000  # 每批记录数
+    STREAM_QUEUE_SIZE = 8  # 阶段间队列容量 (批), 队列满时上游等待
+    STREAM_POLL_INTERVAL = 0.5  # 数据源轮询间隔 (秒)
+    STREAM_IDLE_TIMEOUT = None  # 数据源空闲超时 (秒), None 表示持续运行
+    STREAM_REPORT_INTERVAL = 10  # 运行状态输出间隔 (秒)
 
     # 异常检测参数
     ANOMALY_THRESHOLD = 3.0  # 标准差阈值
+    ANOMALY_TREE_HEIGHT = 15  # HalfSpaceTrees 树高; 取 10 时建树与学习快一个数量级, 评分排序与 15 接近但不完全相同
+    ANOMALY_LEARN_STRIDE = 1  # 每隔多少条记录学习一条 (评分仍逐条计算); 大于 1 时参考窗口覆盖的记录数随之放大
+
+    # 知识图谱持久化参数
+    KG_PERSIST = True
+    KG_STORAGE_DIR = "storage/knowledge_graph/"
+    KG_SNAPSHOT_INTERVAL = 100  # 每隔多少个版本写一次快照
+
+    # 模型检查点
+    CHECKPOINT_ENABLED = True
+    CHECKPOINT_DIR = "checkpoints/"
+    CHECKPOINT_INTERVAL = 300  # 两次检查点之间的最短间隔 (秒)
+    CHECKPOINT_KEEP = 3  # 每个模块保留的检查点文件数
+    CHECKPOINT_MMAP_MIN_BYTES = 1024 * 1024  # 不小于此大小的数组在恢复时 mmap
+
+    # 运行指标参数
+    METRICS_ENABLED = True
+    METRICS_DIR = "results/metrics/"  # JSON 运行报告与 Prometheus 指标文件目录
+    METRICS_TRACEMALLOC = False  # 记录内存分配增量 (tracemalloc 有明显开销)
+    PROFILE_MODULES = {}  # 按模块启用分析器, 如 {"incremental_mining": "cprofile", "knowledge_graph": "sample"}
+    PROFILE_SAMPLE_INTERVAL = 0.005  # 采样分析的采样间隔 (秒)
 
     # 可视化参数
     MAP_BOUNDS = [10, 50, 130, 160]  # 地图边界 [lat_min, lat_max, lon_min, lon_max]
+    VIZ_PIXEL_TOLERANCE = 0.5  # 轨迹简化允许的屏幕误差 (像素)
+    VIZ_TRACK_POINTS_BASE = 128  # 缩放级别 0 时单条轨迹的点数预算, 每级翻倍
+    VIZ_MAX_TRACK_POINTS = 20000  # 单条轨迹点数上限
+    VIZ_SERIES_POINTS = 2000  # 时间序列图的点数上限 (LTTB)
+    DENSITY_RESOLUTIONS = [1.0, 0.25, 0.05]  # 密度图层的网格分辨率 (度), 由粗到细
+    DENSITY_TILE_CELLS = 64  # 每个瓦片的边长 (网格数), 增量渲染的最小单位
+    DENSITY_MAX_LAYER_POINTS = 200000  # 单个热力图层的点数上限, 超出时不渲染该分辨率
+    DASHBOARD_REFRESH_INTERVAL = 60  # 流式运行时仪表盘的刷新间隔 (秒)
 
     # 强化学习参数
     RL_MAX_STEPS = 100
     RL_LEARNING_RATE = 0.0003
+    RL_POLICY_PATH = "storage/routing_policy.npz"
+    RL_CEM_ITERATIONS = 30  # 交叉熵方法迭代次数
+    RL_CEM_POPULATION = 512  # 每次迭代采样的候选策略数
+    RL_CEM_ELITE_FRAC = 0.1  # 精英策略比例
+    RL_WORKERS = None  # 采样进程数, None 表示 CPU 核数
+
+    # 航线规划参数
+    ROUTE_GRID_RESOLUTION = 0.25  # 代价网格分辨率 (度)
+    ROUTE_INFLUENCE_RADIUS = 1.0  # 海流/天气采样点的插值半径 (度)
+    ROUTE_VESSEL_SPEED = 12.0  # 静水航速 (节)
+    ROUTE_WEATHER_WEIGHT = 1.0  # 恶劣海况 (severity=1) 时航行时间的增加比例
+    ROUTE_CACHE_SIZE = 256  # 航线查询 LRU 缓存容量
 
     # 预测性维护参数
-    PM_WARNING_THRESHOLD = 0.8
\ No newline at end of file
+    PM_WARNING_THRESHOLD = 0.8
+    PM_ALPHA = 0.3  # Holt-Winters 水平平滑系数
+    PM_BETA = 0.1  # 趋势平滑系数
+    PM_GAMMA = 0.6  # 季节平滑系数
+    PM_SEASONALITY = 24  # 季节周期 (时刻数)
+    PM_PERIOD_STEP = 3600  # 一个时刻的长度 (秒), 季节位置由时间戳按此取整得到
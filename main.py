@@ -1,8 +1,14 @@
+import os
 import sys
 import json
+import time
+import asyncio
 import importlib
 from config.settings import Config
-from config.research_profiles import RESEARCH_PROFILES
+from config.research_profiles import RESEARCH_PROFILES, MODULE_CLASSES
+from modules.instrumentation import Instrumentation
+from modules.lazy import ImportReport, LazyModule, timed_import
+from modules.scheduler import ModuleScheduler
 
 
 class AdaptiveAnalysisPlatform:
@@ -10,6 +16,7 @@ class AdaptiveAnalysisPlatform:
 
     def __init__(self, profile_name):
         self.config = Config()
+        self.profile_name = profile_name
         self.profile = RESEARCH_PROFILES.get(profile_name)
         if not self.profile:
             raise ValueError(f"Invalid research profile: {profile_name}")
@@ -17,99 +24,334 @@ class AdaptiveAnalysisPlatform:
         self.data_sources = self.profile["data_sources"]
         self.modules = {}
         self.results = {}
+        # 原始数据与各模块输出合并后的视图, 供可视化使用
+        self.data = {}
+        self.checkpoints = None
+        self.import_report = ImportReport()
+        self.scheduler = None
+        self.instrumentation = None
+        self._last_refresh = time.monotonic()
 
         # 加载研究方向特定配置
         self.load_profile_config(profile_name)
 
+        if self.config.METRICS_ENABLED:
+            self.instrumentation = Instrumentation(self.config, profile_name)
+
         # 初始化模块
         self.initialize_modules()
 
     def load_profile_config(self, profile_name):
         """加载研究方向特定配置"""
-        try:
-            with open(f"profiles/{profile_name}.json") as f:
-                profile_config = json.load(f)
-                # 更新全局配置
-                for key, value in profile_config.items():
-                    setattr(self.config, key, value)
-        except FileNotFoundError:
+        overrides = load_profile_overrides(profile_name)
+        if overrides is None:
             print(f"No specific config found for {profile_name}, using default settings")
+            return
+        # 更新全局配置
+        for key, value in overrides.items():
+            setattr(self.config, key, value)
 
     def initialize_modules(self):
-        """动态加载所需模块"""
+        """加载所需模块 (LAZY_MODULES 时延迟到首次执行), 并从检查点恢复学习状态"""
+        if self.config.CHECKPOINT_ENABLED:
+            from modules.checkpoint import CheckpointManager
+            self.checkpoints = CheckpointManager(self.config, self.profile_name)
+
         for module_name in self.profile["modules"]:
+            if module_name == "data_processing":
+                continue
             try:
-                module = importlib.import_module(f"modules.{module_name}")
-                # 调用模块的初始化函数
-                module_class = getattr(module, module_name.capitalize())
-                self.modules[module_name] = module_class(self.config)
+                module = LazyModule(module_name, MODULE_CLASSES[module_name], self.config,
+                                    self.import_report, self.restore_module)
+                if not self.config.LAZY_MODULES:
+                    module = module.load()
+                self.modules[module_name] = module
                 print(f"Initialized module: {module_name}")
-            except (ImportError, AttributeError) as e:
+            except (ImportError, AttributeError, KeyError) as e:
                 print(f"Error initializing module {module_name}: {str(e)}")
 
+    def restore_module(self, module_name, module):
+        """模块实例创建后从检查点恢复学习状态"""
+        if self.checkpoints and self.checkpoints.restore(module_name, module):
+            print(f"Restored module state: {module_name}")
+
     def load_data(self):
         """根据配置加载数据"""
         # 初始化数据处理模块
-        from modules.data_processing import DataProcessor
-        processor = DataProcessor(self.config)
+        processor = timed_import("data_processing", self.import_report).DataProcessor(self.config)
         return processor.load_data(self.data_sources)
 
-    def process(self):
-        """执行分析流程"""
-        data = self.load_data()
+    def process(self, data=None):
+        """执行分析流程; data 为预先加载的数据源 (多研究方向批量运行时共享, 只读)"""
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            instrumentation.start_run()
+            data = dict(data) if data is not None else instrumentation.measure("data_processing", self.load_data)
+        else:
+            data = dict(data) if data is not None else self.load_data()
 
-        # 按顺序执行模块
-        for module_name in self.profile["modules"]:
-            if module_name == "data_processing":
-                # 数据处理模块已经执行过
-                continue
+        # 按读写依赖并发执行模块
+        modules = [(name, self.modules[name]) for name in self.profile["modules"]
+                   if name != "data_processing" and name in self.modules]
+        self.scheduler = ModuleScheduler(self.config, modules, instrumentation)
+        self.results = self.scheduler.run(data)
+        self.scheduler.print_report()
+
+        self.data = data
+        self.save_checkpoints()
+        self.write_metrics()
+        return self.results
 
-            print(f"Executing module: {module_name}")
-            module = self.modules.get(module_name)
-            if module:
-                try:
-                    result = module.process(data)
-                    data.update(result)
-                    self.results[module_name] = result
-                except Exception as e:
-                    print(f"Error processing module {module_name}: {str(e)}")
+    def write_metrics(self):
+        """写出本次运行的 JSON 报告与 Prometheus 指标"""
+        if self.instrumentation is None:
+            return
+        self.instrumentation.finish_run({
+            "schedule": self.scheduler.report if self.scheduler else {},
+            "imports": self.import_report.as_dict()
+        })
+        self.instrumentation.print_report()
 
+    def save_checkpoints(self):
+        """保存所有支持检查点的模块状态"""
+        if not self.checkpoints:
+            return
+        for module_name, module in self.modules.items():
+            # 从未执行过的延迟模块没有需要保存的状态
+            if isinstance(module, LazyModule):
+                if not module.loaded:
+                    continue
+                module = module.instance
+            if self.checkpoints.supports(module):
+                self.checkpoints.save(module_name, module)
+
+    def process_stream(self, source=None):
+        """流式执行分析流程, source 见 modules.streaming.open_source"""
+        from modules.streaming import StreamingRuntime, open_source
+
+        modules = [(name, self.modules[name]) for name in self.profile["modules"]
+                   if name != "data_processing" and name in self.modules]
+        runtime = StreamingRuntime(self.config, modules, self.checkpoints)
+        runtime.sink_hooks.append(self.refresh_dashboard)
+        self.results = asyncio.run(runtime.run(open_source(self.config, source)))
+        self.data = self.results
+        self.save_checkpoints()
         return self.results
 
-    def visualize(self):
-        """生成可视化结果"""
+    def get_visualizer(self):
         if "visualization" not in self.modules:
-            from modules.visualization import Visualizer
-            self.modules["visualization"] = Visualizer(self.config)
+            self.modules["visualization"] = LazyModule(
+                "visualization", MODULE_CLASSES["visualization"], self.config, self.import_report)
+        return self.modules["visualization"]
+
+    def refresh_dashboard(self, batch):
+        """流式运行时: 增量更新密度图层, 每 DASHBOARD_REFRESH_INTERVAL 秒重新生成一次仪表盘"""
+        self.get_visualizer().update_layers(batch)
+        now = time.monotonic()
+        if now - self._last_refresh >= self.config.DASHBOARD_REFRESH_INTERVAL:
+            self._last_refresh = now
+            self.save_dashboard(batch)
 
-        dashboard = self.modules["visualization"].generate_dashboard(
-            self.results,
-            self.profile["visualization"]
-        )
+    def save_dashboard(self, results):
+        dashboard = self.get_visualizer().generate_dashboard(results, self.profile["visualization"])
 
         # 保存仪表盘
+        os.makedirs("results", exist_ok=True)
         dashboard.save(f"results/{self.profile['visualization']}.html")
         print(f"Visualization saved to results/{self.profile['visualization']}.html")
 
+    def visualize(self):
+        """生成可视化结果"""
+        # 流式运行时图层已随批次增量更新
+        if not self.get_visualizer().layers:
+            self.get_visualizer().update_layers(self.data)
+        self.save_dashboard(self.data)
+
+
+def load_profile_overrides(profile_name):
+    """读取 profiles/<研究方向>.json 中的配置覆盖项, 文件不存在或无效时返回 None"""
+    try:
+        with open(f"profiles/{profile_name}.json") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def profile_config(profile_name):
+    """返回应用了研究方向覆盖项的配置"""
+    config = Config()
+    for key, value in (load_profile_overrides(profile_name) or {}).items():
+        setattr(config, key, value)
+    return config
+
+
+# 批量运行时各工作进程共享的已加载数据 (fork 后按写时复制共享内存页)
+_shared_data = {}
+
+
+def load_shared_data(profile_names):
+    """按各研究方向自身的配置加载数据源, 配置相同的数据源只加载一次
+
+    返回 {研究方向: {数据键: 数据}}; 覆盖项相同的研究方向共享同一份 DataFrame,
+    pandas 的写时复制保证任一方向的修改不会影响其他方向。
+    """
+    from modules.data_processing import DataProcessor
+    loaded = {}
+    shared = {}
+    for name in profile_names:
+        overrides = json.dumps(load_profile_overrides(name) or {}, sort_keys=True, default=str)
+        processor = None
+        shared[name] = {}
+        for source in RESEARCH_PROFILES[name]["data_sources"]:
+            key = (source, overrides)
+            if key not in loaded:
+                processor = processor or DataProcessor(profile_config(name))
+                loaded[key] = processor.load_data([source])
+            shared[name].update(loaded[key])
+    return shared
+
+
+def _run_profile(profile_name):
+    """执行单个研究方向的完整流程, 返回 (研究方向, 结果, 耗时)"""
+    start = time.perf_counter()
+    platform = AdaptiveAnalysisPlatform(profile_name)
+    results = platform.process(_shared_data.get(profile_name))
+    try:
+        platform.visualize()
+    except Exception as e:
+        print(f"Error visualizing {profile_name}: {str(e)}")
+    return profile_name, results, time.perf_counter() - start
+
+
+def _run_group(profile_names):
+    """依次执行一组共享持久化存储的研究方向"""
+    return [_run_profile(name) for name in profile_names]
+
+
+def persistent_paths(profile_name):
+    """研究方向各模块写入的持久化路径 (模块类的 PERSISTENT_PATHS 声明, 按该方向的配置解析)"""
+    config = profile_config(profile_name)
+    paths = set()
+    for module_name in RESEARCH_PROFILES[profile_name]["modules"]:
+        try:
+            module_class = getattr(importlib.import_module(f"modules.{module_name}"), MODULE_CLASSES[module_name])
+        except (ImportError, AttributeError, KeyError):
+            continue
+        for field in getattr(module_class, "PERSISTENT_PATHS", ()):
+            paths.add(os.path.abspath(getattr(config, field)))
+    return paths
+
+
+def storage_groups(profile_names):
+    """按持久化路径将研究方向分组: 共享任一路径 (如同一知识图谱日志) 的方向放在同一组依次执行
+
+    检查点已按研究方向分目录, 不参与分组。
+    """
+    groups = []
+    for name in profile_names:
+        paths = persistent_paths(name)
+        shared = [i for i, (_, group_paths) in enumerate(groups) if group_paths & paths]
+        if not shared:
+            groups.append(([name], paths))
+            continue
+        # 合并到最早的一组, 组内保持研究方向的原有顺序
+        members, merged = groups[shared[0]]
+        for i in reversed(shared[1:]):
+            members += groups[i][0]
+            merged |= groups.pop(i)[1]
+        members.append(name)
+        members.sort(key=profile_names.index)
+        merged |= paths
+    return [members for members, _ in groups]
+
+
+def run_batch(profile_names, workers=None):
+    """在一个进程池 (不支持 fork 时为线程池) 中运行多个研究方向, 数据源只加载一次
+
+    工作进程为非守护进程, 模块内部仍可创建自己的进程池 (RL_WORKERS、SIMILARITY_PARALLEL)。
+    写入同一持久化存储的研究方向在同一个任务中依次执行, 避免并发追加同一份日志。
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    import multiprocessing as mp
+
+    for name in profile_names:
+        if name not in RESEARCH_PROFILES:
+            raise ValueError(f"Invalid research profile: {name}")
+
+    start = time.perf_counter()
+    _shared_data.clear()
+    _shared_data.update(load_shared_data(profile_names))
+    loaded = time.perf_counter() - start
+
+    # 预先导入所需模块, fork 出的工作进程直接复用
+    for name in dict.fromkeys(m for p in profile_names for m in RESEARCH_PROFILES[p]["modules"]):
+        try:
+            importlib.import_module(f"modules.{name}")
+        except ImportError as e:
+            print(f"Error importing module {name}: {str(e)}")
+
+    groups = storage_groups(profile_names)
+    for group in groups:
+        if len(group) > 1:
+            print(f"[batch] sharing persistent storage, run in sequence: {' -> '.join(group)}")
+
+    workers = workers or len(groups)
+    if "fork" in mp.get_all_start_methods():
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("fork")) as pool:
+            outcomes = [outcome for group in pool.map(_run_group, groups) for outcome in group]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = [outcome for group in pool.map(_run_group, groups) for outcome in group]
+
+    sources = {id(value) for data in _shared_data.values() for value in data.values()}
+    print(f"[batch] data loaded once in {loaded:.2f}s for {len(sources)} data keys")
+    for name, _, seconds in outcomes:
+        print(f"[batch] {name}: {seconds:.2f}s")
+    print(f"[batch] total {time.perf_counter() - start:.2f}s")
+    return {name: results for name, results, _ in outcomes}
+
 
 def main():
     """主函数入口"""
     if len(sys.argv) < 2:
-        print("Usage: python main.py <profile_name>")
+        print("Usage: python main.py <profile_name> [--stream [file:<path>|tail:<path>|socket:<host>:<port>]] "
+              "[--import-report]")
+        print("       python main.py --batch <profile_name> [<profile_name> ...]")
+        print("       python main.py --train-routing")
         print("Available profiles:")
         for profile in RESEARCH_PROFILES.keys():
             print(f"  - {profile}: {RESEARCH_PROFILES[profile]['name']}")
         sys.exit(1)
 
+    if sys.argv[1] == "--batch":
+        try:
+            run_batch(sys.argv[2:])
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            sys.exit(1)
+        return
+
+    if sys.argv[1] == "--train-routing":
+        # 离线训练航线策略, 处理流程中只加载已保存的策略
+        from modules.reinforcement_learning import RoutingOptimizer
+        RoutingOptimizer(profile_config("routing_optimization")).train()
+        return
+
     profile_name = sys.argv[1]
     print(f"Starting analysis for profile: {profile_name}")
 
+    platform = None
     try:
         # 初始化平台
         platform = AdaptiveAnalysisPlatform(profile_name)
 
         # 执行分析
-        results = platform.process()
+        if "--stream" in sys.argv:
+            args = sys.argv[sys.argv.index("--stream") + 1:]
+            source = args[0] if args and not args[0].startswith("--") else None
+            results = platform.process_stream(source)
+        else:
+            results = platform.process()
         print("Analysis completed successfully")
 
         # 生成可视化
@@ -119,6 +361,10 @@ def main():
         print(f"Error: {str(e)}")
         sys.exit(1)
 
+    finally:
+        if platform is not None and "--import-report" in sys.argv:
+            platform.import_report.print_report()
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import pickle
+import struct
+import time
+
+import numpy as np
+
+# 文件格式变化时递增, 旧检查点将被忽略
+CHECKPOINT_FORMAT_VERSION = 2
+
+_MAGIC = b"AAPCKPT\0"
+# 文件头: 魔数, 格式版本, 模块状态版本, 配置指纹, pickle 长度, 外部缓冲区数量
+_HEADER = struct.Struct("<8sII8sQI")
+# 缓冲区表项: 偏移, 长度
+_ENTRY = struct.Struct("<QQ")
+# 外部缓冲区按页对齐, 便于 mmap
+_ALIGN = 4096
+
+
+def _align(offset):
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+def config_fingerprint(config, module):
+    """模块学习状态所依赖配置项的指纹 (16 个十六进制字符)
+
+    模块以 CHECKPOINT_CONFIG 列出构造模型时读取的配置项; 未声明时使用全部配置项。
+    """
+    fields = getattr(module, "CHECKPOINT_CONFIG", None)
+    if fields is None:
+        fields = [key for key in dir(config) if key.isupper()]
+    values = {key: getattr(config, key, None) for key in fields}
+    encoded = json.dumps(values, sort_keys=True, default=repr).encode()
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+class CheckpointManager:
+    """在线学习模块的检查点: 周期性保存学习状态, 启动时热恢复
+
+    模块通过 get_state() / set_state(state) 暴露状态, 并以 CHECKPOINT_VERSION
+    标记状态结构。状态用 pickle 协议 5 序列化, 大数组作为带外缓冲区按页对齐
+    写在文件末尾, 恢复时以写时复制方式 mmap, 不需要整体读入内存。
+
+    检查点按研究方向分目录保存, 文件名与文件头带有配置指纹 (见 config_fingerprint),
+    只恢复同一研究方向、相同配置下保存的状态。
+    """
+
+    def __init__(self, config, profile_name="default"):
+        self.config = config
+        self.directory = os.path.join(config.CHECKPOINT_DIR, profile_name)
+        self.interval = config.CHECKPOINT_INTERVAL
+        self.keep = config.CHECKPOINT_KEEP
+        self.mmap_min_bytes = config.CHECKPOINT_MMAP_MIN_BYTES
+        self.last_saved = {}
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def supports(module):
+        return hasattr(module, "get_state") and hasattr(module, "set_state")
+
+    def _files(self, name, fingerprint):
+        prefix = f"{name}-{fingerprint}-"
+        files = [f for f in os.listdir(self.directory) if f.startswith(prefix) and f.endswith(".ckpt")]
+        return sorted(os.path.join(self.directory, f) for f in files)
+
+    def save(self, name, module):
+        """写入一个新的检查点文件 (原子替换), 并清理多余的旧文件"""
+        buffers = []
+
+        def out_of_band(buffer):
+            # 返回假值的缓冲区写到带外区域
+            if buffer.raw().nbytes >= self.mmap_min_bytes:
+                buffers.append(buffer)
+                return False
+            return True
+
+        payload = pickle.dumps(module.get_state(), protocol=5, buffer_callback=out_of_band)
+
+        # 依次排布: 文件头, 缓冲区表, pickle 数据, 对齐后的缓冲区
+        offset = _HEADER.size + _ENTRY.size * len(buffers) + len(payload)
+        entries = []
+        for buffer in buffers:
+            offset = _align(offset)
+            entries.append((offset, buffer.raw().nbytes))
+            offset += buffer.raw().nbytes
+
+        fingerprint = config_fingerprint(self.config, module)
+        path = os.path.join(self.directory, f"{name}-{fingerprint}-{time.time_ns():020d}.ckpt")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, CHECKPOINT_FORMAT_VERSION, module.CHECKPOINT_VERSION,
+                                 bytes.fromhex(fingerprint), len(payload), len(buffers)))
+            for entry in entries:
+                f.write(_ENTRY.pack(*entry))
+            f.write(payload)
+            for (start, _), buffer in zip(entries, buffers):
+                f.seek(start)
+                f.write(buffer.raw())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        for old in self._files(name, fingerprint)[:-self.keep]:
+            os.remove(old)
+        self.last_saved[name] = time.monotonic()
+        return path
+
+    def maybe_save(self, name, module):
+        """距离上次保存超过 CHECKPOINT_INTERVAL 秒时保存检查点"""
+        if not self.supports(module):
+            return None
+        last = self.last_saved.setdefault(name, time.monotonic())
+        if time.monotonic() - last < self.interval:
+            return None
+        return self.save(name, module)
+
+    def load(self, path, state_version, fingerprint):
+        """读取检查点, 版本或配置指纹不匹配时返回 None"""
+        with open(path, 'rb') as f:
+            magic, fmt, version, saved_fingerprint, length, count = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC or fmt != CHECKPOINT_FORMAT_VERSION or version != state_version:
+                return None
+            if saved_fingerprint.hex() != fingerprint:
+                return None
+            entries = [_ENTRY.unpack(f.read(_ENTRY.size)) for _ in range(count)]
+            payload = f.read(length)
+
+        # 写时复制映射: 恢复后的数组可以原地更新, 但不会改动检查点文件
+        buffers = [np.memmap(path, dtype=np.uint8, mode='c', offset=start, shape=(size,))
+                   if size else b"" for start, size in entries]
+        return pickle.loads(payload, buffers=buffers)
+
+    def restore(self, name, module):
+        """从最新的可用检查点恢复模块状态, 成功返回 True"""
+        if not self.supports(module):
+            return False
+        fingerprint = config_fingerprint(self.config, module)
+        for path in reversed(self._files(name, fingerprint)):
+            try:
+                state = self.load(path, module.CHECKPOINT_VERSION, fingerprint)
+            except (OSError, struct.error, pickle.UnpicklingError, EOFError) as e:
+                print(f"Skipping unreadable checkpoint {path}: {str(e)}")
+                continue
+            if state is None:
+                continue
+            module.set_state(state)
+            self.last_saved[name] = time.monotonic()
+            return True
+        return False
@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+# 预处理逻辑或存储格式变化时递增, 使旧缓存失效
+CACHE_FORMAT_VERSION = 3
+
+# 字符串列中空值的类型码, 使 None / NaN / pd.NA 各自原样恢复 (0 表示非空)
+_NULLS = {1: None, 2: np.nan, 3: pd.NA}
+
+
+def _null_code(value):
+    if value is None:
+        return 1
+    if value is pd.NA:
+        return 3
+    return 2
+
+
+class DataCache:
+    """预处理数据源的列式磁盘缓存 (按输入文件内容与配置参数寻址)"""
+
+    def __init__(self, config):
+        self.config = config
+        self.cache_dir = config.CACHE_DIR
+        self.max_bytes = config.CACHE_MAX_BYTES
+
+    def make_key(self, source, paths, params=None):
+        """根据输入文件内容和相关配置参数计算缓存键"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{source}:{CACHE_FORMAT_VERSION}".encode())
+
+        for path in paths:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+
+        params = params or {}
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return f"{source}-{digest.hexdigest()}"
+
+    def load(self, key):
+        """读取缓存, 数值列通过 mmap 零拷贝加载; 未命中或条目损坏时返回 None"""
+        entry = os.path.join(self.cache_dir, key)
+        try:
+            with open(os.path.join(entry, "meta.json")) as f:
+                meta = json.load(f)
+
+            columns = {}
+            for i, (name, kind, dtype, extra) in enumerate(meta["columns"]):
+                columns[name] = self._load_values(os.path.join(entry, str(i)), kind, dtype, extra)
+
+            index = None
+            if meta["index"] is not None:
+                levels = [self._load_values(os.path.join(entry, f"index-{k}"), *level)
+                          for k, level in enumerate(meta["index"]["levels"])]
+                names = meta["index"]["names"]
+                index = (pd.MultiIndex.from_arrays(levels, names=names) if len(levels) > 1
+                         else pd.Index(levels[0], name=names[0]))
+            df = pd.DataFrame(columns, index=index, copy=False)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            if not isinstance(e, FileNotFoundError) or os.path.isdir(entry):
+                print(f"Ignoring unreadable cache entry {key}: {str(e)}")
+            return None
+
+        # 更新访问时间, 用于按 LRU 淘汰
+        os.utime(os.path.join(entry, "meta.json"))
+        return df
+
+    @staticmethod
+    def _load_values(prefix, kind, dtype, extra):
+        if kind == "num":
+            return np.load(f"{prefix}.npy", mmap_mode='r', allow_pickle=False)
+        if kind == "masked":
+            values = pd.array(np.load(f"{prefix}.npy", allow_pickle=False), dtype=dtype)
+            values[np.load(f"{prefix}.mask.npy", allow_pickle=False)] = pd.NA
+            return values
+        if kind == "cat":
+            categories = DataCache._load_values(f"{prefix}.categories", *extra["categories"])
+            return pd.Categorical.from_codes(np.load(f"{prefix}.npy", allow_pickle=False),
+                                             dtype=pd.CategoricalDtype(categories, extra["ordered"]))
+        if kind == "str":
+            values = np.load(f"{prefix}.npy", allow_pickle=False).astype(object)
+            nulls = np.load(f"{prefix}.nulls.npy", allow_pickle=False)
+            for code, null in _NULLS.items():
+                values[nulls == code] = null
+            return values if dtype == "object" else pd.array(values, dtype=dtype)
+        raise ValueError(f"unknown column kind {kind!r}")
+
+    @staticmethod
+    def _save_values(prefix, values, dtype):
+        """不经 pickle 保存一列, 返回 (类型, 附加信息); 无法表示的列抛出 ValueError
+
+        数值与时间列按原始数组保存 (可 mmap); 可空整数/浮点/布尔列保存数据与缺失掩码;
+        类别列保存编码与类别值; 字符串列保存为定长 unicode 数组与空值类型码。
+        """
+        if isinstance(dtype, pd.CategoricalDtype):
+            np.save(f"{prefix}.npy", np.asarray(values.codes), allow_pickle=False)
+            categories = values.categories
+            kind, extra = DataCache._save_values(f"{prefix}.categories", categories.array, categories.dtype)
+            return "cat", {"ordered": bool(dtype.ordered), "categories": [kind, str(categories.dtype), extra]}
+
+        if isinstance(dtype, pd.api.extensions.ExtensionDtype) and (
+                pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_float_dtype(dtype)
+                or pd.api.types.is_bool_dtype(dtype)):
+            np.save(f"{prefix}.npy", values.to_numpy(dtype=dtype.numpy_dtype, na_value=0), allow_pickle=False)
+            np.save(f"{prefix}.mask.npy", np.asarray(values.isna()), allow_pickle=False)
+            return "masked", {}
+
+        if dtype == object or isinstance(dtype, pd.StringDtype):
+            array = np.asarray(values, dtype=object)
+            missing = np.asarray(pd.isna(array))
+            if pd.api.types.infer_dtype(array[~missing], skipna=False) not in ("string", "empty"):
+                raise ValueError(f"column of dtype {dtype} holds non-string objects")
+            nulls = np.zeros(len(array), dtype=np.uint8)
+            nulls[missing] = [_null_code(value) for value in array[missing]]
+            texts = array.copy()
+            texts[missing] = ""
+            np.save(f"{prefix}.npy", texts.astype(str), allow_pickle=False)
+            np.save(f"{prefix}.nulls.npy", nulls, allow_pickle=False)
+            return "str", {}
+
+        values = np.asarray(values)
+        if isinstance(dtype, pd.api.extensions.ExtensionDtype) or values.dtype.kind not in "biufcmM":
+            raise ValueError(f"unsupported column dtype {dtype}")
+        np.save(f"{prefix}.npy", values, allow_pickle=False)
+        return "num", {}
+
+    def store(self, key, df):
+        """将 DataFrame 按列写入缓存 (含索引), 写完后再原子替换; 含无法表示的列时不缓存"""
+        entry = os.path.join(self.cache_dir, key)
+        tmp_entry = f"{entry}.tmp-{os.getpid()}"
+        os.makedirs(tmp_entry, exist_ok=True)
+
+        try:
+            columns = []
+            for i, name in enumerate(df.columns):
+                column = df[name]
+                kind, extra = self._save_values(os.path.join(tmp_entry, str(i)), column.array, column.dtype)
+                columns.append([str(name), kind, str(column.dtype), extra])
+
+            # 默认 RangeIndex 无需保存
+            index = None
+            if not df.index.equals(pd.RangeIndex(len(df))):
+                levels = []
+                for k in range(df.index.nlevels):
+                    level = df.index.get_level_values(k)
+                    kind, extra = self._save_values(os.path.join(tmp_entry, f"index-{k}"), level.array, level.dtype)
+                    levels.append([kind, str(level.dtype), extra])
+                index = {"names": list(df.index.names), "levels": levels}
+        except ValueError as e:
+            print(f"Not caching {key}: {str(e)}")
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            return False
+
+        with open(os.path.join(tmp_entry, "meta.json"), 'w') as f:
+            json.dump({"columns": columns, "index": index, "rows": len(df), "created": time.time()}, f,
+                      default=str)
+
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(tmp_entry, entry)
+        self.evict()
+        return True
+
+    def evict(self):
+        """超出容量预算时, 按最近访问时间淘汰旧条目"""
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            entry = os.path.join(self.cache_dir, name)
+            meta = os.path.join(entry, "meta.json")
+            if not os.path.isfile(meta):
+                continue
+            size = sum(os.path.getsize(os.path.join(entry, f)) for f in os.listdir(entry))
+            entries.append((os.path.getmtime(meta), size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
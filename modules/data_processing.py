@@ -1,67 +1,121 @@
+import hashlib
+import inspect
+
 import pandas as pd
-from geopy.distance import great_circle
 from config.settings import Config
 from data_models.base_model import BaseDataModel
+from modules import kinematics
+from modules.data_cache import DataCache
+from modules.trajectory_store import TrajectoryStore
 
 
 class DataProcessor:
     """数据处理模块，负责加载和预处理数据"""
 
+    # 数据源 -> 其预处理结果所依赖的配置项名, 计入缓存键, 修改后缓存自动失效
+    # (目前的预处理不读取配置; 新增依赖配置的预处理步骤时须在此登记)
+    PREPROCESS_CONFIG = {}
+
     def __init__(self, config):
         self.config = config
+        self.cache = DataCache(config) if config.CACHE_ENABLED else None
 
     def load_data(self, data_sources):
         """加载指定数据源"""
         data = {}
         for source in data_sources:
             # 根据数据源类型加载数据
-            if source == "ais":
+            if source in ("ais", "vessel_tracking"):
                 data["ais"] = self.load_ais_data()
             elif source == "ocean_currents":
                 data["currents"] = self.load_ocean_currents()
             elif source == "bio_sensors":
                 data["bio"] = self.load_bio_sensors()
+            elif source == "weather":
+                data["weather"] = self.load_weather()
+            elif source == "port_data":
+                data["ports"] = self.load_port_data()
+            elif source == "maintenance_logs":
+                data["maintenance_logs"] = self.load_table(
+                    "maintenance_logs", self.generate_sample_maintenance_logs)
+            elif source == "vessel_sensors":
+                data["vessel_sensors"] = self.load_table(
+                    "vessel_sensors", self.generate_sample_vessel_sensors)
+            elif source == "iot_sensors":
+                data["iot_sensors"] = self.load_table(
+                    "iot_sensors", self.generate_sample_iot_sensors)
+            elif source == "equipment_sensors":
+                data["equipment_sensors"] = self.load_table(
+                    "equipment_sensors", self.generate_sample_equipment_sensors)
             # 其他数据源...
+
+        # 轨迹类模块共享同一份列式轨迹存储
+        if "ais" in data:
+            data["trajectory_store"] = TrajectoryStore.from_ais(
+                data["ais"], self.config.TRAJECTORY_COORD_DTYPE)
         return data
 
     def load_ais_data(self):
         """加载AIS船舶数据"""
+        path = self.config.DATA_PATH + "sample_ais_data.csv"
         try:
-            df = pd.read_csv(self.config.DATA_PATH + "sample_ais_data.csv")
-            print(f"Loaded AIS data with {len(df)} records")
-            return self.preprocess_ais(df)
+            return self.load_cached("ais", [path], lambda: self.preprocess_ais(pd.read_csv(path)),
+                                    self.preprocess_params("ais"))
         except FileNotFoundError:
             print("AIS data file not found, generating sample data...")
             return self.generate_sample_ais()
+        except (pd.errors.ParserError, KeyError) as e:
+            print(f"AIS data file is not valid AIS CSV ({str(e).strip()}), generating sample data...")
+            return self.generate_sample_ais()
+
+    def preprocess_params(self, source):
+        """影响预处理结果的参数: 登记的配置项, 以及预处理代码 (含运动学模块) 的指纹"""
+        code = inspect.getsource(kinematics) + inspect.getsource(self.preprocess_ais)
+        return {
+            "config": {name: getattr(self.config, name) for name in self.PREPROCESS_CONFIG.get(source, ())},
+            "code": hashlib.blake2b(code.encode(), digest_size=8).hexdigest()
+        }
+
+    def load_cached(self, source, paths, loader, params=None):
+        """优先从缓存读取预处理结果, 未命中时调用 loader 并写入缓存"""
+        if self.cache is None:
+            return loader()
+
+        key = self.cache.make_key(source, paths, params)
+        df = self.cache.load(key)
+        if df is not None:
+            print(f"Loaded {source} data from cache with {len(df)} records")
+            return df
+
+        df = loader()
+        print(f"Loaded {source} data with {len(df)} records")
+        self.cache.store(key, df)
+        return df
+
+    def stream_ais_data(self, path=None, chunk_size=None):
+        """分块读取AIS数据, 逐块返回预处理结果 (输入文件需大致按时间排序)"""
+        path = path or self.config.DATA_PATH + "sample_ais_data.csv"
+        chunk_size = chunk_size or self.config.AIS_CHUNK_SIZE
 
-    def preprocess_ais(self, df):
+        # 各船最后一个定位点, 跨数据块保持速度与方向计算的连续性
+        carry = None
+        for chunk in pd.read_csv(path, chunksize=chunk_size):
+            chunk = self.preprocess_ais(chunk, carry)
+            carry = kinematics.update_carry_over(chunk, carry)
+            yield chunk
+
+    def preprocess_ais(self, df, carry=None):
         """预处理AIS数据"""
         # 转换时间戳
         df['timestamp'] = pd.to_datetime(df['timestamp'])
         df.sort_values(['mmsi', 'timestamp'], inplace=True)
 
-        # 计算速度和方向
-        df['prev_lat'] = df.groupby('mmsi')['latitude'].shift(1)
-        df['prev_lon'] = df.groupby('mmsi')['longitude'].shift(1)
-        df['prev_time'] = df.groupby('mmsi')['timestamp'].shift(1)
-
-        # 计算距离和时间差
-        df['distance'] = df.apply(
-            lambda row: great_circle((row['prev_lat'], row['prev_lon']),
-                                     (row['latitude'], row['longitude'])).meters
-            if not pd.isna(row['prev_lat']) else 0, axis=1)
-
-        df['time_diff'] = (df['timestamp'] - df['prev_time']).dt.total_seconds()
-        df['speed'] = df['distance'] / df['time_diff'].replace(0, 1)
-        df['speed'] = df['speed'].fillna(0)
+        # 计算上一定位点, 再按列计算距离、时间差、速度和方向
+        df = kinematics.add_previous_fix(df)
+        df = kinematics.apply_carry_over(df, carry)
+        df = kinematics.compute_kinematics(df)
 
-        # 计算方向
-        df['direction'] = df.apply(
-            lambda row: self.calculate_direction(row) if not pd.isna(row['prev_lat']) else 0,
-            axis=1
-        )
-
-        return df.drop(['prev_lat', 'prev_lon', 'prev_time'], axis=1)
+        return kinematics.drop_previous_fix(df)
 
     def calculate_direction(self, row):
         """计算航行方向"""
@@ -100,6 +154,78 @@ class DataProcessor:
         df = pd.DataFrame(data)
         return self.preprocess_ais(df)
 
+    def load_table(self, name, generate_sample):
+        """加载表格型数据源 (data/<name>.csv), 文件不存在时生成样本数据"""
+        path = self.config.DATA_PATH + f"{name}.csv"
+        try:
+            return self.load_cached(name, [path], lambda: pd.read_csv(path, parse_dates=['timestamp']))
+        except FileNotFoundError:
+            print(f"{name} data file not found, generating sample data...")
+            return generate_sample()
+
+    def generate_sample_maintenance_logs(self, num_rows=1000):
+        """生成样本维护日志"""
+        import numpy as np
+
+        vessel = np.random.randint(0, 20, num_rows)
+        equipment = vessel * 10 + np.random.randint(0, 10, num_rows)
+        return pd.DataFrame({
+            'timestamp': pd.Timestamp.now() - pd.to_timedelta(np.random.randint(0, 720, num_rows), unit='h'),
+            'vessel_id': [f"Vessel_{v}" for v in vessel],
+            'vessel_type': np.array(['trawler', 'longliner', 'seiner'])[vessel % 3],
+            'equipment_id': [f"Equipment_{e}" for e in equipment],
+            'equipment_type': np.array(['engine', 'pump', 'winch', 'generator', 'radar'])[equipment % 5],
+            'action': np.random.choice(['inspection', 'repair', 'replacement'], num_rows)
+        })
+
+    def generate_sample_equipment_sensors(self, num_rows=1000):
+        """生成样本设备传感器读数"""
+        import numpy as np
+
+        sensor = np.random.randint(0, 400, num_rows)
+        return pd.DataFrame({
+            'timestamp': pd.Timestamp.now() - pd.to_timedelta(np.random.randint(0, 3600, num_rows), unit='s'),
+            'sensor_id': [f"Sensor_{s}" for s in sensor],
+            'equipment_id': [f"Equipment_{s // 2}" for s in sensor],
+            'sensor_type': np.array(['temperature', 'vibration'])[sensor % 2],
+            'value': np.random.normal(50, 10, num_rows)
+        })
+
+    def generate_sample_iot_sensors(self, num_sensors=200, num_readings=5000):
+        """生成样本海洋物联网传感器读数 (浮标在固定位置附近漂移)"""
+        import numpy as np
+
+        lat_min, lat_max, lon_min, lon_max = self.config.MAP_BOUNDS
+        sensor = np.random.randint(0, num_sensors, num_readings)
+        rng = np.random.default_rng(0)
+        base_lat = rng.uniform(lat_min, lat_max, num_sensors)
+        base_lon = rng.uniform(lon_min, lon_max, num_sensors)
+        return pd.DataFrame({
+            'timestamp': pd.Timestamp.now() - pd.to_timedelta(np.random.randint(0, 3600, num_readings), unit='s'),
+            'sensor_id': [f"Buoy_{s}" for s in sensor],
+            'latitude': base_lat[sensor] + np.random.normal(0, 0.05, num_readings),
+            'longitude': base_lon[sensor] + np.random.normal(0, 0.05, num_readings),
+            'temperature': np.random.normal(18, 3, num_readings),
+            'salinity': np.random.normal(34, 0.5, num_readings)
+        })
+
+    def generate_sample_vessel_sensors(self, num_vessels=20, num_ticks=48):
+        """生成样本船舶传感器读数 (归一化的部件健康风险指标)"""
+        import numpy as np
+
+        components = ['engine', 'hull']
+        ticks = pd.date_range(pd.Timestamp.now().floor('h') - pd.Timedelta(hours=num_ticks - 1),
+                              periods=num_ticks, freq='h')
+        index = pd.MultiIndex.from_product(
+            [ticks, [f"Vessel_{i}" for i in range(num_vessels)], components],
+            names=['timestamp', 'vessel_id', 'component'])
+
+        df = index.to_frame(index=False)
+        hour = df['timestamp'].dt.hour.to_numpy()
+        df['value'] = np.clip(0.5 + 0.2 * np.sin(2 * np.pi * hour / 24)
+                              + np.random.normal(0, 0.05, len(df)), 0, 1)
+        return df
+
     def load_ocean_currents(self):
         """加载海洋流数据"""
         # 简化的实现
@@ -118,4 +244,25 @@ class DataProcessor:
                 {"id": "bio_001", "lat": 34.2, "lon": 138.7, "temp": 18.5, "salinity": 34.2},
                 {"id": "bio_002", "lat": 34.5, "lon": 139.0, "temp": 19.1, "salinity": 34.0}
             ]
-        }
\ No newline at end of file
+        }
+
+    def load_weather(self):
+        """加载海况数据 (severity 为 0-1 的风浪严重程度)"""
+        # 简化的实现
+        return {
+            "cells": [
+                {"lat": 33.0, "lon": 145.0, "severity": 0.9, "wind_speed": 18.0},
+                {"lat": 38.0, "lon": 150.0, "severity": 0.4, "wind_speed": 9.5}
+            ]
+        }
+
+    def load_port_data(self):
+        """加载港口数据"""
+        # 简化的实现
+        return {
+            "ports": [
+                {"name": "Tokyo", "lat": 35.4, "lon": 139.9},
+                {"name": "Guam", "lat": 13.4, "lon": 144.7},
+                {"name": "Kagoshima", "lat": 31.5, "lon": 130.6}
+            ]
+        }
@@ -0,0 +1,97 @@
+import numpy as np
+
+
+def bin_index(values, edges):
+    """按 np.histogram 的规则分箱: 左闭右开, 最后一箱包含右边界; 落在边界外的为 -1"""
+    index = np.searchsorted(edges, values, side='right') - 1
+    index[values == edges[-1]] = len(edges) - 2
+    index[index >= len(edges) - 1] = -1
+    return index
+
+
+class DensityLayer:
+    """覆盖 MAP_BOUNDS 的多分辨率密度网格, 支持增量更新
+
+    每个分辨率的网格划分为 DENSITY_TILE_CELLS × DENSITY_TILE_CELLS 的瓦片,
+    新数据只使其落入的瓦片失效, 渲染时仅重新生成这些瓦片的热力点。
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.lat_min, self.lat_max, self.lon_min, self.lon_max = config.MAP_BOUNDS
+        self.tile_cells = config.DENSITY_TILE_CELLS
+        self.version = 0
+
+        self.levels = []
+        for resolution in config.DENSITY_RESOLUTIONS:
+            # linspace 使首尾边界恰好等于地图边界 (arange 的累积误差会使末端越界)
+            rows = int(round((self.lat_max - self.lat_min) / resolution))
+            cols = int(round((self.lon_max - self.lon_min) / resolution))
+            lat_edges = np.linspace(self.lat_min, self.lat_max, rows + 1)
+            lon_edges = np.linspace(self.lon_min, self.lon_max, cols + 1)
+            self.levels.append({
+                "resolution": resolution,
+                "lat_edges": lat_edges,
+                "lon_edges": lon_edges,
+                "counts": np.zeros((rows, cols)),
+                "tile_cols": -(-cols // self.tile_cells),
+                "dirty": set(),
+                "tiles": {}
+            })
+
+    def update(self, lat, lon, weights=None):
+        """累加一批观测点 (超出地图范围的点被忽略), 返回受影响的瓦片数"""
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        inside = ((lat >= self.lat_min) & (lat <= self.lat_max)
+                  & (lon >= self.lon_min) & (lon <= self.lon_max))
+        if not inside.any():
+            return 0
+        lat, lon = lat[inside], lon[inside]
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)[inside]
+
+        changed = 0
+        for level in self.levels:
+            # 计数与失效瓦片使用同一组分箱, 保证落在网格边界上的点累加到哪个单元就使哪个瓦片失效
+            shape = level["counts"].shape
+            rows = bin_index(lat, level["lat_edges"])
+            cols = bin_index(lon, level["lon_edges"])
+            valid = (rows >= 0) & (cols >= 0)
+            rows, cols = rows[valid], cols[valid]
+            level["counts"] += np.bincount(
+                rows * shape[1] + cols, None if weights is None else weights[valid], minlength=shape[0] * shape[1]
+            ).reshape(shape)
+
+            tiles = np.unique((rows // self.tile_cells) * level["tile_cols"] + cols // self.tile_cells)
+            level["dirty"].update(tiles.tolist())
+            changed += len(tiles)
+
+        self.version += 1
+        return changed
+
+    def _render_tile(self, level, tile):
+        row, col = divmod(tile, level["tile_cols"])
+        size = self.tile_cells
+        counts = level["counts"][row * size:(row + 1) * size, col * size:(col + 1) * size]
+        r, c = np.nonzero(counts)
+        resolution = level["resolution"]
+        return np.column_stack([
+            self.lat_min + (row * size + r + 0.5) * resolution,
+            self.lon_min + (col * size + c + 0.5) * resolution,
+            counts[r, c]
+        ])
+
+    def heat_points(self, index):
+        """返回指定分辨率下的热力点 (k, 3): 纬度, 经度, 归一化权重"""
+        level = self.levels[index]
+        for tile in level["dirty"]:
+            level["tiles"][tile] = self._render_tile(level, tile)
+        level["dirty"].clear()
+
+        if not level["tiles"]:
+            return np.zeros((0, 3))
+        points = np.concatenate(list(level["tiles"].values()))
+        if len(points):
+            points[:, 2] /= points[:, 2].max()
+        return points
@@ -0,0 +1,99 @@
+import numpy as np
+
+# Web 墨卡托: 缩放级别 z 下整幅地图宽 256 * 2^z 像素
+TILE_SIZE = 256
+
+
+def mercator(lat, lon):
+    """经纬度投影为墨卡托坐标 (单位: 度), 使误差按屏幕像素度量"""
+    lat = np.clip(np.asarray(lat, dtype=np.float64), -85.0, 85.0)
+    y = np.degrees(np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)))
+    return np.asarray(lon, dtype=np.float64), y
+
+
+def pixel_tolerance(zoom, pixels):
+    """缩放级别下 pixels 个像素对应的墨卡托距离 (度)"""
+    return pixels * 360.0 / (TILE_SIZE * 2 ** zoom)
+
+
+def douglas_peucker(x, y, tolerance):
+    """Douglas-Peucker 折线简化, 返回保留点的索引 (升序, 含首尾点)"""
+    n = len(x)
+    if n <= 2:
+        return np.arange(n)
+
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        # 中间各点到首尾连线的距离
+        dx, dy = x[end] - x[start], y[end] - y[start]
+        px, py = x[start + 1:end] - x[start], y[start + 1:end] - y[start]
+        length = np.hypot(dx, dy)
+        if length == 0:
+            dist = np.hypot(px, py)
+        else:
+            dist = np.abs(px * dy - py * dx) / length
+
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            mid = start + 1 + i
+            keep[mid] = True
+            stack.append((start, mid))
+            stack.append((mid, end))
+    return np.flatnonzero(keep)
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets 时间序列降采样, 返回保留点的索引"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # 首尾点固定保留, 中间的点均分为 threshold - 2 个桶
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    indices = np.empty(threshold, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+
+    a = 0
+    for b in range(threshold - 2):
+        lo, hi = edges[b], edges[b + 1]
+        # 下一个桶的均值点 (最后一个桶使用末尾点)
+        if b + 2 < len(edges):
+            nlo, nhi = edges[b + 1], edges[b + 2]
+            cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+
+        # 选择与上一个保留点、下一桶均值点构成三角形面积最大的点
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        indices[b + 1] = a
+    return indices
+
+
+def track_budget(config, zoom):
+    """缩放级别对应的单条轨迹点数上限"""
+    return int(min(config.VIZ_MAX_TRACK_POINTS, config.VIZ_TRACK_POINTS_BASE * 2 ** zoom))
+
+
+def simplify_track(config, lat, lon, zoom):
+    """按缩放级别简化轨迹几何, 返回保留点的索引
+
+    先以 VIZ_PIXEL_TOLERANCE 像素为阈值做 Douglas-Peucker,
+    仍超出点数预算时逐步放宽阈值。
+    """
+    x, y = mercator(lat, lon)
+    tolerance = pixel_tolerance(zoom, config.VIZ_PIXEL_TOLERANCE)
+    budget = track_budget(config, zoom)
+
+    indices = douglas_peucker(x, y, tolerance)
+    while len(indices) > budget:
+        tolerance *= 2
+        indices = douglas_peucker(x, y, tolerance)
+    return indices
@@ -0,0 +1,153 @@
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from modules.kinematics import EARTH_RADIUS_M
+
+
+class DTWEngine:
+    """带 Sakoe-Chiba 带宽约束的大圆距离 DTW 引擎
+
+    代价矩阵按带宽一次性向量化计算, 逐行递推用前缀最小值扫描完成;
+    支持 LB_Kim / LB_Keogh 下界剪枝和逐行提前终止。
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.band_ratio = config.DTW_BAND_RATIO
+
+    @staticmethod
+    def prepare(points):
+        """将 [(lat, lon), ...] 转换为弧度数组及其余弦"""
+        rad = np.radians(np.asarray(points, dtype=np.float64).reshape(-1, 2))
+        return rad, np.cos(rad[:, 0])
+
+    def band(self, n, m):
+        """按缩放后的对角线计算每行允许的列范围 [lo, hi)
+
+        半径不小于 ceil(m / n), 保证相邻两行的带宽重叠, 长度悬殊时路径仍然连通。
+        """
+        if n == 1:
+            # 单点轨迹与对方全部点对齐
+            return np.zeros(1, dtype=np.int64), np.full(1, m, dtype=np.int64)
+        if m == 1:
+            return np.zeros(n, dtype=np.int64), np.ones(n, dtype=np.int64)
+
+        radius = max(1, int(math.ceil(self.band_ratio * max(n, m))), int(math.ceil(m / n)))
+        center = np.arange(n) * ((m - 1) / (n - 1))
+        lo = np.clip(np.floor(center).astype(np.int64) - radius, 0, m - 1)
+        hi = np.clip(np.ceil(center).astype(np.int64) + radius + 1, 1, m)
+        return lo, hi
+
+    def distance(self, points1, points2, max_distance=math.inf):
+        """计算两条轨迹的 DTW 距离 (米); 超过 max_distance 时提前终止并返回 inf"""
+        a = self.prepare(points1)
+        b = self.prepare(points2)
+        if len(a[0]) == 0 or len(b[0]) == 0:
+            return math.inf
+
+        if self.lb_kim(a, b) > max_distance:
+            return math.inf
+        lo, hi = self.band(len(a[0]), len(b[0]))
+        if math.isfinite(max_distance) and self.lb_keogh(a, b, lo, hi) > max_distance:
+            return math.inf
+        return self._dtw(a, b, lo, hi, max_distance)
+
+    def distance_many(self, points, candidates, max_distance=math.inf):
+        """一次计算一条查询轨迹与多条候选轨迹的 DTW 距离 (max_distance 可逐条指定)"""
+        a = self.prepare(points)
+        limits = np.broadcast_to(np.asarray(max_distance, dtype=np.float64), (len(candidates),))
+        result = np.full(len(candidates), math.inf)
+        if len(a[0]) == 0:
+            return result
+
+        for k, other in enumerate(candidates):
+            b = self.prepare(other)
+            limit = limits[k]
+            if len(b[0]) == 0 or self.lb_kim(a, b) > limit:
+                continue
+            lo, hi = self.band(len(a[0]), len(b[0]))
+            if math.isfinite(limit) and self.lb_keogh(a, b, lo, hi) > limit:
+                continue
+            result[k] = self._dtw(a, b, lo, hi, limit)
+        return result
+
+    @staticmethod
+    def _haversine(rad1, cos1, rad2, cos2):
+        dlat = rad2[..., 0] - rad1[..., 0]
+        dlon = rad2[..., 1] - rad1[..., 1]
+        h = np.sin(dlat / 2) ** 2 + cos1 * cos2 * np.sin(dlon / 2) ** 2
+        return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+
+    def lb_kim(self, a, b):
+        """首尾点必然对齐, 其距离之和是 DTW 的下界"""
+        first = self._haversine(a[0][0], a[1][0], b[0][0], b[1][0])
+        if len(a[0]) == 1 and len(b[0]) == 1:
+            return first
+        last = self._haversine(a[0][-1], a[1][-1], b[0][-1], b[1][-1])
+        return first + last
+
+    def lb_keogh(self, a, b, lo, hi):
+        """每个查询点至少匹配带宽内一个点, 用带宽内经纬度包络估计下界"""
+        rad_b = b[0]
+        width = int((hi - lo).max())
+        # 用边界值填充后做滑动窗口极值, 得到每行带宽内的包络
+        padded = np.concatenate([rad_b, np.repeat(rad_b[-1:], width, axis=0)])
+        windows = sliding_window_view(padded, width, axis=0)[lo]
+        mask = np.arange(width) < (hi - lo)[:, None]
+
+        lat_w = np.where(mask, windows[:, 0, :], np.nan)
+        lon_w = np.where(mask, windows[:, 1, :], np.nan)
+        lat_lo, lat_hi = np.nanmin(lat_w, axis=1), np.nanmax(lat_w, axis=1)
+        lon_lo, lon_hi = np.nanmin(lon_w, axis=1), np.nanmax(lon_w, axis=1)
+
+        lat, lon = a[0][:, 0], a[0][:, 1]
+        dlat = np.maximum(0, np.maximum(lat_lo - lat, lat - lat_hi))
+        # 经度是环形的: 带宽内各点都落在 [lon_lo, lon_hi] 内, 查询点在区间外时
+        # 取到两端环形距离中的较小值 (跨越日期变更线时可能绕到另一端更近)
+        to_lo = np.abs(lon - lon_lo)
+        to_hi = np.abs(lon - lon_hi)
+        dlon = np.minimum(np.minimum(to_lo, 2 * np.pi - to_lo), np.minimum(to_hi, 2 * np.pi - to_hi))
+        dlon = np.where((lon >= lon_lo) & (lon <= lon_hi), 0.0, dlon)
+
+        max_lat = np.maximum(np.abs(lat), np.maximum(np.abs(lat_lo), np.abs(lat_hi)))
+        lon_gap = 2 * np.arcsin(np.minimum(1.0, np.cos(max_lat) * np.sin(dlon / 2)))
+        return EARTH_RADIUS_M * np.maximum(dlat, lon_gap).sum() * (1 - 1e-9)
+
+    def _dtw(self, a, b, lo, hi, max_distance):
+        n, m = len(a[0]), len(b[0])
+
+        # 一次性计算带宽内全部单元的代价
+        lengths = hi - lo
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        rows = np.repeat(np.arange(n), lengths)
+        cols = np.arange(offsets[-1]) - np.repeat(offsets[:-1], lengths) + np.repeat(lo, lengths)
+        cost = self._haversine(a[0][rows], a[1][rows], b[0][cols], b[1][cols])
+
+        prev_lo, prev_hi, prev_row = 0, 0, None
+        for i in range(n):
+            l, h = lo[i], hi[i]
+            c = cost[offsets[i]:offsets[i + 1]]
+            csum = np.cumsum(c)
+            if i == 0:
+                # 第一行只能从左侧转移
+                row = csum
+            else:
+                # 上一行第 l-1 .. h-1 列, 带宽外为 inf
+                ext = np.full(h - l + 1, math.inf)
+                start, end = max(prev_lo, l - 1), min(prev_hi, h)
+                if start < end:
+                    ext[start - l + 1:end - l + 1] = prev_row[start - prev_lo:end - prev_lo]
+                # 来自上方和左上方的最小值
+                up = np.minimum(ext[1:], ext[:-1])
+                # D[j] = C[j] + min_{k<=j}(up[k] - C[k-1]), 前缀最小值扫描处理行内依赖
+                shifted = np.concatenate([[0.0], csum[:-1]])
+                row = csum + np.minimum.accumulate(up - shifted)
+
+            if row.min() > max_distance:
+                return math.inf
+            prev_lo, prev_hi, prev_row = l, h, row
+
+        result = float(prev_row[m - 1 - prev_lo])
+        return result if result <= max_distance else math.inf
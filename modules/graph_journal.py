@@ -0,0 +1,119 @@
+import os
+import pickle
+import struct
+import zlib
+
+from modules.graph_store import GraphStore
+
+# 日志记录头: 长度 + CRC32
+_HEADER = struct.Struct("<II")
+
+
+class GraphJournal:
+    """知识图谱持久化: 只追加的变更日志 + 周期性二进制快照
+
+    每次 update_graph 作为一个版本写入日志; 每 KG_SNAPSHOT_INTERVAL 个版本
+    写一次快照并开启新的日志段。重启时从最新快照开始重放其后的日志。
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.directory = config.KG_STORAGE_DIR
+        self.snapshot_interval = config.KG_SNAPSHOT_INTERVAL
+        os.makedirs(self.directory, exist_ok=True)
+        self.log_file = None
+
+    def _versions(self, prefix):
+        versions = []
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and name.endswith(".bin"):
+                versions.append(int(name[len(prefix):-4]))
+        return sorted(versions)
+
+    def _path(self, prefix, version):
+        return os.path.join(self.directory, f"{prefix}{version:012d}.bin")
+
+    def recover(self):
+        """截断日志中不完整的尾部记录后恢复最新状态, 返回 (GraphStore, 版本号)"""
+        for start in self._versions("log-"):
+            path = self._path("log-", start)
+            valid = 0
+            for valid, _, _ in self._scan(path):
+                pass
+            if valid < os.path.getsize(path):
+                with open(path, 'r+b') as f:
+                    f.truncate(valid)
+        return self.load_as_of(None)
+
+    @staticmethod
+    def _scan(path):
+        """逐条读取日志段, 返回 (记录结束偏移, 版本号, 操作列表)"""
+        with open(path, 'rb') as f:
+            while True:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    return
+                length, crc = _HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    return
+                record_version, ops = pickle.loads(payload)
+                yield f.tell(), record_version, ops
+
+    def load_as_of(self, version):
+        """重建指定版本 (None 表示最新) 的图谱, 返回 (GraphStore, 实际版本号)"""
+        snapshots = [v for v in self._versions("snapshot-") if version is None or v <= version]
+        store, current = GraphStore(), 0
+        if snapshots:
+            with open(self._path("snapshot-", snapshots[-1]), 'rb') as f:
+                store = pickle.load(f)
+            current = snapshots[-1]
+
+        for record_version, ops in self.read_log(after=current, upto=version):
+            store.apply(ops)
+            current = record_version
+        return store, current
+
+    def read_log(self, after=0, upto=None):
+        """按版本顺序读取日志记录 (after, upto]; 遇到不完整的尾部记录时停止"""
+        segments = self._versions("log-")
+        for i, start in enumerate(segments):
+            # 整段都早于 after 时跳过
+            if i + 1 < len(segments) and segments[i + 1] <= after:
+                continue
+            for _, record_version, ops in self._scan(self._path("log-", start)):
+                if upto is not None and record_version > upto:
+                    return
+                if record_version > after:
+                    yield record_version, ops
+
+    def append(self, version, ops, store):
+        """追加一条变更记录, 必要时写快照"""
+        if self.log_file is None:
+            self.log_file = open(self._path("log-", version - 1), 'ab')
+
+        payload = pickle.dumps((version, ops), protocol=pickle.HIGHEST_PROTOCOL)
+        self.log_file.write(_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        self.log_file.flush()
+
+        if version % self.snapshot_interval == 0:
+            self.snapshot(store, version)
+
+    def snapshot(self, store, version):
+        """写入快照并开启新的日志段"""
+        path = self._path("snapshot-", version)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(store, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+
+    def close(self):
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
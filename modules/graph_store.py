@@ -0,0 +1,314 @@
+from array import array
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+class GraphStore:
+    """带索引的内存图存储
+
+    节点ID内部化为连续整数; 每个节点维护出边/入边列表,
+    并按节点类型、关系类型分别建立索引。
+    """
+
+    def __init__(self):
+        # 节点: 外部ID <-> 内部整数ID
+        self.node_index = {}
+        self.node_keys = []
+        self.node_types = array('q')
+        self.node_props = []
+
+        # 边: 列式存储 (起点, 终点, 关系类型)
+        self.edge_index = {}
+        self.edge_src = array('q')
+        self.edge_dst = array('q')
+        self.edge_types = array('q')
+        self.edge_props = []
+
+        # 邻接表 (存放边的内部ID)
+        self.out_edges = []
+        self.in_edges = []
+
+        # 类型字典与索引
+        self.type_names = []
+        self.type_ids = {}
+        self.nodes_by_type = {}
+        self.edges_by_type = {}
+
+    def __len__(self):
+        return len(self.node_keys)
+
+    @property
+    def edge_count(self):
+        return len(self.edge_src)
+
+    def intern_type(self, name):
+        type_id = self.type_ids.get(name)
+        if type_id is None:
+            type_id = self.type_ids[name] = len(self.type_names)
+            self.type_names.append(name)
+        return type_id
+
+    def intern_node(self, key):
+        """返回节点的内部ID, 不存在时创建无类型节点"""
+        node = self.node_index.get(key)
+        if node is None:
+            node = self.node_index[key] = len(self.node_keys)
+            self.node_keys.append(key)
+            self.node_types.append(-1)
+            self.node_props.append({})
+            self.out_edges.append([])
+            self.in_edges.append([])
+        return node
+
+    def upsert_node(self, key, node_type=None, properties=None):
+        """新增或更新节点"""
+        node = self.intern_node(key)
+        if node_type is not None:
+            type_id = self.intern_type(node_type)
+            old = self.node_types[node]
+            if old != type_id:
+                if old >= 0:
+                    self.nodes_by_type[old].discard(node)
+                self.nodes_by_type.setdefault(type_id, set()).add(node)
+                self.node_types[node] = type_id
+        if properties:
+            self.node_props[node].update(properties)
+        return node
+
+    def upsert_edge(self, source, rel_type, target, properties=None):
+        """新增或更新边 (同一起点、关系类型、终点只保留一条)"""
+        src = self.intern_node(source)
+        dst = self.intern_node(target)
+        type_id = self.intern_type(rel_type)
+
+        key = (src, type_id, dst)
+        edge = self.edge_index.get(key)
+        if edge is None:
+            edge = self.edge_index[key] = len(self.edge_src)
+            self.edge_src.append(src)
+            self.edge_dst.append(dst)
+            self.edge_types.append(type_id)
+            self.edge_props.append({})
+            self.out_edges[src].append(edge)
+            self.in_edges[dst].append(edge)
+            self.edges_by_type.setdefault(type_id, []).append(edge)
+        if properties:
+            self.edge_props[edge].update(properties)
+        return edge
+
+    def intern_many(self, keys):
+        """批量内部化节点ID, 返回内部ID数组"""
+        inverse, uniques = pd.factorize(np.asarray(keys, dtype=object))
+        ids = np.fromiter((self.node_index.get(key, -1) for key in uniques),
+                          dtype=np.int64, count=len(uniques))
+
+        new = ids < 0
+        count = int(new.sum())
+        if count:
+            ids[new] = np.arange(len(self.node_keys), len(self.node_keys) + count)
+            new_keys = uniques[new].tolist()
+            self.node_index.update(zip(new_keys, ids[new].tolist()))
+            self.node_keys.extend(new_keys)
+            self.node_types.extend([-1] * count)
+            self.node_props.extend({} for _ in range(count))
+            self.out_edges.extend([] for _ in range(count))
+            self.in_edges.extend([] for _ in range(count))
+        return ids[inverse]
+
+    def bulk_upsert_nodes(self, frame):
+        """批量新增或更新节点: frame 含 id、type 列, 其余列作为属性"""
+        if len(frame) == 0:
+            return
+        frame = frame.drop_duplicates('id', keep='last')
+        nodes = self.intern_many(frame['id'].to_numpy())
+
+        type_names, type_codes = np.unique(frame['type'].astype(str).to_numpy(), return_inverse=True)
+        type_ids = np.array([self.intern_type(name) for name in type_names], dtype=np.int64)[type_codes]
+        node_types = np.frombuffer(self.node_types, dtype=np.int64)
+        old_types = node_types[nodes]
+        node_types[nodes] = type_ids
+
+        # 更新类型索引 (只处理类型发生变化的节点)
+        changed = old_types != type_ids
+        for old in np.unique(old_types[changed & (old_types >= 0)]).tolist():
+            self.nodes_by_type[old].difference_update(nodes[changed & (old_types == old)].tolist())
+        for new in np.unique(type_ids[changed]).tolist():
+            self.nodes_by_type.setdefault(new, set()).update(nodes[changed & (type_ids == new)].tolist())
+
+        columns = [c for c in frame.columns if c not in ('id', 'type')]
+        if columns:
+            props = self.node_props
+            for node, record in zip(nodes.tolist(), frame[columns].to_dict('records')):
+                props[node].update(record)
+
+    def bulk_upsert_edges(self, frame):
+        """批量新增或更新边: frame 含 source、type、target 列, 其余列作为属性
+
+        与逐条 upsert_edge 等价: 重复边只保留一条, 按首次出现的顺序创建, 属性以最后一行为准。
+        """
+        if len(frame) == 0:
+            return
+        src = self.intern_many(frame['source'].to_numpy())
+        dst = self.intern_many(frame['target'].to_numpy())
+        type_names, type_codes = np.unique(frame['type'].astype(str).to_numpy(), return_inverse=True)
+        types = np.array([self.intern_type(name) for name in type_names], dtype=np.int64)[type_codes]
+
+        triples, first, inverse = np.unique(np.column_stack([src, types, dst]), axis=0,
+                                            return_index=True, return_inverse=True)
+        last = np.full(len(triples), -1)
+        np.maximum.at(last, inverse.ravel(), np.arange(len(frame)))
+        order = np.argsort(first, kind='stable')
+        keys = list(map(tuple, triples[order].tolist()))
+        edges = [self.edge_index.get(key, -1) for key in keys]
+
+        new = [key for key, edge in zip(keys, edges) if edge < 0]
+        if new:
+            first_edge = len(self.edge_src)
+            self.edge_index.update(zip(new, range(first_edge, first_edge + len(new))))
+            new_src, new_types, new_dst = (list(col) for col in zip(*new))
+            self.edge_src.extend(new_src)
+            self.edge_types.extend(new_types)
+            self.edge_dst.extend(new_dst)
+            self.edge_props.extend({} for _ in range(len(new)))
+            for edge, (s, t, d) in enumerate(new, start=first_edge):
+                self.out_edges[s].append(edge)
+                self.in_edges[d].append(edge)
+                self.edges_by_type.setdefault(t, []).append(edge)
+
+        columns = [c for c in frame.columns if c not in ('source', 'type', 'target')]
+        if columns:
+            edges = [self.edge_index[key] for key in keys]
+            props = self.edge_props
+            for edge, record in zip(edges, frame[columns].iloc[last[order]].to_dict('records')):
+                props[edge].update(record)
+
+    def apply(self, ops):
+        """应用一组变更操作
+
+        ("N", id, type, props) / ("E", source, type, target, props) 为单条操作,
+        ("NF", DataFrame) / ("EF", DataFrame) 为批量操作。
+        """
+        for op in ops:
+            if op[0] == "N":
+                self.upsert_node(op[1], op[2], op[3])
+            elif op[0] == "E":
+                self.upsert_edge(op[1], op[2], op[3], op[4])
+            elif op[0] == "NF":
+                self.bulk_upsert_nodes(op[1])
+            else:
+                self.bulk_upsert_edges(op[1])
+
+    def node(self, key):
+        """按外部ID返回节点信息"""
+        node = self.node_index.get(key)
+        if node is None:
+            return None
+        type_id = self.node_types[node]
+        return {
+            "id": key,
+            "type": self.type_names[type_id] if type_id >= 0 else None,
+            "properties": self.node_props[node]
+        }
+
+    def nodes_of_type(self, node_type):
+        """返回指定类型的全部节点外部ID"""
+        type_id = self.type_ids.get(node_type)
+        if type_id is None:
+            return []
+        return [self.node_keys[node] for node in self.nodes_by_type.get(type_id, ())]
+
+    def edges_of_type(self, rel_type):
+        """返回指定关系类型的全部边 (起点, 终点)"""
+        type_id = self.type_ids.get(rel_type)
+        if type_id is None:
+            return []
+        return [(self.node_keys[self.edge_src[e]], self.node_keys[self.edge_dst[e]])
+                for e in self.edges_by_type.get(type_id, ())]
+
+    def _step(self, node, direction, type_ids):
+        """遍历一个节点的相邻节点"""
+        if direction in ("out", "both"):
+            for edge in self.out_edges[node]:
+                if type_ids is None or self.edge_types[edge] in type_ids:
+                    yield self.edge_dst[edge]
+        if direction in ("in", "both"):
+            for edge in self.in_edges[node]:
+                if type_ids is None or self.edge_types[edge] in type_ids:
+                    yield self.edge_src[edge]
+
+    def _type_filter(self, rel_types):
+        if rel_types is None:
+            return None
+        return {self.type_ids[t] for t in rel_types if t in self.type_ids}
+
+    def neighbors(self, key, direction="out", rel_types=None):
+        """返回直接相邻节点的外部ID"""
+        node = self.node_index.get(key)
+        if node is None:
+            return []
+        type_ids = self._type_filter(rel_types)
+        return [self.node_keys[n] for n in dict.fromkeys(self._step(node, direction, type_ids))]
+
+    def k_hop(self, key, k, direction="out", rel_types=None):
+        """广度优先返回 k 跳以内的节点 {外部ID: 跳数} (不含起点)"""
+        start = self.node_index.get(key)
+        if start is None:
+            return {}
+        type_ids = self._type_filter(rel_types)
+
+        depth = {start: 0}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            if depth[node] >= k:
+                continue
+            for other in self._step(node, direction, type_ids):
+                if other not in depth:
+                    depth[other] = depth[node] + 1
+                    queue.append(other)
+
+        del depth[start]
+        return {self.node_keys[node]: d for node, d in depth.items()}
+
+    def typed_paths(self, key, rel_types, direction="out", node_type=None):
+        """沿给定关系类型序列展开路径, 返回路径列表 [[起点, ..., 终点], ...]
+
+        node_type 可限定终点类型。
+        """
+        start = self.node_index.get(key)
+        if start is None:
+            return []
+
+        paths = [[start]]
+        for rel_type in rel_types:
+            type_ids = self._type_filter([rel_type])
+            if not type_ids:
+                return []
+            paths = [path + [other] for path in paths
+                     for other in self._step(path[-1], direction, type_ids)]
+            if not paths:
+                return []
+
+        if node_type is not None:
+            type_id = self.type_ids.get(node_type)
+            paths = [path for path in paths if self.node_types[path[-1]] == type_id]
+        return [[self.node_keys[node] for node in path] for path in paths]
+
+    def to_dict(self):
+        """导出为 {"entities": ..., "relationships": ...} 格式"""
+        entities = {}
+        for node, key in enumerate(self.node_keys):
+            if self.node_types[node] >= 0 or self.node_props[node]:
+                entities[key] = self.node(key)
+
+        relationships = {}
+        for edge in range(self.edge_count):
+            source = self.node_keys[self.edge_src[edge]]
+            target = self.node_keys[self.edge_dst[edge]]
+            rel_type = self.type_names[self.edge_types[edge]]
+            relationships[f"{source}-{rel_type}-{target}"] = {
+                "source": source, "target": target, "type": rel_type, **self.edge_props[edge]
+            }
+        return {"entities": entities, "relationships": relationships}
@@ -1,15 +1,121 @@
-from river import cluster, anomaly, preprocessing, compose
+from river import cluster, anomaly
 import numpy as np
+import pandas as pd
+from pandas.api.indexers import BaseIndexer
+from modules.pattern_mining import SlidingWindowPatternMiner
+from modules.trajectory_store import group_rows
+
+
+class GroupWindowIndexer(BaseIndexer):
+    """按组截断的尾随窗口: 第 i 行的窗口为 [max(i - window_size + 1, 组起点), i]"""
+
+    def get_window_bounds(self, num_values=0, min_periods=None, center=None, closed=None, step=None):
+        end = np.arange(1, num_values + 1, dtype=np.int64)
+        return np.maximum(end - self.window_size, self.group_starts), end
+
+
+class FeatureAggregator:
+    """批量特征提取: 增量 Min-Max 缩放 + 按 MMSI 滑动窗口聚合
+
+    与逐条处理的结果一致: 每条记录只使用它之前 (含自身) 的数据。
+    """
+
+    COLUMNS = ['speed', 'direction', 'distance']
+    AGGREGATIONS = {
+        'speed': ['mean', 'std', 'max'],
+        'direction': ['mean', 'std'],
+        'distance': ['sum']
+    }
+
+    def __init__(self, window_size=100):
+        self.window_size = window_size
+        self.mins = np.full(len(self.COLUMNS), np.inf)
+        self.maxs = np.full(len(self.COLUMNS), -np.inf)
+        # 各船最近 window_size - 1 条已缩放记录, 跨批次延续滑动窗口
+        self.tail = pd.DataFrame(columns=['mmsi'] + self.COLUMNS)
+
+    @property
+    def feature_names(self):
+        return [f"{col}_{how}" for col, hows in self.AGGREGATIONS.items() for how in hows]
+
+    def scale_many(self, values):
+        """按累计最小/最大值缩放, 并更新缩放器状态"""
+        mins = np.minimum.accumulate(np.vstack([self.mins, values]), axis=0)[1:]
+        maxs = np.maximum.accumulate(np.vstack([self.maxs, values]), axis=0)[1:]
+        self.mins, self.maxs = mins[-1], maxs[-1]
+
+        span = maxs - mins
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scaled = np.where(span > 0, (values - mins) / span, 0.0)
+        return scaled
+
+    def transform_many(self, df, store=None):
+        """返回 (len(df), n_features) 的特征矩阵
+
+        store 为同一批数据构建的 TrajectoryStore 时直接复用其按 MMSI 的分组。
+        上一批保留的各船窗口尾部与本批记录按船合并为连续分段, 再用按组截断的
+        窗口一次完成滚动聚合, 无需 groupby 与结果重排。
+        """
+        values = df[self.COLUMNS].to_numpy(dtype=np.float64)
+        scaled = self.scale_many(values)
+
+        ids, offsets, order = ((store.ids, store.offsets, store.order) if store is not None
+                               else group_rows(df['mmsi'].to_numpy()))
+        batch_mmsi = np.repeat(np.asarray(ids, dtype=object), np.diff(offsets))
+        batch = scaled if order is None else scaled[order]
+
+        # 各船: 上一批的窗口尾部在前, 本批记录在后
+        num_tail = len(self.tail)
+        mmsi = np.concatenate([self.tail['mmsi'].to_numpy(dtype=object), batch_mmsi])
+        combined = np.vstack([self.tail[self.COLUMNS].to_numpy(dtype=np.float64), batch])
+        _, group_offsets, perm = group_rows(mmsi)
+        if perm is None:
+            perm = np.arange(len(mmsi))
+        else:
+            mmsi, combined = mmsi[perm], combined[perm]
+
+        lengths = np.diff(group_offsets)
+        group_starts = np.repeat(group_offsets[:-1], lengths)
+        group_ends = np.repeat(group_offsets[1:], lengths)
+
+        indexer = GroupWindowIndexer(window_size=self.window_size, group_starts=group_starts)
+        aggregated = pd.DataFrame(combined, columns=self.COLUMNS).rolling(
+            indexer, min_periods=1).agg(self.AGGREGATIONS).to_numpy(dtype=np.float64)
+
+        # 本批记录的结果写回源数据行序
+        is_new = perm >= num_tail
+        rows = perm[is_new] - num_tail
+        features = np.empty((len(df), aggregated.shape[1]))
+        features[rows if order is None else order[rows]] = aggregated[is_new]
+
+        keep = group_ends - np.arange(len(mmsi)) <= self.window_size - 1
+        tail = pd.DataFrame(combined[keep], columns=self.COLUMNS)
+        tail.insert(0, 'mmsi', mmsi[keep])
+        self.tail = tail
+        return features
 
 
 class IncrementalMiner:
     """增量数据挖掘模块"""
 
+    # 读取 / 写入的数据键
+    READS = ("ais", "trajectory_store")
+    WRITES = ("cluster_ids", "anomaly_scores", "anomalies", "frequent_patterns")
+
+    # 检查点中状态结构的版本
+    CHECKPOINT_VERSION = 1
+    # 学习状态依赖的配置项, 变化后不从旧检查点恢复
+    CHECKPOINT_CONFIG = ("MAX_DISTANCE", "ANOMALY_TREE_HEIGHT", "WINDOW_SIZE", "SLIDE_SIZE", "MIN_SUPPORT",
+                         "PATTERN_GRID_SIZE", "PATTERN_SPEED_BANDS")
+
     def __init__(self, config):
         self.config = config
         self.cluster_model = None
         self.anomaly_model = None
         self.feature_pipeline = None
+        self.pattern_miner = None
+        # 已处理的记录数, 决定异常检测模型按步长学习的位置
+        self.rows_seen = 0
         self.initialize_models()
 
     def initialize_models(self):
@@ -25,43 +131,95 @@ class IncrementalMiner:
         # 增量异常检测模型 (HalfSpaceTrees)
         self.anomaly_model = anomaly.HalfSpaceTrees(
             n_trees=10,
-            height=15,
+            height=self.config.ANOMALY_TREE_HEIGHT,
             window_size=100,
             seed=42
         )
 
-        # 特征提取流水线
-        self.feature_pipeline = compose.Pipeline(
-            preprocessing.MinMaxScaler(),
-            feature_extraction.Agg(
-                by=['mmsi'],
-                how={
-                    'speed': ['mean', 'std', 'max'],
-                    'direction': ['mean', 'std'],
-                    'distance': ['sum']
-                },
-                window_size=100
-            )
-        )
+        # 特征提取 (缩放 + 按 MMSI 滑动窗口聚合)
+        self.feature_pipeline = FeatureAggregator(window_size=100)
+
+        # 滑动窗口频繁模式挖掘
+        self.pattern_miner = SlidingWindowPatternMiner(self.config)
+
+    def get_state(self):
+        """导出学习状态 (用于检查点)"""
+        miner = self.pattern_miner
+        return {
+            "cluster_model": self.cluster_model,
+            "anomaly_model": self.anomaly_model,
+            "feature_pipeline": self.feature_pipeline,
+            "rows_seen": self.rows_seen,
+            "pattern_miner": {
+                "tree": miner.tree, "window": miner.window,
+                "pending": miner.pending, "slides": miner.slides
+            }
+        }
+
+    def set_state(self, state):
+        """从检查点恢复学习状态"""
+        self.cluster_model = state["cluster_model"]
+        self.anomaly_model = state["anomaly_model"]
+        self.feature_pipeline = state["feature_pipeline"]
+        self.rows_seen = state.get("rows_seen", 0)
+        for key, value in state["pattern_miner"].items():
+            setattr(self.pattern_miner, key, value)
 
     def update_models(self, data_point):
         """使用新数据点更新模型"""
-        # 提取特征
-        features = self.feature_pipeline.transform_one(data_point)
+        clusters, scores = self.update_many(pd.DataFrame([data_point]))
+        return clusters[0], scores[0]
+
+    def update_many(self, df, store=None):
+        """使用一批预处理后的AIS数据更新模型, 返回聚类编号与异常分数数组
+
+        store 为同一批数据构建的 TrajectoryStore (可选), 特征提取复用其分组。
+        """
+        if len(df) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
 
-        if features:
-            # 转换为适合模型输入的格式
-            feature_vector = np.array(list(features.values()))
+        # 离散事件进入频繁模式挖掘窗口
+        self.pattern_miner.add_events(df)
 
-            # 更新聚类模型
-            self.cluster_model.learn_one(feature_vector)
+        # 批量提取特征
+        features = np.nan_to_num(self.feature_pipeline.transform_many(df, store))
+        names = self.feature_pipeline.feature_names
 
-            # 更新异常检测模型
-            score = self.anomaly_model.score_one(feature_vector)
-            self.anomaly_model.learn_one(feature_vector)
+        # 聚类与异常检测模型只支持逐条学习, 在紧凑循环中依次更新:
+        # 每条记录都计算异常分数, 但异常检测模型每 ANOMALY_LEARN_STRIDE 条才学习一条;
+        # 聚类模型逐条学习, 每学完 CLUSTER_PREDICT_BATCH 条再统一预测, 使宏观簇只重建一次
+        stride = self.config.ANOMALY_LEARN_STRIDE
+        batch = self.config.CLUSTER_PREDICT_BATCH
+        clusters = np.empty(len(features), dtype=np.int64)
+        scores = np.empty(len(features))
+        cluster_model, anomaly_model = self.cluster_model, self.anomaly_model
+        rows = [dict(zip(names, row)) for row in features.tolist()]
+        for start in range(0, len(rows), batch):
+            block = rows[start:start + batch]
+            for i, x in enumerate(block, start):
+                scores[i] = anomaly_model.score_one(x)
+                if (self.rows_seen + i) % stride == 0:
+                    anomaly_model.learn_one(x)
+                cluster_model.learn_one(x)
+            for i, x in enumerate(block, start):
+                clusters[i] = cluster_model.predict_one(x)
 
-            return self.cluster_model.predict_one(feature_vector), score
-        return None, None
+        self.rows_seen += len(rows)
+        return clusters, scores
+
+    def process(self, data):
+        """处理一批AIS数据并返回增量挖掘结果"""
+        df = data.get('ais')
+        if df is None or len(df) == 0:
+            return {}
+
+        clusters, scores = self.update_many(df, data.get('trajectory_store'))
+        return {
+            "cluster_ids": clusters,
+            "anomaly_scores": scores,
+            "anomalies": int(np.count_nonzero(self.detect_anomaly(scores))),
+            "frequent_patterns": self.get_frequent_patterns(max_length=3)
+        }
 
     def detect_anomaly(self, score):
         """检测异常点"""
@@ -71,14 +229,18 @@ class IncrementalMiner:
         """获取当前聚类结果"""
         return self.cluster_model.clusters
 
+    def get_frequent_patterns(self, max_length=None):
+        """获取当前滑动窗口内的频繁事件模式"""
+        return self.pattern_miner.frequent_itemsets(max_length)
+
     def get_common_routes(self):
         """提取常见航线模式"""
         # 简化的实现 - 实际应从聚类中提取模式
         common_routes = {}
         for cluster_id, cluster_info in self.cluster_model.clusters.items():
             common_routes[cluster_id] = {
-                'avg_speed': cluster_info.center[0],
-                'avg_direction': cluster_info.center[1],
-                'size': cluster_info.n
+                'avg_speed': cluster_info.center.get('speed_mean'),
+                'avg_direction': cluster_info.center.get('direction_mean'),
+                'size': cluster_info.weight
             }
         return common_routes
\ No newline at end of file
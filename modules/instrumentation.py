@@ -0,0 +1,236 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Mapping
+
+
+def count_records(value):
+    """估计一个数据项包含的记录数: DataFrame/Series/数组按行, TrajectoryStore 按轨迹点, 其他为 0
+
+    映射 (模块输入/输出) 取各值中最大的记录数, 即主表的行数,
+    避免同一批记录的多列输出 (如 cluster_ids 与 anomaly_scores) 被重复计数。
+    字典、列表等其他容器的长度与记录数无关 (如知识图谱的变更摘要), 不计入。
+    pandas/numpy 只在已被导入时才参与判断 (未导入时不可能出现其对象), 避免拖慢启动。
+    """
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    np = sys.modules.get("numpy")
+    if np is not None and isinstance(value, np.ndarray):
+        return len(value) if value.ndim else 0
+    store = sys.modules.get("modules.trajectory_store")
+    if store is not None and isinstance(value, store.TrajectoryStore):
+        return len(value.times)
+    if isinstance(value, Mapping):
+        return max((count_records(v) for v in value.values()), default=0)
+    return 0
+
+
+def peak_rss_bytes():
+    """进程峰值常驻内存; 无 resource 模块的平台 (Windows) 使用 psutil, 均不可用时为 0"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return 0
+        memory = psutil.Process().memory_info()
+        return getattr(memory, "peak_wset", memory.rss)
+    # Linux 上 ru_maxrss 单位为 KB, macOS 上为字节
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class SamplingProfiler:
+    """采样分析: 后台线程按固定间隔记录目标线程的调用栈"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.leaf = Counter()
+        self.inclusive = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            seen = set()
+            leaf = True
+            while frame is not None:
+                code = frame.f_code
+                key = f"{code.co_filename}:{code.co_firstlineno}({code.co_name})"
+                if leaf:
+                    self.leaf[key] += 1
+                    leaf = False
+                if key not in seen:
+                    self.inclusive[key] += 1
+                    seen.add(key)
+                frame = frame.f_back
+
+    def summary(self, limit=15):
+        return {
+            "samples": self.samples,
+            "interval_seconds": self.interval,
+            "top_self": self.leaf.most_common(limit),
+            "top_inclusive": self.inclusive.most_common(limit)
+        }
+
+
+class Instrumentation:
+    """按阶段记录墙钟/CPU时间、峰值内存、分配增量、输入输出记录数,
+    导出 JSON 运行报告与 Prometheus 文本格式指标
+
+    PROFILE_MODULES 中列出的模块额外启用 cProfile 或采样分析。
+    模块并发执行时, 峰值内存与 tracemalloc 分配量是进程级的, 只能近似归属到阶段;
+    CPU 时间为执行线程的 thread_time, 不含模块在进程池中完成的工作。
+    """
+
+    def __init__(self, config, profile_name):
+        self.config = config
+        self.profile_name = profile_name
+        self.directory = config.METRICS_DIR
+        self.stages = {}
+        self.profiles = {}
+        self.run_start = None
+        self.run_wall = 0.0
+        self._lock = threading.Lock()
+
+    def start_run(self):
+        self.stages = {}
+        self.profiles = {}
+        self.run_start = time.perf_counter()
+        if self.config.METRICS_TRACEMALLOC and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def measure(self, name, func, inputs=None):
+        """执行 func(inputs) 并记录该阶段的指标, 返回 func 的结果"""
+        mode = self.config.PROFILE_MODULES.get(name)
+        profiler = sampler = None
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+        elif mode == "sample":
+            sampler = SamplingProfiler(threading.get_ident(), self.config.PROFILE_SAMPLE_INTERVAL)
+
+        tracing = tracemalloc.is_tracing()
+        alloc_before = tracemalloc.get_traced_memory()[0] if tracing else 0
+        rss_before = peak_rss_bytes()
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+
+        if profiler is not None:
+            profiler.enable()
+        if sampler is not None:
+            sampler.start()
+        try:
+            result = func(inputs) if inputs is not None else func()
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            if sampler is not None:
+                sampler.stop()
+
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            alloc_current, alloc_peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+
+        records_in = count_records(inputs) if inputs is not None else 0
+        records_out = count_records(result) if result is not None else 0
+        stage = {
+            "wall_seconds": wall,
+            "cpu_seconds": cpu,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "peak_rss_growth_bytes": peak_rss_bytes() - rss_before,
+            "alloc_delta_bytes": alloc_current - alloc_before,
+            "alloc_peak_bytes": alloc_peak,
+            "records_in": records_in,
+            "records_out": records_out,
+            # 无输入的阶段 (如数据加载) 按产出记录数计算吞吐
+            "throughput_records_per_second": (records_in or records_out) / wall if wall > 0 else 0.0
+        }
+        with self._lock:
+            self.stages[name] = stage
+            if profiler is not None:
+                self.profiles[name] = self._save_cprofile(name, profiler)
+            if sampler is not None:
+                self.profiles[name] = sampler.summary()
+        return result
+
+    def _save_cprofile(self, name, profiler):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{self.profile_name}-{name}.prof")
+        profiler.dump_stats(path)
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(15)
+        return {"stats_file": path, "top_cumulative": text.getvalue()}
+
+    def finish_run(self, extra=None):
+        """结束本次运行并写出报告, 返回报告内容"""
+        self.run_wall = time.perf_counter() - self.run_start if self.run_start else 0.0
+        report = {
+            "profile": self.profile_name,
+            "finished_at": time.time(),
+            "wall_seconds": self.run_wall,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "stages": self.stages,
+            "profiles": self.profiles,
+            **(extra or {})
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f"run_report_{self.profile_name}.json"), 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        self.write_prometheus()
+        return report
+
+    def write_prometheus(self):
+        """写出 Prometheus 文本格式 (供 node exporter textfile collector 采集), 原子替换"""
+        metrics = [
+            ("wall_seconds", "gauge", "Stage wall-clock time in seconds"),
+            ("cpu_seconds", "gauge", "Stage CPU time of the executing thread in seconds, excluding worker processes"),
+            ("peak_rss_bytes", "gauge", "Process peak resident set size after the stage"),
+            ("alloc_delta_bytes", "gauge", "Net traced allocations during the stage (tracemalloc)"),
+            ("records_in", "gauge", "Records passed into the stage"),
+            ("records_out", "gauge", "Records produced by the stage"),
+            ("throughput_records_per_second", "gauge", "Input records processed per second")
+        ]
+        lines = []
+        for metric, kind, help_text in metrics:
+            name = f"aap_stage_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for stage, values in sorted(self.stages.items()):
+                lines.append(f'{name}{{profile="{self.profile_name}",stage="{stage}"}} {float(values[metric])!r}')
+        lines.append("# HELP aap_run_wall_seconds Whole run wall-clock time in seconds")
+        lines.append("# TYPE aap_run_wall_seconds gauge")
+        lines.append(f'aap_run_wall_seconds{{profile="{self.profile_name}"}} {self.run_wall!r}')
+
+        path = os.path.join(self.directory, f"metrics_{self.profile_name}.prom")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+    def print_report(self):
+        for name, stage in self.stages.items():
+            print(f"[metrics] {name}: wall={stage['wall_seconds']:.3f}s cpu={stage['cpu_seconds']:.3f}s "
+                  f"rss={stage['peak_rss_bytes'] / 2 ** 20:.0f}MiB "
+                  f"records={stage['records_in']}->{stage['records_out']} "
+                  f"({stage['throughput_records_per_second']:,.0f}/s)")
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+
+# 与 geopy.distance.great_circle 使用相同的地球半径, 保证结果一致
+EARTH_RADIUS_M = 6371009.0
+
+
+def haversine_distance(lat1, lon1, lat2, lon2):
+    """按列计算两组经纬度之间的大圆距离 (米)"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=np.float64))
+                              for a in (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def heading(lat1, lon1, lat2, lon2):
+    """按列计算航行方向 (度), 与 DataProcessor.calculate_direction 规则一致"""
+    lat_diff = np.asarray(lat2, dtype=np.float64) - np.asarray(lat1, dtype=np.float64)
+    lon_diff = np.asarray(lon2, dtype=np.float64) - np.asarray(lon1, dtype=np.float64)
+
+    with np.errstate(invalid='ignore'):
+        angle = np.degrees(np.arctan2(lon_diff, lat_diff)) % 360
+
+    # 纬度差过小时按正东/正西处理
+    flat = np.abs(lat_diff) < 1e-6
+    angle[flat] = np.where(lon_diff[flat] > 0, 90.0, 270.0)
+    return angle
+
+
+def compute_kinematics(df):
+    """根据 prev_lat/prev_lon/prev_time 列计算距离、时间差、速度和方向"""
+    lat = df['latitude'].to_numpy(dtype=np.float64)
+    lon = df['longitude'].to_numpy(dtype=np.float64)
+    prev_lat = df['prev_lat'].to_numpy(dtype=np.float64)
+    prev_lon = df['prev_lon'].to_numpy(dtype=np.float64)
+    has_prev = ~np.isnan(prev_lat)
+
+    distance = np.zeros(len(df))
+    distance[has_prev] = haversine_distance(prev_lat[has_prev], prev_lon[has_prev],
+                                            lat[has_prev], lon[has_prev])
+
+    direction = np.zeros(len(df))
+    direction[has_prev] = heading(prev_lat[has_prev], prev_lon[has_prev],
+                                  lat[has_prev], lon[has_prev])
+
+    time_diff = (df['timestamp'] - df['prev_time']).dt.total_seconds().to_numpy()
+    speed = distance / np.where(time_diff == 0, 1, time_diff)
+
+    df['distance'] = distance
+    df['time_diff'] = time_diff
+    df['speed'] = np.nan_to_num(speed, nan=0.0)
+    df['direction'] = direction
+    return df
+
+
+def add_previous_fix(df):
+    """按 MMSI 计算上一个定位点 (要求 df 已按 mmsi、timestamp 排序)"""
+    grouped = df.groupby('mmsi', sort=False)
+    df['prev_lat'] = grouped['latitude'].shift(1)
+    df['prev_lon'] = grouped['longitude'].shift(1)
+    df['prev_time'] = grouped['timestamp'].shift(1)
+    return df
+
+
+def apply_carry_over(df, carry):
+    """用上一数据块中各船最后一个定位点填充本块每艘船首个点的 prev_* 列"""
+    if carry is None or carry.empty:
+        return df
+
+    first = ~df['mmsi'].duplicated()
+    prev = carry.reindex(df.loc[first, 'mmsi'])
+    df.loc[first, 'prev_lat'] = prev['latitude'].to_numpy()
+    df.loc[first, 'prev_lon'] = prev['longitude'].to_numpy()
+    df.loc[first, 'prev_time'] = prev['timestamp'].to_numpy()
+    return df
+
+
+def update_carry_over(df, carry):
+    """记录各船最后一个定位点, 供下一数据块使用 (大小只与船队规模有关)"""
+    last = (df.drop_duplicates('mmsi', keep='last')
+              .set_index('mmsi')[['latitude', 'longitude', 'timestamp']])
+    if carry is None or carry.empty:
+        return last
+    return pd.concat([carry[~carry.index.isin(last.index)], last])
+
+
+def drop_previous_fix(df):
+    """删除中间列 prev_lat/prev_lon/prev_time"""
+    return df.drop(['prev_lat', 'prev_lon', 'prev_time'], axis=1)
+
+
+def legacy_kinematics(df):
+    """逐行计算 (原实现), 用于基准测试与结果校验"""
+    from geopy.distance import great_circle
+    from modules.data_processing import DataProcessor
+
+    df['distance'] = df.apply(
+        lambda row: great_circle((row['prev_lat'], row['prev_lon']),
+                                 (row['latitude'], row['longitude'])).meters
+        if not pd.isna(row['prev_lat']) else 0, axis=1)
+
+    df['time_diff'] = (df['timestamp'] - df['prev_time']).dt.total_seconds()
+    df['speed'] = df['distance'] / df['time_diff'].replace(0, 1)
+    df['speed'] = df['speed'].fillna(0)
+
+    df['direction'] = df.apply(
+        lambda row: DataProcessor.calculate_direction(None, row)
+        if not pd.isna(row['prev_lat']) else 0,
+        axis=1
+    )
+    return df
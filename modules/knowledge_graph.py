@@ -1,31 +1,103 @@
+import pandas as pd
+from modules.graph_journal import GraphJournal
+from modules.graph_store import GraphStore
+
+
 class KnowledgeGraph:
     """知识图谱构建与演化模块"""
 
+    # 读取 / 写入的数据键
+    READS = ("vessel", "equipment", "maintenance_logs", "equipment_sensors")
+    WRITES = ("knowledge_graph_delta", "changes")
+
+    # 检查点中状态结构的版本
+    CHECKPOINT_VERSION = 1
+    # 学习状态依赖的配置项, 变化后不从旧检查点恢复
+    CHECKPOINT_CONFIG = ()
+
+    # 写入的持久化路径 (配置项名), 批量运行时共享这些路径的研究方向依次执行
+    PERSISTENT_PATHS = ("KG_STORAGE_DIR",)
+
     def __init__(self, config):
         self.config = config
-        self.graph = {
-            "entities": {},
-            "relationships": {}
-        }
+        self.store = GraphStore()
+        self.version = 0
+        self.journal = None
+
+        # 从最新快照和日志尾部恢复
+        if config.KG_PERSIST:
+            self.journal = GraphJournal(config)
+            self.store, self.version = self.journal.recover()
+
+    @property
+    def graph(self):
+        """以 {"entities": ..., "relationships": ...} 形式导出整个图谱"""
+        return self.store.to_dict()
+
+    def get_state(self):
+        """导出图谱状态 (用于检查点)"""
+        return {"store": self.store, "version": self.version}
+
+    def set_state(self, state):
+        """从检查点恢复图谱; 已从持久化日志恢复到更新版本时保持不变"""
+        if state["version"] > self.version:
+            self.store = state["store"]
+            self.version = state["version"]
 
     def update_graph(self, entities, relations):
-        """增量更新知识图谱"""
+        """增量更新知识图谱, 每次调用产生一个新版本
+
+        entities / relations 中的元素可以是单个字典, 也可以是批量的 DataFrame。
+        """
+        ops = []
         # 合并新实体
         for entity in entities:
+            if isinstance(entity, pd.DataFrame):
+                ops.append(("NF", entity))
+                continue
             entity_id = entity.get('id')
             if entity_id:
                 # 更新或添加实体
-                if entity_id in self.graph["entities"]:
-                    self.graph["entities"][entity_id].update(entity)
-                else:
-                    self.graph["entities"][entity_id] = entity
+                ops.append(("N", entity_id, entity.get('type'), entity.get('properties')))
 
         # 添加新关系
         for relation in relations:
-            rel_id = f"{relation['source']}-{relation['type']}-{relation['target']}"
-            self.graph["relationships"][rel_id] = relation
+            if isinstance(relation, pd.DataFrame):
+                ops.append(("EF", relation))
+                continue
+            properties = {k: v for k, v in relation.items() if k not in ('source', 'type', 'target')}
+            ops.append(("E", relation['source'], relation['type'], relation['target'], properties))
+
+        if ops:
+            self.store.apply(ops)
+            self.version += 1
+            if self.journal is not None:
+                self.journal.append(self.version, ops, self.store)
+
+        return self.store
+
+    def as_of(self, version):
+        """查询历史版本的图谱 (需要启用持久化)"""
+        if self.journal is None:
+            raise ValueError("Knowledge graph history requires KG_PERSIST")
+        store, _ = self.journal.load_as_of(version)
+        return store
 
-        return self.graph
+    def neighbors(self, entity_id, direction="out", rel_types=None):
+        """查询实体的直接相邻实体"""
+        return self.store.neighbors(entity_id, direction, rel_types)
+
+    def k_hop(self, entity_id, k, direction="both", rel_types=None):
+        """查询 k 跳以内的实体"""
+        return self.store.k_hop(entity_id, k, direction, rel_types)
+
+    def find_paths(self, entity_id, rel_types, direction="out", node_type=None):
+        """按关系类型序列查询路径, 例如 ["has_equipment", "has_component"]"""
+        return self.store.typed_paths(entity_id, rel_types, direction, node_type)
+
+    def entities_of_type(self, entity_type):
+        """查询指定类型的全部实体"""
+        return self.store.nodes_of_type(entity_type)
 
     def extract_entities(self, data):
         """从数据中提取实体"""
@@ -64,17 +136,78 @@ class KnowledgeGraph:
 
         return relations
 
+    def extract_bulk(self, maintenance_logs=None, equipment_sensors=None):
+        """从维护日志和设备传感器表中批量提取实体与关系 (按列去重, 不逐行处理)"""
+        entities, relations = [], []
+
+        if maintenance_logs is not None and len(maintenance_logs):
+            logs = maintenance_logs
+            vessels = logs.drop_duplicates('vessel_id', keep='last')
+            entities.append(pd.DataFrame({
+                "id": vessels['vessel_id'].to_numpy(),
+                "type": "Vessel",
+                "vessel_type": vessels['vessel_type'].to_numpy() if 'vessel_type' in logs else None,
+                "status": "active"
+            }))
+
+            how = {"maintenance_count": ('equipment_id', 'size')}
+            if 'equipment_type' in logs:
+                how["equipment_type"] = ('equipment_type', 'last')
+            if 'timestamp' in logs:
+                how["last_maintenance"] = ('timestamp', 'max')
+            equipment = logs.groupby('equipment_id', sort=False).agg(**how).reset_index()
+            entities.append(equipment.rename(columns={'equipment_id': 'id'}).assign(type="Equipment"))
+
+            pairs = logs[['vessel_id', 'equipment_id']].drop_duplicates()
+            relations.append(pd.DataFrame({
+                "source": pairs['vessel_id'].to_numpy(),
+                "target": pairs['equipment_id'].to_numpy(),
+                "type": "has_equipment"
+            }))
+
+        if equipment_sensors is not None and len(equipment_sensors):
+            readings = equipment_sensors
+            if 'timestamp' in readings:
+                readings = readings.sort_values('timestamp', kind='stable')
+            how = {"reading_count": ('sensor_id', 'size')}
+            if 'sensor_type' in readings:
+                how["sensor_type"] = ('sensor_type', 'last')
+            if 'value' in readings:
+                how["last_value"] = ('value', 'last')
+            sensors = readings.groupby('sensor_id', sort=False).agg(**how).reset_index()
+            entities.append(sensors.rename(columns={'sensor_id': 'id'}).assign(type="Sensor"))
+
+            pairs = readings[['equipment_id', 'sensor_id']].drop_duplicates()
+            relations.append(pd.DataFrame({
+                "source": pairs['equipment_id'].to_numpy(),
+                "target": pairs['sensor_id'].to_numpy(),
+                "type": "has_sensor"
+            }))
+
+        return entities, relations
+
     def process(self, data):
         """处理数据并更新知识图谱"""
         entities = self.extract_entities(data)
         relations = self.extract_relations(data)
 
-        self.graph = self.update_graph(entities, relations)
+        # 维护日志、设备传感器表走批量提取
+        bulk_entities, bulk_relations = self.extract_bulk(
+            data.get('maintenance_logs'), data.get('equipment_sensors'))
+        entities += bulk_entities
+        relations += bulk_relations
+
+        self.update_graph(entities, relations)
 
+        # 只返回本次变更
         return {
-            "knowledge_graph": self.graph,
+            "knowledge_graph_delta": {
+                "version": self.version,
+                "entities": entities,
+                "relations": relations
+            },
             "changes": {
-                "entities_added": len(entities),
-                "relations_added": len(relations)
+                "entities_added": sum(len(e) if isinstance(e, pd.DataFrame) else 1 for e in entities),
+                "relations_added": sum(len(r) if isinstance(r, pd.DataFrame) else 1 for r in relations)
             }
-        }
\ No newline at end of file
+        }
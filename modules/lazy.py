@@ -0,0 +1,156 @@
+import ast
+import functools
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+
+
+class ImportReport:
+    """记录各模块的导入与初始化耗时, 以及导入时新加载的第三方依赖"""
+
+    def __init__(self):
+        self.entries = {}
+
+    def record(self, name, import_seconds, init_seconds, new_packages):
+        self.entries[name] = {
+            "import_seconds": round(import_seconds, 4),
+            "init_seconds": round(init_seconds, 4),
+            "dependencies": sorted(new_packages)
+        }
+
+    def as_dict(self):
+        return dict(self.entries)
+
+    def print_report(self):
+        if not self.entries:
+            print("[import] no modules loaded")
+            return
+        for name, entry in sorted(self.entries.items(), key=lambda item: -item[1]["import_seconds"]):
+            deps = ", ".join(entry["dependencies"]) or "-"
+            print(f"[import] {name}: import={entry['import_seconds']:.3f}s "
+                  f"init={entry['init_seconds']:.3f}s deps={deps}")
+
+
+# 只统计第三方依赖
+_IGNORED_PACKAGES = set(sys.stdlib_module_names) | {"modules", "config", "data_models"}
+
+
+def _top_level_packages():
+    return {name.partition('.')[0] for name in sys.modules}
+
+
+def _third_party(packages):
+    return {name for name in packages if name not in _IGNORED_PACKAGES and not name.startswith('_')}
+
+
+def timed_import(name, report=None):
+    """导入 modules.<name> 并记录到导入报告"""
+    before = _top_level_packages()
+    start = time.perf_counter()
+    module = importlib.import_module(f"modules.{name}")
+    if report is not None and name not in report.entries:
+        new = _third_party(_top_level_packages() - before)
+        report.record(name, time.perf_counter() - start, 0.0, new)
+    return module
+
+
+# 调度器构建依赖图时需要的类属性
+DECLARED_ATTRIBUTES = ("READS", "WRITES")
+
+
+@functools.lru_cache(maxsize=None)
+def class_declarations(name, class_name):
+    """不导入模块, 从 modules/<name>.py 源码中读取类的 READS / WRITES 字面量
+
+    返回 {属性名: 值}, 类未声明的属性不出现; 找不到类定义或声明不是字面量时返回 None。
+    """
+    spec = importlib.util.find_spec(f"modules.{name}")
+    if spec is None or not spec.origin:
+        return None
+    try:
+        with open(spec.origin, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), spec.origin)
+    except (OSError, SyntaxError):
+        return None
+
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == class_name:
+            # 有基类时声明可能继承而来, 源码中看不到
+            if node.bases:
+                return None
+            declared = {}
+            for statement in node.body:
+                if (isinstance(statement, ast.Assign) and len(statement.targets) == 1
+                        and isinstance(statement.targets[0], ast.Name)
+                        and statement.targets[0].id in DECLARED_ATTRIBUTES):
+                    try:
+                        declared[statement.targets[0].id] = ast.literal_eval(statement.value)
+                    except ValueError:
+                        return None
+            return declared
+    return None
+
+
+class LazyModule:
+    """延迟加载的分析模块代理
+
+    首次调用 process (或访问其他属性) 时才导入 modules.<name> 及其依赖并构造实例,
+    加载完成后调用 on_load(name, instance) (例如从检查点恢复)。
+    READS / WRITES 从源码读取, 调度器构建依赖图时不会触发加载。
+    """
+
+    def __init__(self, name, class_name, config, report=None, on_load=None):
+        self.name = name
+        self.class_name = class_name
+        self.config = config
+        self.report = report
+        self.on_load = on_load
+        self.instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self.instance is not None
+
+    def load(self):
+        """导入并构造模块实例 (线程安全, 只执行一次)"""
+        if self.instance is not None:
+            return self.instance
+        with self._lock:
+            if self.instance is None:
+                module = timed_import(self.name, self.report)
+                imported = time.perf_counter()
+                instance = getattr(module, self.class_name)(self.config)
+                if self.report is not None:
+                    self.report.entries[self.name]["init_seconds"] = round(time.perf_counter() - imported, 4)
+                if self.on_load is not None:
+                    self.on_load(self.name, instance)
+                self.instance = instance
+        return self.instance
+
+    @property
+    def READS(self):
+        return self._declaration("READS")
+
+    @property
+    def WRITES(self):
+        return self._declaration("WRITES")
+
+    def _declaration(self, attr):
+        if self.instance is not None:
+            return getattr(self.instance, attr, None)
+        declared = class_declarations(self.name, self.class_name)
+        if declared is None:
+            return getattr(self.load(), attr, None)
+        return declared.get(attr)
+
+    def process(self, data):
+        return self.load().process(data)
+
+    def __getattr__(self, attr):
+        # 仅在常规属性查找失败时调用, 转发给真实实例
+        if attr.startswith('_') or attr == 'instance':
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
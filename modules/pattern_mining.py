@@ -0,0 +1,155 @@
+import math
+from collections import Counter, deque
+
+import numpy as np
+
+HEADINGS = ['N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW']
+
+
+def discretize_events(df, grid_size, speed_bands):
+    """将AIS记录离散为事务: 网格单元、速度档、航向档"""
+    rows = np.floor(df['latitude'].to_numpy() / grid_size).astype(np.int64)
+    cols = np.floor(df['longitude'].to_numpy() / grid_size).astype(np.int64)
+    speed = np.digitize(df['speed'].to_numpy(), speed_bands)
+    heading = np.floor((df['direction'].to_numpy() % 360 + 22.5) / 45).astype(np.int64) % 8
+
+    return [
+        (f"cell:{r}_{c}", f"speed:{s}", f"heading:{HEADINGS[h]}")
+        for r, c, s, h in zip(rows.tolist(), cols.tolist(), speed.tolist(), heading.tolist())
+    ]
+
+
+class CanTreeNode:
+    __slots__ = ('item', 'count', 'parent', 'children')
+
+    def __init__(self, item, parent):
+        self.item = item
+        self.count = 0
+        self.parent = parent
+        self.children = {}
+
+
+class CanTree:
+    """CanTree: 按固定规范顺序 (字典序) 插入事务的前缀树, 支持增删事务"""
+
+    def __init__(self):
+        self.root = CanTreeNode(None, None)
+        self.item_counts = Counter()
+
+    def insert(self, items):
+        node = self.root
+        for item in sorted(items):
+            child = node.children.get(item)
+            if child is None:
+                child = node.children[item] = CanTreeNode(item, node)
+            child.count += 1
+            node = child
+        self.item_counts.update(items)
+
+    def remove(self, items):
+        node = self.root
+        for item in sorted(items):
+            child = node.children[item]
+            child.count -= 1
+            if child.count == 0:
+                # 计数为零的子树整体剪除
+                del node.children[item]
+                break
+            node = child
+        self.item_counts.subtract(items)
+        for item in items:
+            if self.item_counts[item] <= 0:
+                del self.item_counts[item]
+
+    def paths(self):
+        """返回压缩后的事务多重集 [(有序项, 计数), ...]"""
+        result = []
+        stack = [(self.root, ())]
+        while stack:
+            node, prefix = stack.pop()
+            path = prefix + (node.item,) if node.item is not None else prefix
+            ending = node.count - sum(child.count for child in node.children.values())
+            if path and ending > 0:
+                result.append((path, ending))
+            stack.extend((child, path) for child in node.children.values())
+        return result
+
+
+class SlidingWindowPatternMiner:
+    """基于 CanTree 的滑动窗口频繁项集挖掘
+
+    事务进出窗口时只更新其路径上的计数, 每次滑动的代价与 SLIDE_SIZE 成正比。
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.window_size = config.WINDOW_SIZE
+        self.slide_size = config.SLIDE_SIZE
+        self.min_support = config.MIN_SUPPORT
+
+        self.tree = CanTree()
+        self.window = deque()
+        self.pending = []
+        self.slides = 0
+
+    def add_events(self, df):
+        """离散化一批AIS记录并加入窗口"""
+        return self.add_transactions(discretize_events(
+            df, self.config.PATTERN_GRID_SIZE, self.config.PATTERN_SPEED_BANDS))
+
+    def add_transactions(self, transactions):
+        """缓存事务, 每满 SLIDE_SIZE 条滑动一次窗口; 返回本次发生的滑动次数"""
+        slides = 0
+        for transaction in transactions:
+            self.pending.append(transaction)
+            if len(self.pending) >= self.slide_size:
+                self.slide(self.pending)
+                self.pending = []
+                slides += 1
+        return slides
+
+    def slide(self, transactions):
+        """新事务进入窗口, 最旧的事务移出窗口"""
+        for transaction in transactions:
+            self.tree.insert(transaction)
+            self.window.append(transaction)
+        while len(self.window) > self.window_size:
+            self.tree.remove(self.window.popleft())
+        self.slides += 1
+
+    def min_count(self):
+        return max(1, math.ceil(self.min_support * len(self.window)))
+
+    def frequent_items(self):
+        """当前窗口内的频繁单项"""
+        min_count = self.min_count()
+        return {item: count for item, count in self.tree.item_counts.items() if count >= min_count}
+
+    def frequent_itemsets(self, max_length=None):
+        """从 CanTree 中挖掘当前窗口的频繁项集 {项集: 支持度}"""
+        if not self.window:
+            return {}
+        min_count = self.min_count()
+        result = {}
+        self._mine(self.tree.paths(), (), min_count, max_length, result)
+        total = len(self.window)
+        return {itemset: count / total for itemset, count in result.items()}
+
+    def _mine(self, patterns, suffix, min_count, max_length, result):
+        counts = Counter()
+        for path, count in patterns:
+            for item in path:
+                counts[item] += count
+
+        for item, count in counts.items():
+            if count < min_count:
+                continue
+            itemset = tuple(sorted(suffix + (item,)))
+            result[itemset] = count
+            if max_length is not None and len(itemset) >= max_length:
+                continue
+            # 条件模式基: 路径中位于该项之前的前缀
+            conditional = [(path[:path.index(item)], c) for path, c in patterns
+                           if item in path and path[0] != item]
+            if conditional:
+                self._mine(conditional, suffix + (item,), min_count, max_length, result)
@@ -1,14 +1,166 @@
 from river import compose, linear_model, preprocessing, optim, metrics
 from river import time_series
+import numpy as np
+import pandas as pd
+
+
+class FleetHoltWinters:
+    """船队级加法 Holt-Winters 预测
+
+    N 艘船 × M 个部件的水平、趋势、季节状态保存在连续的 NumPy 数组中,
+    每个时刻的全部传感器读数在一次向量化计算中完成更新。
+    时刻编号由时间戳按 PM_PERIOD_STEP 秒取整得到, 季节位置为编号对 PM_SEASONALITY 取模,
+    缺失或重复的时刻不会使季节错位; 相隔多个时刻时按多步预测外推趋势。
+    """
+
+    def __init__(self, config, components=("engine", "hull")):
+        self.config = config
+        self.alpha = config.PM_ALPHA
+        self.beta = config.PM_BETA
+        self.gamma = config.PM_GAMMA
+        self.seasonality = config.PM_SEASONALITY
+        self.period_step = config.PM_PERIOD_STEP
+
+        self.components = list(components)
+        self.component_index = {c: j for j, c in enumerate(self.components)}
+        self.vessels = []
+        self.vessel_index = {}
+
+        m = len(self.components)
+        self.level = np.zeros((0, m))
+        self.trend = np.zeros((0, m))
+        self.season = np.zeros((0, m, self.seasonality))
+        self.initialized = np.zeros((0, m), dtype=bool)
+        # 各位置当前是否处于告警状态, 只在状态变化时产生告警
+        self.alerting = np.zeros((0, m), dtype=bool)
+        # 最近一次更新的时刻编号
+        self.tick = None
+
+    def add_vessels(self, vessel_ids):
+        """登记新船舶, 按需扩展状态数组"""
+        new = [v for v in dict.fromkeys(vessel_ids) if v not in self.vessel_index]
+        if not new:
+            return
+        for v in new:
+            self.vessel_index[v] = len(self.vessels)
+            self.vessels.append(v)
+
+        n, m = len(new), len(self.components)
+        self.level = np.concatenate([self.level, np.zeros((n, m))])
+        self.trend = np.concatenate([self.trend, np.zeros((n, m))])
+        self.season = np.concatenate([self.season, np.zeros((n, m, self.seasonality))])
+        self.initialized = np.concatenate([self.initialized, np.zeros((n, m), dtype=bool)])
+        self.alerting = np.concatenate([self.alerting, np.zeros((n, m), dtype=bool)])
+
+    def get_state(self):
+        return {
+            "components": self.components, "vessels": self.vessels,
+            "level": self.level, "trend": self.trend, "season": self.season,
+            "initialized": self.initialized, "alerting": self.alerting, "tick": self.tick
+        }
+
+    def set_state(self, state):
+        self.components = state["components"]
+        self.component_index = {c: j for j, c in enumerate(self.components)}
+        self.vessels = state["vessels"]
+        self.vessel_index = {v: i for i, v in enumerate(self.vessels)}
+        self.level = state["level"]
+        self.trend = state["trend"]
+        self.season = state["season"]
+        self.initialized = state["initialized"]
+        self.alerting = state["alerting"]
+        self.tick = state["tick"]
+
+    def tick_of(self, timestamp):
+        """时间戳对应的时刻编号"""
+        return int(pd.Timestamp(timestamp).value // 1_000_000_000 // self.period_step)
+
+    def forecast(self, tick=None):
+        """预测指定时刻 (默认下一时刻) 的读数, 形状 (N, M); 未初始化的位置为 NaN"""
+        if tick is None:
+            tick = 0 if self.tick is None else self.tick + 1
+        horizon = 1 if self.tick is None else max(tick - self.tick, 0)
+        pred = self.level + horizon * self.trend + self.season[:, :, tick % self.seasonality]
+        return np.where(self.initialized, pred, np.nan)
+
+    def update(self, values, tick=None):
+        """用时刻 tick (默认下一时刻) 的读数 (N, M) 更新状态, 缺失读数为 NaN; 返回更新前的预测"""
+        if tick is None:
+            tick = 0 if self.tick is None else self.tick + 1
+        pred = self.forecast(tick)
+        horizon = 1 if self.tick is None else max(tick - self.tick, 0)
+        observed = ~np.isnan(values)
+        s = tick % self.seasonality
+
+        # 首次观测直接作为水平初值
+        first = observed & ~self.initialized
+        self.level[first] = values[first]
+        self.initialized |= first
+
+        update = observed & ~first
+        season = self.season[:, :, s]
+        y = np.where(update, values, 0.0)
+        level = self.alpha * (y - season) + (1 - self.alpha) * (self.level + horizon * self.trend)
+        trend = self.beta * (level - self.level) / max(horizon, 1) + (1 - self.beta) * self.trend
+        new_season = self.gamma * (y - level) + (1 - self.gamma) * season
+
+        self.level = np.where(update, level, self.level)
+        self.trend = np.where(update, trend, self.trend)
+        self.season[:, :, s] = np.where(update, new_season, season)
+
+        self.tick = tick if self.tick is None else max(self.tick, tick)
+        return pred
+
+    def update_frame(self, tick, timestamp=None):
+        """用一个时刻的长表读数 (vessel_id, component, value) 更新状态"""
+        self.add_vessels(tick['vessel_id'].tolist())
+        rows = tick['vessel_id'].map(self.vessel_index).to_numpy()
+        cols = tick['component'].map(self.component_index).to_numpy()
+        known = ~pd.isna(cols)
+
+        values = np.full(self.level.shape, np.nan)
+        values[rows[known], cols[known].astype(np.int64)] = tick['value'].to_numpy()[known]
+        return self.update(values, None if timestamp is None else self.tick_of(timestamp))
+
+    def warnings(self, pred, threshold):
+        """向量化阈值检查, 只为新进入告警状态的位置返回告警; 预测回落到阈值以下后解除"""
+        observed = ~np.isnan(pred)
+        active = np.where(observed, pred > threshold, self.alerting)
+        rows, cols = np.nonzero(active & ~self.alerting)
+        self.alerting = active
+        return [
+            {"vessel": self.vessels[i], "component": self.components[j], "risk": float(pred[i, j])}
+            for i, j in zip(rows.tolist(), cols.tolist())
+        ]
 
 
 class PredictiveMaintenance:
     """预测性维护模块"""
 
+    # 读取 / 写入的数据键
+    READS = ("vessel_sensors", "engine_temp", "hull_stress")
+    WRITES = ("predictions", "warnings")
+
+    # 检查点中状态结构的版本
+    CHECKPOINT_VERSION = 2
+    # 学习状态依赖的配置项, 变化后不从旧检查点恢复
+    CHECKPOINT_CONFIG = ("PM_ALPHA", "PM_BETA", "PM_GAMMA", "PM_SEASONALITY", "PM_PERIOD_STEP")
+
     def __init__(self, config):
         self.config = config
         self.models = self.initialize_models()
         self.metric = metrics.MAE()
+        self.fleet = FleetHoltWinters(config)
+
+    def get_state(self):
+        """导出学习状态 (用于检查点)"""
+        return {"models": self.models, "metric": self.metric, "fleet": self.fleet.get_state()}
+
+    def set_state(self, state):
+        """从检查点恢复学习状态"""
+        self.models = state["models"]
+        self.metric = state["metric"]
+        self.fleet.set_state(state["fleet"])
 
     def initialize_models(self):
         """初始化预测模型"""
@@ -63,12 +215,35 @@ class PredictiveMaintenance:
             "warnings": warnings
         }
 
+    def predict_fleet(self, sensor_frame):
+        """按时刻批量更新全船队模型, 返回下一时刻的预测和新产生的告警"""
+        warnings = []
+        pred = None
+        for timestamp, tick in sensor_frame.groupby('timestamp', sort=True):
+            pred = self.fleet.update_frame(tick, timestamp)
+            for warning in self.fleet.warnings(pred, self.config.PM_WARNING_THRESHOLD):
+                warning["timestamp"] = timestamp
+                warnings.append(warning)
+
+        next_pred = self.fleet.forecast()
+        return {
+            "predictions": {
+                component: dict(zip(self.fleet.vessels, next_pred[:, j].tolist()))
+                for j, component in enumerate(self.fleet.components)
+            },
+            "warnings": warnings
+        }
+
     def process(self, data):
         """处理传感器数据"""
+        # 船队传感器长表走向量化路径
+        if isinstance(data.get('vessel_sensors'), pd.DataFrame):
+            return self.predict_fleet(data['vessel_sensors'])
+
         # 简化的实现
         sensor_data = {
             "engine": data.get('engine_temp', 0),
             "hull": data.get('hull_stress', 0)
         }
 
-        return self.predict_failure(sensor_data)
\ No newline at end of file
+        return self.predict_failure(sensor_data)
@@ -0,0 +1,16 @@
+import multiprocessing as mp
+import threading
+
+
+def pool_context():
+    """选择进程池的启动方式
+
+    只有在主线程且进程内没有其他线程时才 fork; 调度器在线程池中执行模块时,
+    fork 多线程进程会把其他线程持有的锁复制到子进程中而可能死锁,
+    此时改用 forkserver (不可用时 spawn)。
+    """
+    methods = mp.get_all_start_methods()
+    if ("fork" in methods and threading.current_thread() is threading.main_thread()
+            and threading.active_count() == 1):
+        return mp.get_context("fork")
+    return mp.get_context("forkserver" if "forkserver" in methods else "spawn")
@@ -1,7 +1,34 @@
+import os
+import time
+
 import numpy as np
 import gym
 from gym import spaces
 
+from modules.process_pool import pool_context
+from modules.route_planner import RoutePlanner
+
+# 初始状态 [位置x, 位置y, 天气, 燃油, 时间] 与目标位置
+INITIAL_STATE = np.array([0.2, 0.5, 0.3, 50, 0], dtype=np.float64)
+TARGET_POSITION = np.array([0.8, 0.8])
+
+
+def compute_rewards(states):
+    """批量计算奖励, states 形状 (N, 5)"""
+    # 距离目标越近奖励越高
+    distance = np.hypot(TARGET_POSITION[0] - states[:, 0], TARGET_POSITION[1] - states[:, 1])
+
+    # 燃油效率奖励
+    fuel_efficiency = 10 / (states[:, 3] + 1e-5)
+
+    # 时间惩罚
+    time_penalty = -0.01 * states[:, 4]
+
+    # 天气惩罚
+    weather_penalty = -0.1 * states[:, 2]
+
+    return 10 / (distance + 1) + fuel_efficiency + time_penalty + weather_penalty
+
 
 class ShippingRouteEnv(gym.Env):
     """航运路线优化环境"""
@@ -32,7 +59,7 @@ class ShippingRouteEnv(gym.Env):
     def reset(self):
         """重置环境"""
         self.current_step = 0
-        self.state = np.array([0.2, 0.5, 0.3, 50, 0])  # [位置x, 位置y, 天气, 燃油, 时间]
+        self.state = INITIAL_STATE.copy()  # [位置x, 位置y, 天气, 燃油, 时间]
         return self.state
 
     def step(self, action):
@@ -58,44 +85,237 @@ class ShippingRouteEnv(gym.Env):
 
     def calculate_reward(self):
         """计算奖励函数"""
-        # 距离目标越近奖励越高
-        target_pos = np.array([0.8, 0.8])
-        current_pos = np.array([self.state[0], self.state[1]])
-        distance = np.linalg.norm(target_pos - current_pos)
+        return compute_rewards(self.state[np.newaxis])[0]
+
+
+class VectorShippingRouteEnv:
+    """批量航运路线环境: N 个并行回合的状态保存在一个 (N, 5) 数组中
+
+    step 接收 (N, 2) 的动作数组一次推进全部回合; 结束的回合自动重置,
+    其最终状态通过 info["final_state"] 返回。
+    """
+
+    def __init__(self, config, num_envs):
+        self.config = config
+        self.num_envs = num_envs
+        self.max_steps = config.RL_MAX_STEPS
+        self.single_env = ShippingRouteEnv(config)
+        self.observation_space = self.single_env.observation_space
+        self.action_space = self.single_env.action_space
+
+        self.states = np.empty((num_envs, len(INITIAL_STATE)))
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.reset()
+
+    def reset(self, mask=None):
+        """重置全部 (或 mask 选中的) 回合"""
+        if mask is None:
+            self.states[:] = INITIAL_STATE
+            self.steps[:] = 0
+        else:
+            self.states[mask] = INITIAL_STATE
+            self.steps[mask] = 0
+        return self.states
+
+    def step(self, actions):
+        """执行一批动作, 返回 (states, rewards, dones, info)"""
+        heading = np.radians(actions[:, 0])
+        speed = actions[:, 1]
+
+        # 更新位置
+        self.states[:, 0] += np.cos(heading) * speed * 0.01
+        self.states[:, 1] += np.sin(heading) * speed * 0.01
+
+        # 更新状态
+        self.states[:, 3] -= speed * 0.1  # 燃油消耗
+        self.states[:, 4] += 1  # 时间增加
+
+        rewards = self.calculate_reward()
+
+        self.steps += 1
+        dones = (self.steps >= self.max_steps) | (self.states[:, 3] <= 0)
+
+        info = {}
+        if dones.any():
+            info["final_state"] = self.states[dones].copy()
+            self.reset(dones)
+        return self.states, rewards, dones, info
+
+    def calculate_reward(self):
+        """批量计算奖励函数"""
+        return compute_rewards(self.states)
+
 
-        # 燃油效率奖励
-        fuel_efficiency = 10 / (self.state[3] + 1e-5)
+class LinearPolicy:
+    """线性确定性策略: 归一化状态 -> tanh -> 航向/速度
 
-        # 时间惩罚
-        time_penalty = -0.01 * self.state[4]
+    参数形状为 (特征数, 2); 批量形式 (K, 特征数, 2) 可同时评估 K 个策略。
+    """
 
-        # 天气惩罚
-        weather_penalty = -0.1 * self.state[2]
+    NUM_FEATURES = 6
 
-        return 10 / (distance + 1) + fuel_efficiency + time_penalty + weather_penalty
+    def __init__(self, params=None):
+        self.params = params if params is not None else np.zeros((self.NUM_FEATURES, 2))
+
+    @staticmethod
+    def features(states):
+        """状态归一化并追加偏置项"""
+        return np.column_stack([
+            states[:, 0], states[:, 1], states[:, 2],
+            states[:, 3] / 100, states[:, 4] / 100, np.ones(len(states))
+        ])
+
+    @staticmethod
+    def actions(features, params):
+        """将输出映射到动作空间: 航向 0-360 度, 速度 5-20 节"""
+        if params.ndim == 2:
+            out = np.tanh(features @ params)
+        else:
+            out = np.tanh(np.einsum('nf,nfa->na', features, params))
+        return np.column_stack([(out[:, 0] + 1) * 180, 12.5 + out[:, 1] * 7.5])
+
+    def act(self, states):
+        return self.actions(self.features(states), self.params)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(path, params=self.params)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            return cls(f["params"])
+
+
+class HeadingPolicy:
+    """未训练策略时的基准策略: 以最低航速直接驶向目标位置"""
+
+    def act(self, states):
+        heading = np.degrees(np.arctan2(TARGET_POSITION[1] - states[:, 1], TARGET_POSITION[0] - states[:, 0]))
+        return np.column_stack([heading % 360, np.full(len(states), 5.0)])
+
+
+def evaluate_policies(config, params):
+    """在批量环境中各运行一个回合, 返回每个候选策略 (K, 特征数, 2) 的累计奖励"""
+    env = VectorShippingRouteEnv(config, len(params))
+    states = env.reset()
+    returns = np.zeros(len(params))
+    active = np.ones(len(params), dtype=bool)
+    for _ in range(env.max_steps):
+        states, rewards, dones, _ = env.step(LinearPolicy.actions(LinearPolicy.features(states), params))
+        returns += np.where(active, rewards, 0.0)
+        active &= ~dones
+        if not active.any():
+            break
+    return returns
+
+
+def _evaluate_block(args):
+    """工作进程: 评估一组候选策略"""
+    config, params = args
+    return evaluate_policies(config, params)
 
 
 class RoutingOptimizer:
     """航运路线优化模块"""
 
+    # 读取 / 写入的数据键
+    READS = ("currents", "weather", "ports")
+    WRITES = ("optimized_route", "efficiency_improvement", "planned_routes")
+
+    # 写入的持久化路径 (配置项名), 批量运行时共享这些路径的研究方向依次执行
+    PERSISTENT_PATHS = ("RL_POLICY_PATH",)
+
     def __init__(self, config):
         self.config = config
         self.env = ShippingRouteEnv(config)
+        self.policy = None
+        self.baseline_return = None
+        self.planner = RoutePlanner(config)
+        self.load_policy()
+
+    def load_policy(self):
+        """加载已训练的策略"""
+        try:
+            self.policy = LinearPolicy.load(self.config.RL_POLICY_PATH)
+        except (FileNotFoundError, KeyError, ValueError):
+            self.policy = None
+        return self.policy
+
+    def train(self, seed=0):
+        """用交叉熵方法训练线性策略, 候选策略由进程池并行采样评估"""
+        rng = np.random.default_rng(seed)
+        population = self.config.RL_CEM_POPULATION
+        elite = max(2, int(population * self.config.RL_CEM_ELITE_FRAC))
+        shape = (LinearPolicy.NUM_FEATURES, 2)
+        mean, std = np.zeros(shape), np.ones(shape)
+
+        workers = self.config.RL_WORKERS or os.cpu_count() or 1
+        pool = None
+        if workers > 1:
+            pool = pool_context().Pool(workers)
+
+        history = []
+        start = time.perf_counter()
+        try:
+            for _ in range(self.config.RL_CEM_ITERATIONS):
+                candidates = mean + std * rng.standard_normal((population,) + shape)
+                blocks = np.array_split(candidates, workers)
+                if pool is None:
+                    returns = evaluate_policies(self.config, candidates)
+                else:
+                    returns = np.concatenate(pool.map(
+                        _evaluate_block, [(self.config, block) for block in blocks]))
+
+                best = candidates[np.argsort(returns)[-elite:]]
+                mean, std = best.mean(axis=0), best.std(axis=0) + 1e-3
+                history.append(float(returns.max()))
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        self.policy = LinearPolicy(mean)
+        self.policy.save(self.config.RL_POLICY_PATH)
+        print(f"Trained routing policy in {time.perf_counter() - start:.1f}s "
+              f"(best return {history[-1]:.2f})")
+        return history
+
+    def random_baseline(self, episodes=256, seed=0):
+        """随机动作策略的平均累计奖励, 作为效率提升的基准"""
+        if self.baseline_return is None:
+            rng = np.random.default_rng(seed)
+            env = VectorShippingRouteEnv(self.config, episodes)
+            env.reset()
+            returns = np.zeros(episodes)
+            active = np.ones(episodes, dtype=bool)
+            for _ in range(env.max_steps):
+                actions = np.column_stack([rng.uniform(0, 360, episodes), rng.uniform(5, 20, episodes)])
+                _, rewards, dones, _ = env.step(actions)
+                returns += np.where(active, rewards, 0.0)
+                active &= ~dones
+            self.baseline_return = float(returns.mean())
+        return self.baseline_return
 
     def optimize_route(self):
-        """优化航运路线"""
-        # 简化的实现 - 实际应使用强化学习算法
+        """按训练好的策略生成航运路线, 返回 (路线, 累计奖励)
+
+        没有已保存的策略时使用 HeadingPolicy, 不在处理流程中同步训练;
+        策略通过 python main.py --train-routing 离线训练。
+        """
+        policy = self.policy
+        if policy is None:
+            print(f"No routing policy at {self.config.RL_POLICY_PATH}, using heading baseline "
+                  f"(train offline with: python main.py --train-routing)")
+            policy = HeadingPolicy()
+
         route = []
+        total = 0.0
         state = self.env.reset()
-
         for _ in range(self.env.max_steps):
-            # 随机动作 (实际应使用训练好的策略)
-            action = np.array([
-                np.random.uniform(0, 360),
-                np.random.uniform(5, 20)
-            ])
-
-            state, _, done, _ = self.env.step(action)
+            action = policy.act(state[np.newaxis])[0]
+            state, reward, done, _ = self.env.step(action)
+            total += reward
             route.append({
                 "x": state[0],
                 "y": state[1],
@@ -105,11 +325,36 @@ class RoutingOptimizer:
             if done:
                 break
 
-        return route
+        return route, total
+
+    def plan_routes(self, data):
+        """用海流与天气构建代价场, 规划相邻港口之间的航线
+
+        港口超出 MAP_BOUNDS 的航段 path 与 hours 为 None, reason 说明原因。
+        """
+        currents = data.get("currents", {}).get("currents", [])
+        weather = data.get("weather", {}).get("cells", [])
+        self.planner.build(currents, weather)
+
+        ports = data.get("ports", {}).get("ports", [])
+        routes = []
+        for origin, destination in zip(ports, ports[1:]):
+            try:
+                route = self.planner.plan((origin["lat"], origin["lon"]),
+                                          (destination["lat"], destination["lon"]))
+            except ValueError as e:
+                # 港口超出 MAP_BOUNDS: 该航段无法规划, 其余航段照常
+                route = {"path": None, "hours": None, "reason": str(e)}
+            routes.append({"origin": origin["name"], "destination": destination["name"], **route})
+        return routes
 
     def process(self, data):
         """处理数据并优化路线"""
+        route, total = self.optimize_route()
+        baseline = self.random_baseline()
         return {
-            "optimized_route": self.optimize_route(),
-            "efficiency_improvement": 0.18  # 模拟18%效率提升
-        }
\ No newline at end of file
+            "optimized_route": route,
+            # 相对随机策略的累计奖励提升
+            "efficiency_improvement": (total - baseline) / abs(baseline) if baseline else 0.0,
+            "planned_routes": self.plan_routes(data)
+        }
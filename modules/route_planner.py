@@ -0,0 +1,196 @@
+import hashlib
+import heapq
+import math
+import pickle
+from collections import OrderedDict
+
+import numpy as np
+
+# 8 邻域方向 (行, 列): 行对应纬度, 列对应经度
+DIRECTIONS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+KM_PER_DEGREE = 111.32
+KNOT_KMH = 1.852
+
+
+class CostField:
+    """覆盖 MAP_BOUNDS 的航行代价网格
+
+    海流 (u, v, 米/秒) 与天气 (风浪严重程度 0-1) 的离散采样点按高斯核插值到网格,
+    再预先计算每个单元沿 8 个方向航行到相邻单元所需的时间 (小时)。
+    """
+
+    def __init__(self, config, currents=(), weather=()):
+        self.config = config
+        self.lat_min, self.lat_max, self.lon_min, self.lon_max = config.MAP_BOUNDS
+        self.resolution = config.ROUTE_GRID_RESOLUTION
+        self.rows = int(math.ceil((self.lat_max - self.lat_min) / self.resolution))
+        self.cols = int(math.ceil((self.lon_max - self.lon_min) / self.resolution))
+
+        lats = self.lat_min + (np.arange(self.rows) + 0.5) * self.resolution
+        lons = self.lon_min + (np.arange(self.cols) + 0.5) * self.resolution
+        self.lat_grid, self.lon_grid = np.meshgrid(lats, lons, indexing='ij')
+
+        self.u = self.rasterize(currents, 'u')
+        self.v = self.rasterize(currents, 'v')
+        self.severity = np.clip(self.rasterize(weather, 'severity'), 0, 1)
+        self.edge_costs = self.compute_edge_costs()
+
+    def rasterize(self, samples, field):
+        """高斯核加权插值; 远离所有采样点的单元趋于 0"""
+        if not samples:
+            return np.zeros((self.rows, self.cols))
+        lat = np.array([s['lat'] for s in samples], dtype=np.float64)
+        lon = np.array([s['lon'] for s in samples], dtype=np.float64)
+        value = np.array([s.get(field, 0.0) for s in samples], dtype=np.float64)
+
+        radius = self.config.ROUTE_INFLUENCE_RADIUS
+        d2 = ((self.lat_grid[..., np.newaxis] - lat) ** 2
+              + (self.lon_grid[..., np.newaxis] - lon) ** 2)
+        weights = np.exp(-d2 / (2 * radius ** 2))
+        # 权重和不足 1 时按 1 归一, 使场在采样点范围外平滑衰减
+        return (weights * value).sum(axis=-1) / np.maximum(weights.sum(axis=-1), 1.0)
+
+    def compute_edge_costs(self):
+        """返回 (rows, cols, 8) 的航行时间数组, 越界方向为 inf"""
+        speed = self.config.ROUTE_VESSEL_SPEED * KNOT_KMH
+        weather_weight = self.config.ROUTE_WEATHER_WEIGHT
+        costs = np.full((self.rows, self.cols, len(DIRECTIONS)), np.inf)
+
+        for k, (dr, dc) in enumerate(DIRECTIONS):
+            src = (slice(max(-dr, 0), self.rows - max(dr, 0)), slice(max(-dc, 0), self.cols - max(dc, 0)))
+            dst = (slice(max(dr, 0), self.rows - max(-dr, 0)), slice(max(dc, 0), self.cols - max(-dc, 0)))
+
+            # 两单元中点纬度处的东西向、南北向位移 (公里)
+            mid_lat = (self.lat_grid[src] + self.lat_grid[dst]) / 2
+            dx = dc * self.resolution * KM_PER_DEGREE * np.cos(np.radians(mid_lat))
+            dy = dr * self.resolution * KM_PER_DEGREE
+            length = np.hypot(dx, dy)
+
+            # 沿航向的平均海流分量 (米/秒 -> 公里/小时)
+            u = (self.u[src] + self.u[dst]) / 2
+            v = (self.v[src] + self.v[dst]) / 2
+            drift = (u * dx + v * dy) / length * 3.6
+            ground_speed = np.maximum(speed + drift, speed * 0.1)
+
+            severity = (self.severity[src] + self.severity[dst]) / 2
+            costs[src + (k,)] = length / ground_speed * (1 + weather_weight * severity)
+        return costs
+
+    def cell(self, lat, lon):
+        # 向下取整: int() 向零截断, 会把略低于边界的位置 (如 lat_min - 0.1) 映射到第 0 行
+        row = math.floor((lat - self.lat_min) / self.resolution)
+        col = math.floor((lon - self.lon_min) / self.resolution)
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            raise ValueError(f"Position outside MAP_BOUNDS: ({lat}, {lon})")
+        return row, col
+
+    def center(self, row, col):
+        return float(self.lat_grid[row, col]), float(self.lon_grid[row, col])
+
+    def max_ground_speed(self):
+        """可能的最大对地速度, 用于构造可采纳的启发函数"""
+        drift = float(np.sqrt(self.u ** 2 + self.v ** 2).max()) * 3.6
+        return self.config.ROUTE_VESSEL_SPEED * KNOT_KMH + drift
+
+
+class RoutePlanner:
+    """基于预计算代价网格的 A* 航线规划, 带最近查询的 LRU 缓存
+
+    代价场重建时清空缓存。
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.field = None
+        self.field_key = None
+        self.cache = OrderedDict()
+        self.cache_size = config.ROUTE_CACHE_SIZE
+        self.hits = 0
+        self.misses = 0
+
+    def build(self, currents=(), weather=()):
+        """按输入重建代价场; 输入未变化时保留现有代价场与缓存, 返回是否重建"""
+        key = hashlib.blake2b(pickle.dumps((list(currents), list(weather))), digest_size=16).digest()
+        if key == self.field_key:
+            return False
+
+        self.field = CostField(self.config, currents, weather)
+        self.field_key = key
+        self.cache.clear()
+
+        field = self.field
+        self._costs = field.edge_costs.reshape(field.rows * field.cols, len(DIRECTIONS)).tolist()
+        self._offsets = [dr * field.cols + dc for dr, dc in DIRECTIONS]
+        # 经度方向按最高纬度缩放, 保证启发函数不高估
+        max_abs_lat = max(abs(field.lat_min), abs(field.lat_max))
+        self._lon_scale = math.cos(math.radians(max_abs_lat))
+        self._max_speed = field.max_ground_speed()
+        return True
+
+    def plan(self, origin, destination):
+        """规划 origin -> destination ((lat, lon)) 的航线
+
+        返回 {"path": [{"lat", "lon"}, ...], "hours": 预计航行时间}; 不可达时 path 为空。
+        """
+        if self.field is None:
+            self.build()
+        start = self.field.cell(*origin)
+        goal = self.field.cell(*destination)
+
+        key = (start, goal)
+        result = self.cache.get(key)
+        if result is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        result = self._astar(start, goal)
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result
+
+    def _astar(self, start, goal):
+        field = self.field
+        cols = field.cols
+        costs, offsets = self._costs, self._offsets
+        res = field.resolution * KM_PER_DEGREE
+        goal_row, goal_col = goal
+        lon_scale, max_speed = self._lon_scale, self._max_speed
+
+        def heuristic(node):
+            row, col = divmod(node, cols)
+            return math.hypot((row - goal_row) * res, (col - goal_col) * res * lon_scale) / max_speed
+
+        source = start[0] * cols + start[1]
+        target = goal_row * cols + goal_col
+        best = {source: 0.0}
+        parent = {source: -1}
+        heap = [(heuristic(source), 0.0, source)]
+        while heap:
+            _, g, node = heapq.heappop(heap)
+            if node == target:
+                break
+            if g > best[node]:
+                continue
+            for k, cost in enumerate(costs[node]):
+                if cost == math.inf:
+                    continue
+                other = node + offsets[k]
+                new = g + cost
+                if new < best.get(other, math.inf):
+                    best[other] = new
+                    parent[other] = node
+                    heapq.heappush(heap, (new + heuristic(other), new, other))
+        else:
+            return {"path": [], "hours": math.inf}
+
+        path = []
+        node = target
+        while node != -1:
+            lat, lon = field.center(*divmod(node, cols))
+            path.append({"lat": lat, "lon": lon})
+            node = parent[node]
+        path.reverse()
+        return {"path": path, "hours": best[target]}
@@ -0,0 +1,129 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from types import MappingProxyType
+
+
+class ModuleScheduler:
+    """按模块声明的读写键构建依赖图, 在线程池中并发执行互不依赖的模块
+
+    模块类通过 READS / WRITES 声明从 data 中读取和写入的键; 未声明的模块视为
+    读写全部键, 与前后模块串行执行。按配置顺序, 后面的模块与前面的模块存在
+    写后读、读后写或写后写冲突时依赖前者, 因此结果与顺序执行一致。
+    每个模块只收到其声明读取的键组成的只读映射。
+    """
+
+    def __init__(self, config, modules, instrumentation=None):
+        # modules: [(模块名, 模块实例), ...], 顺序即配置顺序
+        self.config = config
+        self.modules = modules
+        self.instrumentation = instrumentation
+        self.timings = {}
+        self.report = {}
+
+    @staticmethod
+    def declarations(module):
+        reads = getattr(module, "READS", None)
+        writes = getattr(module, "WRITES", None)
+        if reads is None or writes is None:
+            return None, None
+        return frozenset(reads), frozenset(writes)
+
+    def build_graph(self):
+        """返回 {模块名: 依赖的模块名集合}"""
+        declared = {name: self.declarations(module) for name, module in self.modules}
+        graph = {}
+        for i, (name, _) in enumerate(self.modules):
+            reads, writes = declared[name]
+            deps = set()
+            for other, _ in self.modules[:i]:
+                other_reads, other_writes = declared[other]
+                if reads is None or other_reads is None:
+                    deps.add(other)
+                elif (reads & other_writes) or (writes & other_reads) or (writes & other_writes):
+                    deps.add(other)
+            graph[name] = deps
+        return graph
+
+    def run(self, data):
+        """执行全部模块, 将结果合并进 data; 返回 {模块名: 结果}"""
+        graph = self.build_graph()
+        modules = dict(self.modules)
+        pending = {name: set(deps) for name, deps in graph.items()}
+        results = {}
+        self.timings = {}
+        start = time.perf_counter()
+
+        workers = self.config.SCHEDULER_WORKERS or len(modules) or 1
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            running = {}
+            while pending or running:
+                for name in [n for n, deps in pending.items() if not deps]:
+                    del pending[name]
+                    print(f"Executing module: {name}")
+                    running[pool.submit(self._execute, name, modules[name], self._inputs(modules[name], data))] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    result, began, ended = future.result()
+                    self.timings[name] = (began - start, ended - start)
+                    if result is not None:
+                        data.update(result)
+                        results[name] = result
+                    for deps in pending.values():
+                        deps.discard(name)
+
+        self.report = self.critical_path(graph, time.perf_counter() - start)
+        return results
+
+    def _inputs(self, module, data):
+        reads, _ = self.declarations(module)
+        if reads is None:
+            return MappingProxyType(dict(data))
+        return MappingProxyType({key: data[key] for key in reads if key in data})
+
+    def _execute(self, name, module, inputs):
+        began = time.perf_counter()
+        try:
+            if self.instrumentation is not None:
+                result = self.instrumentation.measure(name, module.process, inputs)
+            else:
+                result = module.process(inputs)
+        except Exception as e:
+            print(f"Error processing module {name}: {str(e)}")
+            result = None
+        return result, began, time.perf_counter()
+
+    def critical_path(self, graph, wall):
+        """按实际耗时计算依赖图上的关键路径"""
+        finish, previous = {}, {}
+        for name, deps in graph.items():
+            began, ended = self.timings.get(name, (0.0, 0.0))
+            before = max(deps, key=lambda d: finish[d], default=None)
+            finish[name] = (finish[before] if before else 0.0) + (ended - began)
+            previous[name] = before
+
+        path = []
+        node = max(finish, key=finish.get, default=None)
+        while node is not None:
+            path.append(node)
+            node = previous[node]
+        path.reverse()
+
+        busy = sum(ended - began for began, ended in self.timings.values())
+        return {
+            "wall_seconds": round(wall, 4),
+            "busy_seconds": round(busy, 4),
+            "critical_path": path,
+            "critical_path_seconds": round(finish[path[-1]], 4) if path else 0.0,
+            "modules": {name: {"start": round(b, 4), "end": round(e, 4)}
+                        for name, (b, e) in self.timings.items()}
+        }
+
+    def print_report(self):
+        report = self.report
+        if not report:
+            return
+        print(f"[schedule] wall={report['wall_seconds']:.3f}s busy={report['busy_seconds']:.3f}s "
+              f"critical path={' -> '.join(report['critical_path']) or '-'} "
+              f"({report['critical_path_seconds']:.3f}s)")
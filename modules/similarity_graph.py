@@ -0,0 +1,226 @@
+import hashlib
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from modules.process_pool import pool_context
+from modules.trajectory_index import TrajectoryIndex, to_seconds
+from modules.trajectory_store import TrajectoryStore
+
+# 工作进程内的共享数组视图与相似度计算器
+_worker = {}
+
+
+class SimilarityCache:
+    """相似度缓存, 以 (轨迹ID, 内容指纹) 对为键
+
+    轨迹内容变化后指纹随之变化, 旧分数不会被命中。
+    计算时使用了阈值提前终止, 低于阈值的分数只是下界, 因此阈值变化时清空缓存。
+    """
+
+    def __init__(self):
+        self.scores = {}
+        self.threshold = None
+
+    @staticmethod
+    def fingerprint(traj):
+        """轨迹点、时间与方向的内容哈希"""
+        digest = hashlib.blake2b(digest_size=16)
+        for field in ('points', 'timestamps', 'directions'):
+            values = np.asarray(traj[field])
+            if values.dtype == object:
+                values = np.array([to_seconds(v) for v in values], dtype=np.float64)
+            digest.update(values.dtype.str.encode())
+            digest.update(np.ascontiguousarray(values).tobytes())
+        return digest.digest()
+
+    @staticmethod
+    def key(id1, fingerprint1, id2, fingerprint2):
+        a, b = (id1, fingerprint1), (id2, fingerprint2)
+        return (a, b) if repr(a) <= repr(b) else (b, a)
+
+    def retain(self, current):
+        """只保留两端轨迹都在 current ({(轨迹ID, 指纹)}) 中的分数"""
+        self.scores = {key: score for key, score in self.scores.items()
+                       if key[0] in current and key[1] in current}
+
+    def check_threshold(self, threshold):
+        if threshold != self.threshold:
+            self.scores.clear()
+            self.threshold = threshold
+
+    def get(self, key):
+        return self.scores.get(key)
+
+    def put(self, key, score):
+        self.scores[key] = score
+
+
+class SharedTrajectories:
+    """将轨迹点、时间和方向打包为共享内存中的列式数组"""
+
+    FIELDS = (('points', 2), ('times', 1), ('directions', 1))
+
+    def __init__(self, trajectories):
+        ids = list(trajectories)
+        lengths = np.array([len(trajectories[i]['points']) for i in ids], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        total = int(offsets[-1])
+
+        self.ids = ids
+        self.blocks = {}
+        self._handles = []
+        arrays = {}
+        for name, width in self.FIELDS + (('offsets', 0),):
+            shape = (len(offsets),) if name == 'offsets' else (total, width) if width > 1 else (total,)
+            dtype = np.int64 if name == 'offsets' else np.float64
+            size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+            block = shared_memory.SharedMemory(create=True, size=size)
+            self.blocks[name] = (block.name, shape, np.dtype(dtype).str)
+            arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            self._handles.append(block)
+
+        arrays['offsets'][:] = offsets
+        if isinstance(trajectories, TrajectoryStore):
+            # 列式存储按轨迹顺序连续排列, 整列复制即可
+            arrays['points'][:] = trajectories.coords.T
+            arrays['times'][:] = trajectories.times
+            arrays['directions'][:] = trajectories.headings
+            return
+
+        for k, traj_id in enumerate(ids):
+            traj = trajectories[traj_id]
+            lo, hi = offsets[k], offsets[k + 1]
+            if hi == lo:
+                continue
+            arrays['points'][lo:hi] = np.asarray(traj['points'], dtype=np.float64).reshape(-1, 2)
+            arrays['times'][lo:hi] = [to_seconds(t) for t in traj['timestamps']]
+            arrays['directions'][lo:hi] = np.asarray(traj['directions'], dtype=np.float64)
+
+    def close(self):
+        for block in self._handles:
+            block.close()
+            block.unlink()
+        self._handles = []
+
+
+def _attach(blocks):
+    arrays, handles = {}, []
+    for name, (shm_name, shape, dtype) in blocks.items():
+        block = shared_memory.SharedMemory(name=shm_name)
+        handles.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return arrays, handles
+
+
+def _view(arrays, k):
+    lo, hi = arrays['offsets'][k], arrays['offsets'][k + 1]
+    return {
+        'points': arrays['points'][lo:hi],
+        'timestamps': arrays['times'][lo:hi],
+        'directions': arrays['directions'][lo:hi]
+    }
+
+
+def _init_worker(config, blocks):
+    from modules.trajectory_association import TrajectoryAssociator
+    _worker['arrays'], _worker['handles'] = _attach(blocks)
+    _worker['associator'] = TrajectoryAssociator(config)
+
+
+def _score_block(block):
+    """工作进程: 计算一组 (查询, 候选) 轨迹对的相似度"""
+    arrays = _worker['arrays']
+    associator = _worker['associator']
+    threshold = associator.config.SIMILARITY_THRESHOLD
+
+    query, others = block
+    traj = _view(arrays, query)
+    return associator.calculate_similarity_many(traj, [_view(arrays, k) for k in others], threshold)
+
+
+class ParallelSimilarity:
+    """在进程池中分块计算候选轨迹对的相似度, 生成稀疏相似度图"""
+
+    def __init__(self, config, associator, cache=None):
+        self.config = config
+        self.associator = associator
+        self.cache = cache if cache is not None else SimilarityCache()
+
+    def candidate_pairs(self, trajectories):
+        """借助时空索引列出需要比较的轨迹对 (仅与先出现的轨迹比较)"""
+        index = TrajectoryIndex(self.config, self.associator.WEIGHTS)
+        position = {traj_id: k for k, traj_id in enumerate(trajectories)}
+        pairs = {}
+        for traj_id, traj in trajectories.items():
+            pairs[traj_id] = sorted(index.query(traj), key=position.get)
+            index.insert(traj_id, traj)
+        return pairs
+
+    def build_graph(self, trajectories):
+        """返回稀疏相似度图 {轨迹ID: {较早轨迹ID: 相似度}}"""
+        threshold = self.config.SIMILARITY_THRESHOLD
+        self.cache.check_threshold(threshold)
+
+        ids = list(trajectories)
+        position = {traj_id: k for k, traj_id in enumerate(ids)}
+        fingerprint = {traj_id: self.cache.fingerprint(trajectories[traj_id]) for traj_id in ids}
+        self.cache.retain(set(fingerprint.items()))
+
+        graph = {traj_id: {} for traj_id in ids}
+        pending = []
+        for traj_id, others in self.candidate_pairs(trajectories).items():
+            missing = []
+            for other in others:
+                score = self.cache.get(self.cache.key(traj_id, fingerprint[traj_id], other, fingerprint[other]))
+                if score is None:
+                    missing.append(other)
+                else:
+                    graph[traj_id][other] = score
+            # 同一查询轨迹的候选按块切分, 查询轨迹在块内复用
+            size = self.config.SIMILARITY_BLOCK_SIZE
+            for start in range(0, len(missing), size):
+                pending.append((traj_id, missing[start:start + size]))
+
+        if pending:
+            for (traj_id, others), scores in zip(pending, self._run(trajectories, pending, position)):
+                for other, score in zip(others, scores):
+                    score = float(score)
+                    graph[traj_id][other] = score
+                    self.cache.put(self.cache.key(traj_id, fingerprint[traj_id], other, fingerprint[other]), score)
+        return graph
+
+    def _run(self, trajectories, pending, position):
+        workers = self.config.SIMILARITY_WORKERS or os.cpu_count() or 1
+        blocks = [(position[q], [position[o] for o in others]) for q, others in pending]
+
+        shared = SharedTrajectories(trajectories)
+        try:
+            if workers == 1:
+                _init_worker(self.config, shared.blocks)
+                results = [_score_block(block) for block in blocks]
+                for handle in _worker.pop('handles'):
+                    handle.close()
+                _worker.clear()
+                return results
+
+            with pool_context().Pool(workers, initializer=_init_worker,
+                                     initargs=(self.config, shared.blocks)) as pool:
+                return pool.map(_score_block, blocks, chunksize=1)
+        finally:
+            shared.close()
+
+    @staticmethod
+    def cluster(graph, threshold):
+        """在稀疏相似度图上聚类, 与逐对比较的贪心结果一致"""
+        clusters = []
+        cluster_of = {}
+        for traj_id, neighbors in graph.items():
+            matched = [cluster_of[other] for other, score in neighbors.items() if score > threshold]
+            c = min(matched) if matched else len(clusters)
+            if c == len(clusters):
+                clusters.append([])
+            clusters[c].append(traj_id)
+            cluster_of[traj_id] = c
+        return clusters
@@ -0,0 +1,250 @@
+import asyncio
+import io
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from modules.data_processing import DataProcessor
+from modules import kinematics
+
+# 队列结束标记
+_END = object()
+
+
+async def file_chunk_source(config, path=None):
+    """分块读取AIS文件 (读取在线程中进行, 不阻塞事件循环)"""
+    processor = DataProcessor(config)
+    chunks = processor.stream_ais_data(path, config.STREAM_BATCH_SIZE)
+    while True:
+        chunk = await asyncio.to_thread(next, chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+class _LineBatcher:
+    """将CSV文本行攒成批次并预处理, 跨批次保留各船最后一个定位点"""
+
+    def __init__(self, config):
+        self.processor = DataProcessor(config)
+        self.batch_size = config.STREAM_BATCH_SIZE
+        self.header = None
+        self.lines = []
+        self.carry = None
+
+    def add(self, line):
+        line = line.strip()
+        if not line:
+            return None
+        if self.header is None:
+            self.header = line
+            return None
+        self.lines.append(line)
+        return self.flush() if len(self.lines) >= self.batch_size else None
+
+    def flush(self):
+        if not self.lines:
+            return None
+        text = "\n".join([self.header] + self.lines)
+        self.lines = []
+        df = self.processor.preprocess_ais(pd.read_csv(io.StringIO(text)), self.carry)
+        self.carry = kinematics.update_carry_over(df, self.carry)
+        return df
+
+
+async def file_tail_source(config, path):
+    """跟踪不断追加的CSV文件 (类似 tail -f), 空闲超过 STREAM_IDLE_TIMEOUT 秒后结束"""
+    batcher = _LineBatcher(config)
+    idle = 0.0
+    with open(path, 'rb') as f:
+        while True:
+            line = f.readline()
+            if line.endswith(b"\n"):
+                idle = 0.0
+                batch = batcher.add(line.decode())
+                if batch is not None:
+                    yield batch
+                continue
+
+            # 文件暂无新行: 先输出未满的批次, 再等待
+            f.seek(f.tell() - len(line))
+            batch = batcher.flush()
+            if batch is not None:
+                yield batch
+            if config.STREAM_IDLE_TIMEOUT is not None and idle >= config.STREAM_IDLE_TIMEOUT:
+                return
+            await asyncio.sleep(config.STREAM_POLL_INTERVAL)
+            idle += config.STREAM_POLL_INTERVAL
+
+
+async def socket_source(config, host, port):
+    """从TCP连接读取逐行CSV (首行为表头), 连接关闭时结束"""
+    batcher = _LineBatcher(config)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            try:
+                line = await asyncio.wait_for(reader.readline(), config.STREAM_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                batch = batcher.flush()
+                if batch is not None:
+                    yield batch
+                continue
+            if not line:
+                break
+            batch = batcher.add(line.decode())
+            if batch is not None:
+                yield batch
+        batch = batcher.flush()
+        if batch is not None:
+            yield batch
+    finally:
+        writer.close()
+
+
+def open_source(config, spec=None):
+    """根据描述创建数据源: None / file:<path> / tail:<path> / socket:<host>:<port>"""
+    if spec is None:
+        return file_chunk_source(config)
+    kind, _, target = spec.partition(":")
+    if kind == "file":
+        return file_chunk_source(config, target)
+    if kind == "tail":
+        return file_tail_source(config, target)
+    if kind == "socket":
+        host, _, port = target.rpartition(":")
+        return socket_source(config, host or "localhost", int(port))
+    raise ValueError(f"Invalid stream source: {spec}")
+
+
+class StageStats:
+    """单个流水线阶段的统计"""
+
+    def __init__(self, name, queue):
+        self.name = name
+        self.queue = queue
+        self.batches = 0
+        self.records = 0
+        self.busy = 0.0
+        self.max_depth = 0
+
+    def sample(self):
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    def as_dict(self):
+        return {
+            "batches": self.batches,
+            "records": self.records,
+            "busy_seconds": round(self.busy, 3),
+            "queue_depth": self.queue.qsize(),
+            "max_queue_depth": self.max_depth
+        }
+
+
+class StreamingRuntime:
+    """基于 asyncio 的流式执行: 数据源 -> 各模块 -> 汇总, 阶段间为有界队列 (背压)"""
+
+    def __init__(self, config, modules, checkpoints=None):
+        self.config = config
+        self.modules = modules
+        # 可选的 CheckpointManager, 运行期间周期性保存模块状态
+        self.checkpoints = checkpoints
+        self.stats = {}
+        # 只保留最近的延迟样本, 长时间运行时内存有界
+        self.latencies = deque(maxlen=10000)
+        self.results = {}
+        # 每个批次流出流水线时调用的回调 (例如增量刷新仪表盘)
+        self.sink_hooks = []
+
+    async def run(self, source):
+        """运行流水线直到数据源结束, 返回最新结果"""
+        size = self.config.STREAM_QUEUE_SIZE
+        queues = [asyncio.Queue(maxsize=size) for _ in range(len(self.modules) + 1)]
+        self.stats = {name: StageStats(name, queue) for (name, _), queue in zip(self.modules, queues)}
+
+        tasks = [asyncio.create_task(self._produce(source, queues[0]))]
+        for i, (name, module) in enumerate(self.modules):
+            tasks.append(asyncio.create_task(self._stage(name, module, queues[i], queues[i + 1])))
+        tasks.append(asyncio.create_task(self._sink(queues[-1])))
+        reporter = asyncio.create_task(self._report())
+
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            reporter.cancel()
+        self.print_report()
+        return self.results
+
+    async def _produce(self, source, out):
+        async for batch in source:
+            # 队列已满时在此等待, 形成背压
+            await out.put((time.perf_counter(), {"ais": batch}))
+        await out.put(_END)
+
+    async def _stage(self, name, module, inbox, out):
+        stats = self.stats[name]
+        while True:
+            stats.sample()
+            item = await inbox.get()
+            if item is _END:
+                await out.put(_END)
+                return
+
+            created, data = item
+            start = time.perf_counter()
+            try:
+                result = await asyncio.to_thread(module.process, data)
+            except Exception as e:
+                print(f"Error processing module {name}: {str(e)}")
+                result = {}
+            stats.busy += time.perf_counter() - start
+            stats.batches += 1
+            stats.records += len(data.get("ais", ()))
+            if self.checkpoints is not None:
+                await asyncio.to_thread(self.checkpoints.maybe_save, name, module)
+
+            await out.put((created, {**data, **result}))
+
+    async def _sink(self, inbox):
+        while True:
+            item = await inbox.get()
+            if item is _END:
+                return
+            created, data = item
+            self.latencies.append(time.perf_counter() - created)
+            for hook in self.sink_hooks:
+                try:
+                    await asyncio.to_thread(hook, data)
+                except Exception as e:
+                    print(f"Error in stream sink hook: {str(e)}")
+            data.pop("ais", None)
+            self.results.update(data)
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(self.config.STREAM_REPORT_INTERVAL)
+            self.print_report()
+
+    def report(self):
+        """各阶段队列深度与端到端延迟 (秒)"""
+        latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+        return {
+            "stages": {name: stats.as_dict() for name, stats in self.stats.items()},
+            "latency": {
+                "batches": len(self.latencies),
+                "p50": float(np.percentile(latencies, 50)),
+                "p95": float(np.percentile(latencies, 95)),
+                "max": float(latencies.max())
+            }
+        }
+
+    def print_report(self):
+        report = self.report()
+        for name, stats in report["stages"].items():
+            print(f"[stream] {name}: batches={stats['batches']} records={stats['records']} "
+                  f"queue={stats['queue_depth']} (max {stats['max_queue_depth']})")
+        latency = report["latency"]
+        print(f"[stream] latency p50={latency['p50']:.3f}s p95={latency['p95']:.3f}s "
+              f"max={latency['max']:.3f}s over {latency['batches']} batches")
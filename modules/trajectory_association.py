@@ -1,46 +1,83 @@
+import math
 import numpy as np
-from geopy.distance import great_circle
 from config.settings import Config
-from fastdtw import fastdtw
+from modules.dtw import DTWEngine
+from modules.similarity_graph import ParallelSimilarity
+from modules.trajectory_index import TrajectoryIndex, time_span, to_seconds
+from modules.trajectory_store import TrajectoryStore
 
 
 class TrajectoryAssociator:
     """轨迹关联分析模块"""
 
-    def __init__(self, config):
-        self.config = config
+    # 综合相似度权重: 空间、时间、方向
+    WEIGHTS = (0.5, 0.3, 0.2)
 
-    def calculate_similarity(self, traj1, traj2):
-        """计算两条轨迹的相似度"""
-        # 空间相似度 (DTW距离)
-        points1 = np.array(traj1['points'])
-        points2 = np.array(traj2['points'])
-
-        # 使用动态时间规整计算距离
-        distance, _ = fastdtw(points1, points2, dist=lambda x, y: great_circle(x, y).meters)
+    # 读取 / 写入的数据键
+    READS = ("ais", "trajectory_store")
+    WRITES = ("trajectory_clusters",)
 
+    def __init__(self, config):
+        self.config = config
+        self.dtw = DTWEngine(config)
+        self.similarity = ParallelSimilarity(config, self)
+
+    def calculate_similarity(self, traj1, traj2, threshold=None):
+        """计算两条轨迹的相似度
+
+        给定 threshold 时, 不可能超过阈值的轨迹对会提前终止 DTW,
+        此时返回值是不超过阈值的下界。
+        """
+        time_sim, direction_sim, max_distance = self._partial_similarity(traj1, traj2, threshold)
+
+        # 空间相似度 (带宽约束的 DTW 距离)
+        distance = self.dtw.distance(traj1['points'], traj2['points'], max_distance)
+        return self._combine(distance, time_sim, direction_sim)
+
+    def calculate_similarity_many(self, traj, candidates, threshold=None):
+        """一次计算一条轨迹与多条候选轨迹的相似度"""
+        partial = [self._partial_similarity(traj, other, threshold) for other in candidates]
+        if not partial:
+            return np.zeros(0)
+
+        time_sim, direction_sim, max_distance = (np.array(col) for col in zip(*partial))
+        distances = self.dtw.distance_many(
+            traj['points'], [other['points'] for other in candidates], max_distance)
+        return self._combine(distances, time_sim, direction_sim)
+
+    def _partial_similarity(self, traj1, traj2, threshold):
+        """计算时间、方向相似度, 以及超过阈值所允许的最大 DTW 距离"""
         # 时间相似度 (时间窗口重叠)
-        time_overlap = self._calculate_time_overlap(traj1['timestamps'], traj2['timestamps'])
+        time_sim = self._calculate_time_overlap(traj1['timestamps'], traj2['timestamps'])
 
         # 方向相似度
-        dir_similarity = self._calculate_direction_similarity(traj1['directions'], traj2['directions'])
-
-        # 组合相似度
-        spatial_sim = 1 / (1 + distance / 1000)  # 归一化
-        time_sim = time_overlap
-        direction_sim = dir_similarity
-
-        # 加权综合相似度
-        total_similarity = 0.5 * spatial_sim + 0.3 * time_sim + 0.2 * direction_sim
-        return total_similarity
+        direction_sim = self._calculate_direction_similarity(traj1['directions'], traj2['directions'])
+
+        max_distance = math.inf
+        if threshold is not None:
+            w_spatial, w_time, w_direction = self.WEIGHTS
+            required = (threshold - w_time * time_sim - w_direction * direction_sim) / w_spatial
+            if required >= 1:
+                max_distance = -1.0
+            elif required > 0:
+                # spatial_sim = 1 / (1 + distance / 1000)
+                max_distance = (1 / required - 1) * 1000
+        return time_sim, direction_sim, max_distance
+
+    def _combine(self, distance, time_sim, direction_sim):
+        """加权综合相似度"""
+        spatial_sim = 1 / (1 + np.asarray(distance) / 1000)  # 归一化
+        w_spatial, w_time, w_direction = self.WEIGHTS
+        total = w_spatial * spatial_sim + w_time * time_sim + w_direction * direction_sim
+        return float(total) if np.ndim(total) == 0 else total
 
     def _calculate_time_overlap(self, timestamps1, timestamps2):
         """计算时间重叠度"""
-        if not timestamps1 or not timestamps2:
+        if len(timestamps1) == 0 or len(timestamps2) == 0:
             return 0.0
 
-        start1, end1 = min(timestamps1), max(timestamps1)
-        start2, end2 = min(timestamps2), max(timestamps2)
+        start1, end1 = time_span(timestamps1)
+        start2, end2 = time_span(timestamps2)
 
         overlap_start = max(start1, start2)
         overlap_end = min(end1, end2)
@@ -48,8 +85,8 @@ class TrajectoryAssociator:
         if overlap_start > overlap_end:
             return 0.0
 
-        overlap_duration = (overlap_end - overlap_start).total_seconds()
-        total_duration = (max(end1, end2) - min(start1, start2)).total_seconds()
+        overlap_duration = to_seconds(overlap_end - overlap_start)
+        total_duration = to_seconds(max(end1, end2) - min(start1, start2))
 
         return overlap_duration / total_duration if total_duration > 0 else 0.0
 
@@ -58,9 +95,10 @@ class TrajectoryAssociator:
         if len(dirs1) == 0 or len(dirs2) == 0:
             return 0.0
 
-        # 使用余弦相似度计算方向一致性
-        dir_vec1 = np.array([np.cos(np.radians(d)) for d in dirs1])
-        dir_vec2 = np.array([np.cos(np.radians(d)) for d in dirs2])
+        # 使用余弦相似度计算方向一致性 (长度不同时比较公共部分)
+        length = min(len(dirs1), len(dirs2))
+        dir_vec1 = np.cos(np.radians(np.asarray(dirs1[:length], dtype=np.float64)))
+        dir_vec2 = np.cos(np.radians(np.asarray(dirs2[:length], dtype=np.float64)))
 
         # 计算方向序列相似度
         dot_product = np.dot(dir_vec1, dir_vec2)
@@ -72,8 +110,19 @@ class TrajectoryAssociator:
 
         return dot_product / (norm1 * norm2)
 
-    def associate_trajectories(self, trajectories):
+    def associate_trajectories(self, trajectories, use_index=None, parallel=None):
         """关联轨迹并聚类"""
+        if parallel is None:
+            parallel = self.config.SIMILARITY_PARALLEL
+        if parallel:
+            graph = self.similarity.build_graph(trajectories)
+            return self.similarity.cluster(graph, self.config.SIMILARITY_THRESHOLD)
+
+        if use_index is None:
+            use_index = self.config.TRAJECTORY_INDEX_ENABLED
+        if use_index:
+            return self._associate_indexed(trajectories)
+
         clusters = []
         traj_ids = list(trajectories.keys())
 
@@ -81,7 +130,8 @@ class TrajectoryAssociator:
             matched = False
             for cluster in clusters:
                 for id2 in cluster:
-                    similarity = self.calculate_similarity(trajectories[id1], trajectories[id2])
+                    similarity = self.calculate_similarity(trajectories[id1], trajectories[id2],
+                                                          self.config.SIMILARITY_THRESHOLD)
                     if similarity > self.config.SIMILARITY_THRESHOLD:
                         cluster.append(id1)
                         matched = True
@@ -92,4 +142,51 @@ class TrajectoryAssociator:
             if not matched:
                 clusters.append([id1])
 
-        return clusters
\ No newline at end of file
+        return clusters
+
+    def _associate_indexed(self, trajectories):
+        """借助时空候选索引聚类, 结果与逐对比较一致"""
+        clusters = []
+        cluster_of = {}
+        threshold = self.config.SIMILARITY_THRESHOLD
+        index = TrajectoryIndex(self.config, self.WEIGHTS)
+
+        for id1, traj in trajectories.items():
+            candidates = index.query(traj)
+            matched = None
+
+            # 按簇的创建顺序、簇内成员顺序比较, 与逐对比较的遍历顺序相同
+            for c in sorted({cluster_of[id2] for id2 in candidates}):
+                for id2 in clusters[c]:
+                    if id2 not in candidates:
+                        continue
+                    if self.calculate_similarity(traj, trajectories[id2], threshold) > threshold:
+                        matched = c
+                        break
+                if matched is not None:
+                    break
+
+            if matched is None:
+                matched = len(clusters)
+                clusters.append([])
+            clusters[matched].append(id1)
+            cluster_of[id1] = matched
+            index.insert(id1, traj)
+
+        return clusters
+
+    def build_trajectories(self, df):
+        """按 MMSI 将预处理后的AIS数据整理为列式轨迹存储 (轨迹为共享数组上的视图)"""
+        return TrajectoryStore.from_ais(df, self.config.TRAJECTORY_COORD_DTYPE)
+
+    def process(self, data):
+        """关联AIS数据中的船舶轨迹"""
+        df = data.get('ais')
+        if df is None or len(df) == 0:
+            return {}
+
+        store = data.get('trajectory_store')
+        if store is None:
+            store = self.build_trajectories(df)
+        clusters = self.associate_trajectories(store)
+        return {"trajectory_clusters": clusters}
@@ -0,0 +1,191 @@
+import bisect
+import math
+from collections import defaultdict
+
+import numpy as np
+
+from modules.kinematics import EARTH_RADIUS_M
+
+METERS_PER_DEGREE = EARTH_RADIUS_M * math.pi / 180
+# 单条轨迹在所属层级最多登记的网格数, 超出则放到更粗的层级
+MAX_CELLS_PER_TRAJECTORY = 16
+# 查询时单个层级最多枚举的网格数, 超出则直接取该层全部轨迹
+MAX_QUERY_CELLS = 4096
+MAX_LEVELS = 32
+
+
+def time_span(timestamps):
+    """返回时间序列的 (最早, 最晚) 时刻, 兼容 datetime 列表与 numpy 数组"""
+    if isinstance(timestamps, np.ndarray):
+        return timestamps.min(), timestamps.max()
+    return min(timestamps), max(timestamps)
+
+
+def to_seconds(value):
+    """将时刻或时间差转换为秒 (数值型按秒处理)"""
+    if hasattr(value, 'total_seconds'):
+        return value.total_seconds()
+    if hasattr(value, 'timestamp'):
+        return value.timestamp()
+    if isinstance(value, (np.datetime64, np.timedelta64)):
+        unit = np.timedelta64(1, 's')
+        return (value - np.datetime64(0, 's')) / unit if isinstance(value, np.datetime64) else value / unit
+    return float(value)
+
+
+class TrajectoryIndex:
+    """轨迹候选索引: 多层级空间网格分桶 + 按起始时间排序的区间索引
+
+    只剔除相似度上界不超过 SIMILARITY_THRESHOLD 的轨迹对,
+    因此基于索引的聚类结果与逐对比较完全一致。
+    """
+
+    def __init__(self, config, weights=(0.5, 0.3, 0.2)):
+        self.config = config
+        self.spatial_weight, self.time_weight, self.direction_weight = weights
+
+        # 网格边长取自 MAX_DISTANCE, 时间查询余量取自 TIME_WINDOW
+        self.cell_deg = max(config.MAX_DISTANCE, 1) / METERS_PER_DEGREE
+        self.time_slack = config.TIME_WINDOW
+
+        self.search_radius = self._search_radius()
+        # 层级 k 的网格边长为 cell_deg * 2^k
+        self.levels = defaultdict(lambda: defaultdict(list))
+        self.level_ids = defaultdict(list)
+        self.global_ids = []
+        self.boxes = {}
+
+        # 区间索引: 起始时间有序列表 + 最长跨度
+        self.starts = []
+        self.start_ids = []
+        self.max_span = 0.0
+
+    def _search_radius(self):
+        """由相似度阈值推出候选轨迹之间允许的最大包围盒间距 (米)"""
+        threshold = self.config.SIMILARITY_THRESHOLD
+        min_spatial = (threshold - self.time_weight - self.direction_weight) / self.spatial_weight
+        if min_spatial <= 0:
+            return math.inf
+        # spatial_sim = 1 / (1 + distance / 1000)
+        return (1 / min_spatial - 1) * 1000
+
+    @staticmethod
+    def describe(traj):
+        """提取轨迹的包围盒、时间跨度和点数"""
+        points = np.asarray(traj['points'], dtype=np.float64)
+        timestamps = traj['timestamps']
+        if len(points) == 0 or len(timestamps) == 0:
+            return None
+
+        start, end = time_span(timestamps)
+        return {
+            'lat_min': points[:, 0].min(), 'lat_max': points[:, 0].max(),
+            'lon_min': points[:, 1].min(), 'lon_max': points[:, 1].max(),
+            'start': to_seconds(start), 'end': to_seconds(end),
+            'n': len(points)
+        }
+
+    def _cells(self, box, level, margin_deg=(0.0, 0.0), limit=MAX_CELLS_PER_TRAJECTORY):
+        size = self.cell_deg * (1 << level)
+        lat_lo = math.floor((box['lat_min'] - margin_deg[0]) / size)
+        lat_hi = math.floor((box['lat_max'] + margin_deg[0]) / size)
+        lon_lo = math.floor((box['lon_min'] - margin_deg[1]) / size)
+        lon_hi = math.floor((box['lon_max'] + margin_deg[1]) / size)
+        if (lat_hi - lat_lo + 1) * (lon_hi - lon_lo + 1) > limit:
+            return None
+        return [(i, j) for i in range(lat_lo, lat_hi + 1) for j in range(lon_lo, lon_hi + 1)]
+
+    def insert(self, traj_id, traj):
+        """登记一条轨迹"""
+        box = self.describe(traj)
+        self.boxes[traj_id] = box
+        if box is None:
+            self.global_ids.append(traj_id)
+            return
+
+        for level in range(MAX_LEVELS):
+            cells = self._cells(box, level)
+            if cells is not None:
+                break
+        else:
+            self.global_ids.append(traj_id)
+            return
+
+        grid = self.levels[level]
+        for cell in cells:
+            grid[cell].append(traj_id)
+        self.level_ids[level].append(traj_id)
+
+        pos = bisect.bisect_right(self.starts, box['start'])
+        self.starts.insert(pos, box['start'])
+        self.start_ids.insert(pos, traj_id)
+        self.max_span = max(self.max_span, box['end'] - box['start'])
+
+    def query(self, traj):
+        """返回可能与给定轨迹相似度超过阈值的已登记轨迹"""
+        box = self.describe(traj)
+        if box is None:
+            return set(self.boxes)
+
+        threshold = self.config.SIMILARITY_THRESHOLD
+        margin = None
+        if math.isfinite(self.search_radius):
+            margin_lat = self.search_radius / METERS_PER_DEGREE
+            max_lat = max(abs(box['lat_min']), abs(box['lat_max'])) + margin_lat
+            # 经度方向的间距下界为 2R·asin(cos(lat)·sin(dlon/2)), 反解出所需经度余量
+            ratio = (math.sin(math.radians(margin_lat) / 2)
+                     / max(math.cos(math.radians(min(max_lat, 90.0))), 1e-12))
+            if ratio < 1:
+                margin_lon = math.degrees(2 * math.asin(ratio))
+                # 跨越日期变更线时不使用网格
+                if box['lon_min'] - margin_lon >= -180 and box['lon_max'] + margin_lon <= 180:
+                    margin = (margin_lat, margin_lon)
+
+        pool = set()
+        for level, grid in self.levels.items():
+            cells = self._cells(box, level, margin, MAX_QUERY_CELLS) if margin else None
+            if cells is None:
+                pool.update(self.level_ids[level])
+                continue
+            for cell in cells:
+                pool.update(grid.get(cell, ()))
+
+        # 时间不重叠时相似度至多为 spatial_weight + direction_weight
+        if self.spatial_weight + self.direction_weight <= threshold:
+            lo = bisect.bisect_left(self.starts, box['start'] - self.max_span - self.time_slack)
+            hi = bisect.bisect_right(self.starts, box['end'] + self.time_slack)
+            pool &= set(self.start_ids[lo:hi])
+
+        candidates = set(self.global_ids)
+        candidates.update(other for other in pool
+                          if self.upper_bound(box, self.boxes[other]) > threshold)
+        return candidates
+
+    def upper_bound(self, a, b):
+        """根据包围盒间距和时间跨度估计相似度上界"""
+        gap = self.box_gap(a, b) * (1 - 1e-9)
+        # DTW 路径长度至少为 max(n1, n2), 每一步代价都不小于包围盒间距
+        spatial_ub = 1 / (1 + max(a['n'], b['n']) * gap / 1000)
+
+        overlap = min(a['end'], b['end']) - max(a['start'], b['start'])
+        total = max(a['end'], b['end']) - min(a['start'], b['start'])
+        time_sim = overlap / total if overlap >= 0 and total > 0 else 0.0
+
+        return (self.spatial_weight * spatial_ub + self.time_weight * time_sim
+                + self.direction_weight) + 1e-9
+
+    @staticmethod
+    def box_gap(a, b):
+        """两个经纬度包围盒之间大圆距离的下界 (米)"""
+        dlat = max(0.0, a['lat_min'] - b['lat_max'], b['lat_min'] - a['lat_max'])
+        dlon = max(0.0, a['lon_min'] - b['lon_max'], b['lon_min'] - a['lon_max'])
+        if dlon > 0:
+            # 经度是环形的, 取两个方向中较小的间距
+            span = max(a['lon_max'], b['lon_max']) - min(a['lon_min'], b['lon_min'])
+            dlon = min(dlon, max(0.0, 360 - span))
+
+        lat_gap = math.radians(dlat) * EARTH_RADIUS_M
+        max_lat = max(abs(a['lat_min']), abs(a['lat_max']), abs(b['lat_min']), abs(b['lat_max']))
+        lon_gap = 2 * EARTH_RADIUS_M * math.asin(
+            min(1.0, math.cos(math.radians(max_lat)) * math.sin(math.radians(dlon) / 2)))
+        return max(lat_gap, lon_gap)
@@ -0,0 +1,117 @@
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+
+class TrajectoryStore(Mapping):
+    """列式轨迹存储: 全部轨迹共享同一组数组, 按 MMSI 用偏移量索引
+
+    - coords: (2, N) 纬度/经度两列, 默认 float64 (TRAJECTORY_COORD_DTYPE 可设为 float32)
+    - times: (N,) int64 UNIX 时间戳 (秒)
+    - headings: (N,) float32 航向 (度)
+    - offsets: (K + 1,) int64, 第 k 条轨迹占据 [offsets[k], offsets[k + 1])
+
+    作为 {MMSI: 轨迹} 映射使用, 取出的轨迹是 {points, timestamps, directions} 形式的
+    零拷贝视图, 可直接交给 TrajectoryAssociator / TrajectoryIndex / DTWEngine。
+    """
+
+    def __init__(self, ids, offsets, coords, times, headings, order=None):
+        self.ids = list(ids)
+        self.offsets = offsets
+        self.coords = coords
+        self.times = times
+        self.headings = headings
+        # order[k] 为存储第 k 行对应的源数据行号; None 表示与源数据行序一致
+        self.order = order
+        self._position = {traj_id: k for k, traj_id in enumerate(self.ids)}
+
+    @classmethod
+    def from_ais(cls, df, coord_dtype=np.float64):
+        """由 preprocess_ais 的输出构建 (已按 MMSI、时间排序时无需重排)
+
+        同一 MMSI 的记录保持源数据中的相对顺序, 轨迹按 MMSI 首次出现的顺序排列。
+        """
+        ids, offsets, order = group_rows(df['mmsi'].to_numpy())
+
+        def column(name, dtype):
+            values = df[name].to_numpy(dtype=dtype)
+            return values if order is None else values[order]
+
+        coords = np.empty((2, int(offsets[-1])), dtype=coord_dtype)
+        coords[0] = column('latitude', coord_dtype)
+        coords[1] = column('longitude', coord_dtype)
+        times = column_seconds(df['timestamp'])
+        if order is not None:
+            times = times[order]
+        return cls(ids, offsets, coords, times, column('direction', np.float32), order)
+
+    @property
+    def lat(self):
+        return self.coords[0]
+
+    @property
+    def lon(self):
+        return self.coords[1]
+
+    @property
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    @property
+    def nbytes(self):
+        arrays = (self.offsets, self.coords, self.times, self.headings)
+        return sum(a.nbytes for a in arrays) + (self.order.nbytes if self.order is not None else 0)
+
+    @property
+    def bytes_per_point(self):
+        return self.nbytes / max(len(self.times), 1)
+
+    def codes(self):
+        """每一行所属轨迹的序号"""
+        return np.repeat(np.arange(len(self.ids)), self.lengths)
+
+    def view(self, k):
+        """第 k 条轨迹的零拷贝视图"""
+        lo, hi = self.offsets[k], self.offsets[k + 1]
+        return {
+            'points': self.coords[:, lo:hi].T,
+            'timestamps': self.times[lo:hi],
+            'directions': self.headings[lo:hi]
+        }
+
+    def __getitem__(self, traj_id):
+        return self.view(self._position[traj_id])
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def group_rows(keys):
+    """按键分组且保持组内相对顺序, 组按首次出现的顺序排列
+
+    返回 (ids, offsets, order): 排序后第 k 组占据 [offsets[k], offsets[k + 1]),
+    order 为排序后各行对应的原行号, 原数据已按组连续时为 None。
+    """
+    codes, ids = pd.factorize(keys, sort=False, use_na_sentinel=False)
+    order = None
+    if len(codes) and np.any(np.diff(codes) < 0):
+        order = np.argsort(codes, kind='stable')
+        codes = codes[order]
+
+    offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=len(ids)), out=offsets[1:])
+    return ids.tolist(), offsets, order
+
+
+def column_seconds(series):
+    """将时间列转换为 int64 UNIX 秒 (数值列按秒处理)"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype=np.int64)
+    stamps = pd.DatetimeIndex(pd.to_datetime(series))
+    if stamps.tz is not None:
+        stamps = stamps.tz_convert(None)
+    return stamps.as_unit('s').asi8.copy()
@@ -1,13 +1,20 @@
 import folium
+from folium.plugins import HeatMap
 import plotly.express as px
 import pandas as pd
 
+from modules.density import DensityLayer
+from modules.downsampling import lttb, simplify_track
+
 
 class Visualizer:
     """数据可视化模块"""
 
     def __init__(self, config):
         self.config = config
+        # 增量维护的密度图层及其渲染结果缓存
+        self.layers = {}
+        self.rendered = {}
 
     def generate_dashboard(self, results, dashboard_type):
         """根据类型生成可视化仪表盘"""
@@ -26,6 +33,78 @@ class Visualizer:
         else:
             return self.create_default_dashboard()
 
+    def update_layers(self, data):
+        """用新到的数据增量更新密度图层, 返回发生变化的图层名"""
+        samples = {}
+        ais = data.get("ais")
+        if isinstance(ais, pd.DataFrame) and len(ais):
+            samples["ais"] = (ais["latitude"], ais["longitude"])
+        iot = data.get("iot_sensors")
+        if isinstance(iot, pd.DataFrame) and len(iot):
+            samples["iot"] = (iot["latitude"], iot["longitude"])
+        bio = data.get("bio", {}).get("sensors", [])
+        if bio:
+            samples["bio"] = ([s["lat"] for s in bio], [s["lon"] for s in bio])
+
+        changed = []
+        for name, (lat, lon) in samples.items():
+            layer = self.layers.get(name)
+            if layer is None:
+                layer = self.layers[name] = DensityLayer(self.config)
+            if layer.update(lat, lon):
+                changed.append(name)
+        return changed
+
+    def layer_points(self, name, index):
+        """图层热力点; 图层版本未变化时直接复用上次的渲染结果"""
+        layer = self.layers.get(name)
+        if layer is None:
+            return []
+        key = (name, index)
+        cached = self.rendered.get(key)
+        if cached is None or cached[0] != layer.version:
+            cached = self.rendered[key] = (layer.version, layer.heat_points(index).tolist())
+        return cached[1]
+
+    def create_density_dashboard(self, names):
+        """多分辨率密度热力图, 每个分辨率一个可切换图层 (默认显示最粗的一层)"""
+        dashboard = self.create_default_dashboard()
+        for name in names:
+            for index, resolution in enumerate(self.config.DENSITY_RESOLUTIONS):
+                points = self.layer_points(name, index)
+                # 过细且过密的图层会使页面过大, 此时只保留较粗的分辨率
+                if not points or len(points) > self.config.DENSITY_MAX_LAYER_POINTS:
+                    continue
+                group = folium.FeatureGroup(name=f"{name} density ({resolution}°)", show=index == 0)
+                HeatMap(points, radius=8, blur=6).add_to(group)
+                group.add_to(dashboard)
+        folium.LayerControl().add_to(dashboard)
+        return dashboard
+
+    def create_fishery_dashboard(self, results):
+        """渔业监测仪表盘: 船舶活动密度"""
+        return self.create_density_dashboard(["ais"])
+
+    def create_iot_dashboard(self, results):
+        """海洋物联网仪表盘: 传感器观测密度"""
+        return self.create_density_dashboard(["iot"])
+
+    def create_bio_dashboard(self, results):
+        """海洋生物仪表盘: 生物传感器观测密度"""
+        return self.create_density_dashboard(["bio"])
+
+    def prepare_track(self, df, zoom, lat="lat", lon="lon"):
+        """渲染前按缩放级别简化轨迹几何"""
+        if len(df) <= 2:
+            return df
+        keep = simplify_track(self.config, df[lat].to_numpy(), df[lon].to_numpy(), zoom)
+        return df.iloc[keep]
+
+    def prepare_series(self, df, x, y):
+        """渲染前用 LTTB 降采样时间序列"""
+        keep = lttb(df[x].to_numpy(), df[y].to_numpy(), self.config.VIZ_SERIES_POINTS)
+        return df.iloc[keep]
+
     def create_routing_dashboard(self, results):
         """航运优化仪表盘"""
         route_df = pd.DataFrame(results.get("optimized_route", []))
@@ -33,7 +112,7 @@ class Visualizer:
         if not route_df.empty:
             # 创建优化路线图
             fig = px.line_mapbox(
-                route_df,
+                self.prepare_track(route_df, 3, lat="y", lon="x"),
                 lat="y",
                 lon="x",
                 zoom=3,
@@ -45,7 +124,7 @@ class Visualizer:
         # 资源消耗图
         if "fuel" in route_df.columns:
             resource_fig = px.line(
-                route_df,
+                self.prepare_series(route_df, "time", "fuel"),
                 x="time",
                 y="fuel",
                 title="Fuel Consumption"
@@ -61,7 +140,8 @@ class Visualizer:
 
         # 添加路线到地图
         if not route_df.empty:
-            route_points = list(zip(route_df['y'], route_df['x']))
+            track = self.prepare_track(route_df, 5, lat="y", lon="x")
+            route_points = list(zip(track['y'], track['x']))
             folium.PolyLine(route_points, color="blue", weight=2.5, opacity=1).add_to(dashboard)
 
         return dashboard
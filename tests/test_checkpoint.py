@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+import pytest
+
+from config.settings import Config
+from modules.checkpoint import CheckpointManager
+
+
+class Model:
+    CHECKPOINT_VERSION = 1
+    CHECKPOINT_CONFIG = ("MAX_DISTANCE",)
+
+    def __init__(self, weights=None):
+        self.weights = weights
+
+    def get_state(self):
+        return {"weights": self.weights}
+
+    def set_state(self, state):
+        self.weights = state["weights"]
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = Config()
+    config.CHECKPOINT_DIR = str(tmp_path)
+    config.CHECKPOINT_MMAP_MIN_BYTES = 1024
+    return config
+
+
+def test_restore_round_trip(config):
+    weights = np.arange(10000, dtype=np.float64)
+    CheckpointManager(config, "fishery_monitoring").save("incremental_mining", Model(weights))
+
+    restored = Model()
+    assert CheckpointManager(config, "fishery_monitoring").restore("incremental_mining", restored)
+    np.testing.assert_array_equal(restored.weights, weights)
+
+
+def test_profiles_do_not_share_checkpoints(config):
+    CheckpointManager(config, "fishery_monitoring").save("incremental_mining", Model(np.ones(3)))
+    restored = Model()
+    assert not CheckpointManager(config, "iot_stream").restore("incremental_mining", restored)
+    assert restored.weights is None
+
+
+def test_config_change_skips_restore(config):
+    manager = CheckpointManager(config, "fishery_monitoring")
+    manager.save("incremental_mining", Model(np.ones(3)))
+
+    config.MAX_DISTANCE = 1000
+    assert not CheckpointManager(config, "fishery_monitoring").restore("incremental_mining", Model())
+
+    # 模块未依赖的配置项不影响恢复
+    config.MAX_DISTANCE = Config.MAX_DISTANCE
+    config.RL_MAX_STEPS = 5
+    assert CheckpointManager(config, "fishery_monitoring").restore("incremental_mining", Model())
+
+
+def test_keeps_latest_files_per_config(config):
+    config.CHECKPOINT_KEEP = 2
+    manager = CheckpointManager(config, "fishery_monitoring")
+    for value in range(4):
+        manager.save("incremental_mining", Model(np.full(3, value)))
+    restored = Model()
+    assert manager.restore("incremental_mining", restored)
+    np.testing.assert_array_equal(restored.weights, np.full(3, 3))
+    assert len(os.listdir(manager.directory)) == 2
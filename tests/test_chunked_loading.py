@@ -0,0 +1,25 @@
+import pandas as pd
+import pytest
+
+from benchmarks import generators
+from config.settings import Config
+from modules.data_processing import DataProcessor
+
+
+@pytest.mark.parametrize("chunk_size", [777, 5000])
+def test_chunked_preprocessing_matches_full(tmp_path, chunk_size):
+    config = Config()
+    config.CACHE_ENABLED = False
+    path = tmp_path / "ais.csv"
+    raw = generators.generate_ais(20000, num_vessels=50, seed=1)
+    # 实时数据大致按时间排序, 同一船舶的报文分散在多个数据块中
+    raw.sort_values('timestamp', kind='stable').to_csv(path, index=False)
+
+    processor = DataProcessor(config)
+    full = processor.preprocess_ais(pd.read_csv(path))
+    streamed = pd.concat(list(processor.stream_ais_data(str(path), chunk_size)))
+
+    key = ['mmsi', 'timestamp']
+    full = full.sort_values(key).reset_index(drop=True)
+    streamed = streamed.sort_values(key).reset_index(drop=True)
+    pd.testing.assert_frame_equal(streamed, full, check_exact=False, rtol=1e-12)
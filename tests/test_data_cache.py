@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config.settings import Config
+from modules.data_cache import DataCache
+from modules.data_processing import DataProcessor
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = Config()
+    config.CACHE_DIR = str(tmp_path / "cache") + "/"
+    config.DATA_PATH = str(tmp_path) + "/"
+    return config
+
+
+def test_round_trip_keeps_nulls_dtypes_and_index(config):
+    cache = DataCache(config)
+    df = pd.DataFrame({
+        'mmsi': ['A', None, 'C', np.nan],
+        'text': pd.array(['a', None, 'c', 'd'], dtype='string'),
+        'kind': pd.Categorical(['x', 'y', 'x', None]),
+        'count': pd.array([1, None, 3, 4], dtype='Int64'),
+        'value': [1.0, np.nan, 3.0, 4.0],
+        'timestamp': pd.to_datetime(['2024-01-01', None, '2024-01-03', '2024-01-04']),
+    }, index=[7, 3, 9, 1])
+
+    cache.store("t", df)
+    loaded = cache.load("t")
+    pd.testing.assert_frame_equal(loaded, df)
+    assert loaded['mmsi'].isna().tolist() == [False, True, False, True]
+
+
+def test_unsupported_objects_are_not_cached(config):
+    cache = DataCache(config)
+    assert not cache.store("x", pd.DataFrame({'mixed': [1, 'x', None, 2.5]}))
+    assert cache.load("x") is None
+
+
+def test_corrupt_entry_is_a_miss(config):
+    cache = DataCache(config)
+    cache.store("c", pd.DataFrame({'mmsi': ['A', 'B'], 'value': [1.0, 2.0]}))
+    # 篡改为需要 pickle 的对象数组: 不会被反序列化, 视为未命中
+    np.save(config.CACHE_DIR + "c/0.npy", np.array([{'a': 1}, None], dtype=object), allow_pickle=True)
+    assert cache.load("c") is None
+
+
+def test_round_trip_multiindex(config):
+    cache = DataCache(config)
+    df = pd.DataFrame({'v': [1.0, 2.0]},
+                      index=pd.MultiIndex.from_tuples([('a', 1), ('b', 2)], names=['k', 'n']))
+    cache.store("m", df)
+    pd.testing.assert_frame_equal(cache.load("m"), df)
+
+
+def test_round_trip_ordered_category_and_string_index(config):
+    cache = DataCache(config)
+    df = pd.DataFrame({'grade': pd.Categorical([3, 1, None], categories=[3, 2, 1], ordered=True),
+                       'flag': pd.array([True, None, False], dtype='boolean')},
+                      index=pd.Index(['x', 'y', None], name='id'))
+    cache.store("m", df)
+    pd.testing.assert_frame_equal(cache.load("m"), df)
+
+
+def test_warm_ais_load_matches_cold(config):
+    rng = np.random.default_rng(0)
+    n = 200
+    pd.DataFrame({
+        'mmsi': rng.choice(['Vessel_1', 'Vessel_2', 'Vessel_3'], n),
+        'timestamp': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 36000, n), unit='s'),
+        'latitude': rng.uniform(10, 50, n),
+        'longitude': rng.uniform(130, 160, n),
+    }).to_csv(config.DATA_PATH + "sample_ais_data.csv", index=False)
+
+    cold = DataProcessor(config).load_ais_data()
+    assert [entry for entry in os.listdir(config.CACHE_DIR) if entry.startswith("ais-")]
+    warm = DataProcessor(config).load_ais_data()
+    pd.testing.assert_frame_equal(warm, cold, check_freq=False)
+
+
+def test_preprocess_config_changes_cache_key(config, monkeypatch):
+    processor = DataProcessor(config)
+    monkeypatch.setattr(DataProcessor, "PREPROCESS_CONFIG", {"ais": ("MAX_DISTANCE",)})
+    before = processor.preprocess_params("ais")
+    config.MAX_DISTANCE += 1
+    assert processor.preprocess_params("ais") != before
@@ -0,0 +1,52 @@
+import numpy as np
+
+from config.settings import Config
+from modules.density import DensityLayer
+
+
+def boundary_points(layer, count, seed=0):
+    """落在各分辨率网格线 (即瓦片边界候选) 上的点"""
+    rng = np.random.default_rng(seed)
+    lat_lines = np.concatenate([level["lat_edges"] for level in layer.levels]
+                               + [layer.lat_min + np.arange(200) * 0.05 * layer.tile_cells / 4])
+    lon_lines = np.concatenate([level["lon_edges"] for level in layer.levels]
+                               + [layer.lon_min + np.arange(200) * 0.05 * layer.tile_cells / 4])
+    return rng.choice(lat_lines, count), rng.choice(lon_lines, count), rng.uniform(0.5, 2.0, count)
+
+
+def random_points(layer, count, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(layer.lat_min, layer.lat_max, count), rng.uniform(layer.lon_min, layer.lon_max, count),
+            rng.uniform(0.5, 2.0, count))
+
+
+def sorted_points(points):
+    return points[np.lexsort(points.T[::-1])]
+
+
+def test_counts_match_histogram():
+    layer = DensityLayer(Config())
+    lat, lon, weights = (np.concatenate(parts) for parts in zip(boundary_points(layer, 3000),
+                                                                 random_points(layer, 3000)))
+    layer.update(lat, lon, weights)
+    for level in layer.levels:
+        expected, _, _ = np.histogram2d(lat, lon, bins=[level["lat_edges"], level["lon_edges"]], weights=weights)
+        np.testing.assert_allclose(level["counts"], expected)
+
+
+def test_incremental_render_matches_full_recompute():
+    config = Config()
+    incremental = DensityLayer(config)
+    batches = [random_points(incremental, 500, seed) for seed in range(4)]
+    # 之后每批只有少量边界点, 失效瓦片算错时已渲染的瓦片会保持过期
+    batches += [boundary_points(incremental, 3, seed) for seed in range(300)]
+    for lat, lon, weights in batches:
+        incremental.update(lat, lon, weights)
+        for index in range(len(incremental.levels)):
+            incremental.heat_points(index)
+
+    full = DensityLayer(config)
+    full.update(*(np.concatenate(parts) for parts in zip(*batches)))
+    for index in range(len(full.levels)):
+        np.testing.assert_allclose(sorted_points(incremental.heat_points(index)),
+                                   sorted_points(full.heat_points(index)))
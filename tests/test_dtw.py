@@ -0,0 +1,90 @@
+import math
+
+import numpy as np
+import pytest
+
+from config.settings import Config
+from modules.dtw import DTWEngine
+
+
+def naive_dtw(engine, points1, points2, lo=None, hi=None):
+    """逐单元动态规划; 给定 lo/hi 时只允许带宽内的单元"""
+    a, b = engine.prepare(points1), engine.prepare(points2)
+    n, m = len(a[0]), len(b[0])
+    d = np.full((n + 1, m + 1), math.inf)
+    d[0, 0] = 0.0
+    for i in range(n):
+        for j in range(m):
+            if lo is not None and not lo[i] <= j < hi[i]:
+                continue
+            cost = engine._haversine(a[0][i], a[1][i], b[0][j], b[1][j])
+            d[i + 1, j + 1] = cost + min(d[i, j], d[i, j + 1], d[i + 1, j])
+    return float(d[n, m])
+
+
+def random_track(rng, length):
+    return np.column_stack([30 + np.cumsum(rng.normal(0, 0.01, length)),
+                            140 + np.cumsum(rng.normal(0, 0.01, length))])
+
+
+@pytest.fixture
+def engine():
+    return DTWEngine(Config())
+
+
+def test_banded_matches_naive_banded(engine):
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        n, m = rng.integers(1, 41, 2)
+        a, b = random_track(rng, n), random_track(rng, m)
+        lo, hi = engine.band(n, m)
+        expected = naive_dtw(engine, a, b, lo, hi)
+        assert math.isfinite(expected)
+        assert engine.distance(a, b) == pytest.approx(expected, rel=1e-9)
+
+
+@pytest.mark.parametrize("n, m", [(1, 1), (1, 24), (24, 1), (2, 30), (30, 2), (3, 40)])
+def test_lopsided_lengths_are_finite(engine, n, m):
+    rng = np.random.default_rng(n * 100 + m)
+    a, b = random_track(rng, n), random_track(rng, m)
+    distance = engine.distance(a, b)
+    assert math.isfinite(distance)
+    assert distance >= naive_dtw(engine, a, b) * (1 - 1e-9)
+
+
+def test_full_band_equals_unconstrained(engine):
+    engine.band_ratio = 1.0
+    rng = np.random.default_rng(1)
+    for n, m in [(5, 7), (2, 30), (17, 3)]:
+        a, b = random_track(rng, n), random_track(rng, m)
+        assert engine.distance(a, b) == pytest.approx(naive_dtw(engine, a, b), rel=1e-9)
+
+
+def test_early_abandon_and_many(engine):
+    rng = np.random.default_rng(2)
+    query = random_track(rng, 20)
+    candidates = [random_track(rng, k) for k in (1, 5, 20, 35)]
+    exact = [engine.distance(query, c) for c in candidates]
+    np.testing.assert_allclose(engine.distance_many(query, candidates), exact, rtol=1e-9)
+
+    limit = min(exact) * 0.5
+    assert all(engine.distance(query, c, limit) == math.inf for c in candidates)
+
+
+def test_lower_bound_across_dateline(engine):
+    a = np.array([(0, 179.9)] * 3)
+    b = np.array([(0, -179.9), (0, -150), (0, -100)])
+    exact = naive_dtw(engine, a, b, *engine.band(3, 3))
+    assert engine.lb_keogh(engine.prepare(a), engine.prepare(b), *engine.band(3, 3)) <= exact
+    assert engine.distance(a, b) == pytest.approx(exact, rel=1e-9)
+    assert engine.distance(a, b, exact * 1.01) == pytest.approx(exact, rel=1e-9)
+
+
+def test_lower_bound_holds_near_dateline(engine):
+    rng = np.random.default_rng(3)
+    for _ in range(200):
+        n, m = rng.integers(2, 20, 2)
+        a = np.column_stack([rng.uniform(-60, 60, n), rng.choice([-1, 1], n) * rng.uniform(150, 180, n)])
+        b = np.column_stack([rng.uniform(-60, 60, m), rng.choice([-1, 1], m) * rng.uniform(150, 180, m)])
+        lo, hi = engine.band(n, m)
+        assert engine.lb_keogh(engine.prepare(a), engine.prepare(b), lo, hi) <= naive_dtw(engine, a, b, lo, hi)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from modules.graph_store import GraphStore
+
+
+def edge_frame():
+    return pd.DataFrame({
+        'source': ['v1', 'v2', 'v1', 'v3', 'v1'],
+        'type': ['visits', 'visits', 'near', 'visits', 'visits'],
+        'target': ['p1', 'p1', 'v2', 'p2', 'p1'],
+        # 重复的 v1-visits-p1 以最后一行为准
+        'count': [1, 2, 3, 4, 5],
+        'distance': [0.5, 1.5, np.nan, 2.5, 0.7],
+    })
+
+
+def seeded_store():
+    store = GraphStore()
+    # 已存在的边: 属性被覆盖或保留
+    store.upsert_edge('v3', 'visits', 'p2', {'count': 0, 'label': 'old'})
+    return store
+
+
+def test_bulk_edges_match_per_edge_upserts():
+    frame = edge_frame()
+    bulk = seeded_store()
+    bulk.bulk_upsert_edges(frame)
+
+    single = seeded_store()
+    for record in frame.to_dict('records'):
+        properties = {k: v for k, v in record.items() if k not in ('source', 'type', 'target')}
+        single.upsert_edge(record['source'], record['type'], record['target'], properties)
+
+    # 属性中含 NaN, 按表格比较
+    relationships = [pd.DataFrame.from_dict(store.to_dict()['relationships'], orient='index')
+                     for store in (bulk, single)]
+    pd.testing.assert_frame_equal(*relationships)
+    for rel_type in ('visits', 'near'):
+        assert bulk.edges_of_type(rel_type) == single.edges_of_type(rel_type)
+    relationship = bulk.to_dict()['relationships']['v1-visits-p1']
+    assert relationship['count'] == 5 and relationship['distance'] == 0.7
+    assert bulk.to_dict()['relationships']['v3-visits-p2']['label'] == 'old'
+
+
+def test_bulk_edges_without_properties_keep_existing():
+    store = seeded_store()
+    store.bulk_upsert_edges(edge_frame()[['source', 'type', 'target']])
+    assert store.to_dict()['relationships']['v3-visits-p2']['label'] == 'old'
+    assert store.to_dict()['relationships']['v3-visits-p2']['count'] == 0
+    assert store.edge_count == 4
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from benchmarks import generators
+from config.settings import Config
+from modules.data_processing import DataProcessor
+from modules.incremental_mining import IncrementalMiner
+
+
+@pytest.fixture
+def ais():
+    config = Config()
+    config.CACHE_ENABLED = False
+    return DataProcessor(config).preprocess_ais(generators.generate_ais(1500, num_vessels=20, seed=5))
+
+
+def reference_update(miner, df):
+    """逐条学习、逐条预测的参考实现"""
+    features = np.nan_to_num(miner.feature_pipeline.transform_many(df))
+    clusters, scores = [], []
+    for row in features.tolist():
+        x = dict(zip(miner.feature_pipeline.feature_names, row))
+        scores.append(miner.anomaly_model.score_one(x))
+        miner.anomaly_model.learn_one(x)
+        miner.cluster_model.learn_one(x)
+        clusters.append(miner.cluster_model.predict_one(x))
+    return np.array(clusters), np.array(scores)
+
+
+def split(df, parts):
+    return [df.iloc[chunk] for chunk in np.array_split(np.arange(len(df)), parts)]
+
+
+def make_miner(batch=None, stride=None, height=None):
+    config = Config()
+    if height is not None:
+        config.ANOMALY_TREE_HEIGHT = height
+    if batch is not None:
+        config.CLUSTER_PREDICT_BATCH = batch
+    if stride is not None:
+        config.ANOMALY_LEARN_STRIDE = stride
+    return IncrementalMiner(config)
+
+
+def test_default_settings_match_reference(ais):
+    expected = reference_update(make_miner(), ais)
+    miner = make_miner()
+    actual = [miner.update_many(batch) for batch in split(ais, 3)]
+    np.testing.assert_array_equal(np.concatenate([a[0] for a in actual]), expected[0])
+    np.testing.assert_allclose(np.concatenate([a[1] for a in actual]), expected[1])
+
+
+def test_batched_prediction_keeps_scores(ais):
+    _, expected = make_miner(1, height=10).update_many(ais)
+    clusters, scores = make_miner(100, height=10).update_many(ais)
+    np.testing.assert_allclose(scores, expected)
+    assert len(clusters) == len(ais)
+
+
+def test_learn_stride_continues_across_batches(ais):
+    whole = make_miner(1, stride=7, height=10).update_many(ais)[1]
+    miner = make_miner(1, stride=7, height=10)
+    scores = np.concatenate([miner.update_many(batch)[1] for batch in split(ais, 4)])
+    np.testing.assert_allclose(scores, whole)
+    assert miner.rows_seen == len(ais)
@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from modules.instrumentation import count_records
+
+
+def test_import_main_does_not_load_pandas():
+    code = "import sys, main; print('pandas' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_count_records():
+    df = pd.DataFrame({"a": range(5)})
+    assert count_records(df) == 5
+    assert count_records({"ais": df, "cluster_ids": np.zeros(5), "anomalies": 2}) == 5
+    assert count_records(np.zeros(3)) == 3
+    assert count_records("text") == 0
+    # 变更摘要等容器的长度不是记录数
+    assert count_records({"changes": {"nodes": 10, "edges": 4, "version": 1}}) == 0
+    assert count_records([1, 2, 3]) == 0
+
+
+def test_count_records_trajectory_store():
+    from modules.trajectory_store import TrajectoryStore
+    ais = pd.DataFrame({"mmsi": [1, 1, 2], "latitude": [30.0, 30.1, 31.0], "longitude": [140.0, 140.1, 141.0],
+                        "timestamp": pd.date_range("2024-01-01", periods=3, freq="min"),
+                        "direction": [0.0, 10.0, 20.0]})
+    assert count_records({"trajectory_store": TrajectoryStore.from_ais(ais)}) == 3
+
+
+def test_import_without_resource_module():
+    code = ("import sys; sys.modules['resource'] = None; sys.modules['psutil'] = None; "
+            "from modules.instrumentation import peak_rss_bytes; print(peak_rss_bytes())")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "0"
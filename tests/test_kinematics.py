@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from modules import kinematics
+from modules.data_processing import DataProcessor
+from config.settings import Config
+
+
+def raw_ais(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'mmsi': rng.choice(['Vessel_0', 'Vessel_1', 'Vessel_2', 'Vessel_3'], n),
+        'timestamp': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 3600, n), unit='s'),
+        'latitude': rng.uniform(10, 50, n),
+        'longitude': rng.uniform(130, 160, n),
+    })
+    # 重复时间戳 (time_diff 为 0) 与纬度不变的点 (正东/正西方向)
+    df.loc[1::7, 'timestamp'] = df.loc[0::7, 'timestamp'].to_numpy()[:len(df.loc[1::7])]
+    df.loc[2::5, 'latitude'] = df.loc[3::5, 'latitude'].to_numpy()[:len(df.loc[2::5])]
+    return df
+
+
+def test_vectorized_matches_row_wise():
+    df = raw_ais()
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    df = df.sort_values(['mmsi', 'timestamp'])
+    df = kinematics.add_previous_fix(df)
+
+    vectorized = kinematics.compute_kinematics(df.copy())
+    legacy = kinematics.legacy_kinematics(df.copy())
+    for column in ['distance', 'time_diff', 'speed', 'direction']:
+        np.testing.assert_allclose(vectorized[column].to_numpy(dtype=float),
+                                   legacy[column].to_numpy(dtype=float),
+                                   rtol=1e-9, atol=1e-6, err_msg=column)
+
+
+def test_preprocess_ais_columns():
+    config = Config()
+    config.CACHE_ENABLED = False
+    result = DataProcessor(config).preprocess_ais(raw_ais())
+    assert {'distance', 'time_diff', 'speed', 'direction'} <= set(result.columns)
+    assert not {'prev_lat', 'prev_lon', 'prev_time'} & set(result.columns)
+    assert (result['speed'] >= 0).all()
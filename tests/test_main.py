@@ -0,0 +1,24 @@
+import main
+
+
+def test_profiles_sharing_storage_run_in_sequence():
+    groups = main.storage_groups(["marine_bio", "fishery_monitoring", "knowledge_evolution", "iot_stream"])
+    assert ["marine_bio", "knowledge_evolution"] in groups
+    assert ["fishery_monitoring"] in groups and ["iot_stream"] in groups
+
+
+def test_separate_storage_runs_in_parallel(monkeypatch):
+    original = main.profile_config
+
+    def isolated(name):
+        config = original(name)
+        config.KG_STORAGE_DIR = f"storage/{name}/knowledge_graph/"
+        return config
+
+    monkeypatch.setattr(main, "profile_config", isolated)
+    assert main.storage_groups(["marine_bio", "knowledge_evolution"]) == [["marine_bio"], ["knowledge_evolution"]]
+
+
+def test_groups_keep_profile_order():
+    groups = main.storage_groups(["routing_optimization", "predictive_maintenance", "routing_optimization"])
+    assert groups == [["routing_optimization", "routing_optimization"], ["predictive_maintenance"]]
@@ -0,0 +1,61 @@
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+
+from config.settings import Config
+from modules.pattern_mining import SlidingWindowPatternMiner
+
+ITEMS = ['a', 'b', 'c', 'd', 'e', 'f']
+
+
+def random_transactions(count, seed):
+    rng = np.random.default_rng(seed)
+    # 偏斜的项分布, 使不同长度的项集都能达到最小支持度
+    weights = np.array([8, 6, 4, 3, 2, 1], dtype=float)
+    return [tuple(rng.choice(ITEMS, size=rng.integers(1, 5), replace=False, p=weights / weights.sum()))
+            for _ in range(count)]
+
+
+def brute_force(window, min_support, max_length=None):
+    """枚举每条事务的全部子集计数"""
+    counts = Counter()
+    for transaction in window:
+        items = sorted(transaction)
+        for length in range(1, len(items) + 1):
+            if max_length is not None and length > max_length:
+                break
+            counts.update(combinations(items, length))
+    min_count = max(1, int(np.ceil(min_support * len(window))))
+    return {itemset: count / len(window) for itemset, count in counts.items() if count >= min_count}
+
+
+def make_miner(window_size=40, slide_size=7, min_support=0.1):
+    config = Config()
+    config.WINDOW_SIZE = window_size
+    config.SLIDE_SIZE = slide_size
+    config.MIN_SUPPORT = min_support
+    return SlidingWindowPatternMiner(config)
+
+
+def test_itemsets_match_brute_force():
+    miner = make_miner(window_size=1000)
+    transactions = random_transactions(200, seed=0)
+    miner.slide(transactions)
+    assert miner.frequent_itemsets() == brute_force(transactions, 0.1)
+    assert miner.frequent_itemsets(max_length=2) == brute_force(transactions, 0.1, max_length=2)
+
+
+def test_itemsets_match_brute_force_after_incremental_slides():
+    miner = make_miner()
+    transactions = random_transactions(300, seed=1)
+    added = 0
+    for batch in np.array_split(np.arange(len(transactions)), 13):
+        miner.add_transactions([transactions[i] for i in batch])
+        added = batch[-1] + 1
+        # 窗口为最近 WINDOW_SIZE 条已滑入的事务, 尚未凑满一次滑动的留在 pending 中
+        slid = added - len(miner.pending)
+        window = transactions[max(0, slid - 40):slid]
+        assert list(miner.window) == window
+        assert miner.frequent_itemsets() == brute_force(window, 0.1)
+    assert added == len(transactions)
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from config.settings import Config
+from modules.predictive_maintenance import PredictiveMaintenance
+
+
+def sensor_frame(timestamps, value):
+    rows = [(ts, f"Vessel_{v}", component, value(ts))
+            for ts in timestamps for v in range(3) for component in ("engine", "hull")]
+    return pd.DataFrame(rows, columns=["timestamp", "vessel_id", "component", "value"])
+
+
+def daily_cycle(ts):
+    return 0.5 + 0.3 * np.sin(2 * np.pi * ts.hour / 24)
+
+
+@pytest.fixture
+def module():
+    return PredictiveMaintenance(Config())
+
+
+def test_missing_and_duplicate_ticks_keep_season_aligned():
+    hours = pd.date_range("2024-01-01", periods=24 * 10, freq="h")
+    reference = PredictiveMaintenance(Config()).predict_fleet(sensor_frame(hours, daily_cycle))
+
+    # 缺失两个时刻, 另有一条同一小时内的重复读数: 按读数条数计时刻会使季节错位一格
+    gapped = hours.delete([100, 101]).append(
+        pd.DatetimeIndex([hours[150] + pd.Timedelta(minutes=30)])).sort_values()
+    result = PredictiveMaintenance(Config()).predict_fleet(sensor_frame(gapped, daily_cycle))
+
+    for component in ("engine", "hull"):
+        np.testing.assert_allclose(list(result["predictions"][component].values()),
+                                   list(reference["predictions"][component].values()), atol=0.02)
+
+
+def test_warnings_only_on_state_change(module):
+    hours = pd.date_range("2024-01-01", periods=48, freq="h")
+    high = module.predict_fleet(sensor_frame(hours, lambda ts: 0.95))
+    # 第一个时刻只做初始化, 之后每个位置只在进入告警状态时告警一次
+    assert len(high["warnings"]) == 6
+    assert {w["timestamp"] for w in high["warnings"]} == {hours[1]}
+
+    low = module.predict_fleet(sensor_frame(hours + pd.Timedelta(days=2), lambda ts: 0.2))
+    assert low["warnings"] == []
+    again = module.predict_fleet(sensor_frame(hours + pd.Timedelta(days=4), lambda ts: 0.95))
+    assert len(again["warnings"]) == 6
@@ -0,0 +1,38 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from config.settings import Config
+from modules.reinforcement_learning import RoutingOptimizer
+
+
+@pytest.fixture
+def config(tmp_path):
+    config = Config()
+    config.RL_POLICY_PATH = str(tmp_path / "policy.npz")
+    config.RL_CEM_ITERATIONS = 2
+    config.RL_CEM_POPULATION = 32
+    return config
+
+
+def test_process_without_policy_uses_baseline(config, monkeypatch):
+    def fail(self, seed=0):
+        raise AssertionError("process() must not train the policy")
+
+    monkeypatch.setattr(RoutingOptimizer, "train", fail)
+    result = RoutingOptimizer(config).process({})
+    assert result["optimized_route"]
+    assert result["planned_routes"] == []
+    assert not os.path.exists(config.RL_POLICY_PATH)
+
+
+def test_train_from_worker_thread_then_reload(config):
+    config.RL_WORKERS = 2
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        history = pool.submit(RoutingOptimizer(config).train).result()
+    assert len(history) == config.RL_CEM_ITERATIONS
+
+    optimizer = RoutingOptimizer(config)
+    assert optimizer.policy is not None
+    assert optimizer.optimize_route()[0]
@@ -0,0 +1,37 @@
+import pytest
+
+from config.settings import Config
+from modules.route_planner import CostField
+
+
+@pytest.fixture
+def field():
+    return CostField(Config())
+
+
+def test_cell_maps_positions_inside_bounds(field):
+    assert field.cell(field.lat_min, field.lon_min) == (0, 0)
+    assert field.cell(field.lat_min + 0.3, field.lon_min + 0.6) == (1, 2)
+    assert field.cell(field.lat_max - 1e-9, field.lon_max - 1e-9) == (field.rows - 1, field.cols - 1)
+
+
+@pytest.mark.parametrize("lat, lon", [(9.9, 140.0), (30.0, 129.9), (9.9, 129.9), (50.0, 140.0), (30.0, 160.0)])
+def test_cell_rejects_positions_outside_bounds(field, lat, lon):
+    with pytest.raises(ValueError):
+        field.cell(lat, lon)
+
+
+def test_ports_outside_bounds_do_not_abort_planning(tmp_path):
+    from modules.reinforcement_learning import RoutingOptimizer
+
+    config = Config()
+    config.RL_POLICY_PATH = str(tmp_path / "policy.npz")
+    ports = [{"name": "A", "lat": 30.0, "lon": 140.0}, {"name": "B", "lat": 31.0, "lon": 141.0},
+             {"name": "Outside", "lat": 5.0, "lon": 140.0}, {"name": "C", "lat": 32.0, "lon": 142.0}]
+    routes = RoutingOptimizer(config).plan_routes({"ports": {"ports": ports}})
+
+    assert [(r["origin"], r["destination"]) for r in routes] == [("A", "B"), ("B", "Outside"), ("Outside", "C")]
+    assert routes[0]["path"] and routes[0]["hours"] > 0
+    for route in routes[1:]:
+        assert route["path"] is None and route["hours"] is None
+        assert "MAP_BOUNDS" in route["reason"]
@@ -0,0 +1,30 @@
+from config.research_profiles import MODULE_CLASSES
+from config.settings import Config
+from modules.lazy import LazyModule, class_declarations
+from modules.scheduler import ModuleScheduler
+
+NAMES = ["incremental_mining", "trajectory_association", "knowledge_graph", "predictive_maintenance"]
+
+
+def lazy_modules(config):
+    return [(name, LazyModule(name, MODULE_CLASSES[name], config)) for name in NAMES]
+
+
+def test_build_graph_does_not_load_lazy_modules():
+    config = Config()
+    modules = lazy_modules(config)
+    scheduler = ModuleScheduler(config, modules)
+    graph = scheduler.build_graph()
+    scheduler._inputs(modules[0][1], {"ais": None, "weather": None})
+    assert not any(module.loaded for _, module in modules)
+
+    loaded = [(name, module.load()) for name, module in lazy_modules(config)]
+    assert graph == ModuleScheduler(config, loaded).build_graph()
+    assert graph["trajectory_association"] == set()
+
+
+def test_declarations_match_classes():
+    for name, module in lazy_modules(Config()):
+        instance = module.load()
+        assert class_declarations(name, MODULE_CLASSES[name]) == {"READS": instance.READS, "WRITES": instance.WRITES}
+        assert (module.READS, module.WRITES) == (instance.READS, instance.WRITES)
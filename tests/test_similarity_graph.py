@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from config.settings import Config
+from modules.trajectory_association import TrajectoryAssociator
+
+
+def make_trajectory(points):
+    points = np.asarray(points, dtype=np.float64)
+    delta = np.diff(points, axis=0, prepend=points[:1])
+    return {
+        'points': points,
+        'timestamps': (pd.Timestamp('2024-01-01') + pd.to_timedelta(np.arange(len(points)) * 60, unit='s')).to_numpy(),
+        'directions': np.degrees(np.arctan2(delta[:, 1], delta[:, 0])) % 360
+    }
+
+
+def test_cache_invalidated_when_trajectory_changes():
+    config = Config()
+    config.SIMILARITY_WORKERS = 1
+    associator = TrajectoryAssociator(config)
+
+    line = np.column_stack([30 + np.arange(20) * 0.01, 140 + np.arange(20) * 0.01])
+    zigzag = line + np.column_stack([np.zeros(20), np.where(np.arange(20) % 2, 0.05, -0.05)])
+
+    first = {'A': make_trajectory(line), 'B': make_trajectory(line)}
+    assert associator.associate_trajectories(first, parallel=True) == [['A', 'B']]
+
+    changed = {'A': make_trajectory(line), 'B': make_trajectory(zigzag)}
+    expected = TrajectoryAssociator(config).associate_trajectories(changed, parallel=True)
+    assert expected == [['A'], ['B']]
+    assert associator.associate_trajectories(changed, parallel=True) == expected
+
+
+def test_cache_reused_for_unchanged_trajectories():
+    config = Config()
+    config.SIMILARITY_WORKERS = 1
+    associator = TrajectoryAssociator(config)
+    line = np.column_stack([30 + np.arange(20) * 0.01, 140 + np.arange(20) * 0.01])
+    trajectories = {'A': make_trajectory(line), 'B': make_trajectory(line + 0.001)}
+
+    associator.associate_trajectories(trajectories, parallel=True)
+    cached = dict(associator.similarity.cache.scores)
+    assert cached
+    associator.associate_trajectories(trajectories, parallel=True)
+    assert associator.similarity.cache.scores == cached
+
+
+def test_parallel_pool_from_worker_thread():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from modules.process_pool import pool_context
+
+    config = Config()
+    config.SIMILARITY_WORKERS = 2
+    associator = TrajectoryAssociator(config)
+    line = np.column_stack([30 + np.arange(20) * 0.01, 140 + np.arange(20) * 0.01])
+    trajectories = {name: make_trajectory(line + offset) for name, offset in
+                    (('A', 0.0), ('B', 0.0005), ('C', 0.5), ('D', 0.5005))}
+
+    # 与调度器相同, 在线程池的工作线程中创建进程池
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        method = pool.submit(lambda: pool_context().get_start_method()).result()
+        clusters = pool.submit(associator.associate_trajectories, trajectories, parallel=True).result()
+    assert method != "fork"
+    assert clusters == associator.associate_trajectories(trajectories, use_index=False, parallel=False)
+    assert clusters == [['A', 'B'], ['C', 'D']]
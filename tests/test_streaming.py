@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+import pandas as pd
+
+from config.settings import Config
+from modules.streaming import StreamingRuntime
+
+
+class SlowModule:
+    """处理速度远低于数据源的模块, 记录处理过的批次编号"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.seen = []
+
+    def process(self, data):
+        time.sleep(self.delay)
+        self.seen.append(int(data["ais"]["batch"].iloc[0]))
+        return {"last_batch": self.seen[-1]}
+
+
+def make_runtime(queue_size, module):
+    config = Config()
+    config.STREAM_QUEUE_SIZE = queue_size
+    config.STREAM_REPORT_INTERVAL = 3600
+    return StreamingRuntime(config, [("slow", module)])
+
+
+async def counting_source(batches, produced):
+    for i in range(batches):
+        produced.append(i)
+        yield pd.DataFrame({"batch": [i, i]})
+
+
+def test_slow_consumer_bounds_queue_depth():
+    module = SlowModule(0.01)
+    runtime = make_runtime(2, module)
+    produced = []
+    leads = []
+
+    def sink(data):
+        # 数据源领先已处理批次的数量受队列容量约束
+        leads.append(len(produced) - len(module.seen))
+
+    runtime.sink_hooks.append(sink)
+    asyncio.run(runtime.run(counting_source(30, produced)))
+
+    stats = runtime.report()["stages"]["slow"]
+    assert stats["max_queue_depth"] <= 2
+    # 队列中的 2 批, 模块正在处理的 1 批, 以及数据源已产出但阻塞在 put 上的 1 批
+    assert max(leads) <= 2 + 2
+    assert module.seen == list(range(30))
+
+
+def test_end_marker_shuts_down_cleanly():
+    module = SlowModule(0)
+    runtime = make_runtime(4, module)
+    hooked = []
+    runtime.sink_hooks.append(lambda data: hooked.append(data["last_batch"]))
+
+    async def main():
+        results = await asyncio.wait_for(runtime.run(counting_source(10, [])), timeout=10)
+        # 各阶段任务与状态输出任务均已结束
+        pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        await asyncio.sleep(0)
+        return results, [task for task in pending if not task.done()]
+
+    results, pending = asyncio.run(main())
+    assert pending == []
+    assert results == {"last_batch": 9}
+    assert hooked == list(range(10))
+    report = runtime.report()
+    assert report["stages"]["slow"]["batches"] == 10
+    assert report["stages"]["slow"]["queue_depth"] == 0
+    assert report["latency"]["batches"] == 10
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks import generators
+from config.settings import Config
+from modules.trajectory_association import TrajectoryAssociator
+
+
+def route_trajectories(num_trajectories, num_routes, length=30, seed=0):
+    """围绕少量公共航线生成带小幅噪声与时间偏移的轨迹, 保证存在真实的匹配"""
+    rng = np.random.default_rng(seed)
+    routes = [group for _, group in generators.generate_ais(num_routes * length, num_routes, seed=seed)
+              .groupby('mmsi', sort=False) if len(group) >= 2]
+    trajectories = {}
+    for i in range(num_trajectories):
+        base = routes[i % len(routes)]
+        points = base[['latitude', 'longitude']].to_numpy() + rng.normal(0, 1e-4, (len(base), 2))
+        shift = pd.to_timedelta(int(rng.integers(0, 120)), unit='s')
+        delta = np.diff(points, axis=0, prepend=points[:1])
+        trajectories[f"T{i}"] = {
+            'points': points,
+            'timestamps': (base['timestamp'] + shift).to_numpy(),
+            'directions': np.degrees(np.arctan2(delta[:, 1], delta[:, 0])) % 360
+        }
+    return trajectories
+
+
+@pytest.fixture
+def associator():
+    return TrajectoryAssociator(Config())
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.8, 0.85])
+def test_indexed_matches_pairwise(associator, threshold):
+    associator.config.SIMILARITY_THRESHOLD = threshold
+    trajectories = route_trajectories(60, num_routes=6, seed=int(threshold * 10))
+
+    pairwise = associator.associate_trajectories(trajectories, use_index=False, parallel=False)
+    indexed = associator.associate_trajectories(trajectories, use_index=True, parallel=False)
+    assert indexed == pairwise
+    assert any(len(cluster) > 1 for cluster in pairwise)
+
+
+def test_parallel_graph_matches_pairwise(associator):
+    associator.config.SIMILARITY_WORKERS = 1
+    trajectories = route_trajectories(40, num_routes=5, seed=3)
+
+    pairwise = associator.associate_trajectories(trajectories, use_index=False, parallel=False)
+    assert associator.associate_trajectories(trajectories, parallel=True) == pairwise
+
+
+def test_single_fix_trajectories(associator):
+    trajectories = route_trajectories(10, num_routes=2, seed=4)
+    for traj_id in list(trajectories)[:3]:
+        trajectories[traj_id] = {key: values[:1] for key, values in trajectories[traj_id].items()}
+
+    pairwise = associator.associate_trajectories(trajectories, use_index=False, parallel=False)
+    assert associator.associate_trajectories(trajectories, use_index=True, parallel=False) == pairwise
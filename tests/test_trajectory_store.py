@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks import generators
+from config.settings import Config
+from modules.data_processing import DataProcessor
+from modules.incremental_mining import FeatureAggregator
+from modules.trajectory_association import TrajectoryAssociator
+from modules.trajectory_store import TrajectoryStore
+
+
+@pytest.fixture
+def ais():
+    config = Config()
+    config.CACHE_ENABLED = False
+    return DataProcessor(config).preprocess_ais(generators.generate_ais(6000, num_vessels=40, seed=2))
+
+
+def dict_trajectories(df):
+    return {
+        mmsi: {
+            'points': group[['latitude', 'longitude']].to_numpy(),
+            'timestamps': group['timestamp'].to_numpy(),
+            'directions': group['direction'].to_numpy()
+        }
+        for mmsi, group in df.groupby('mmsi', sort=False)
+    }
+
+
+def test_views_match_groupby_and_share_memory(ais):
+    store = TrajectoryStore.from_ais(ais)
+    expected = dict_trajectories(ais)
+    assert list(store) == list(expected)
+    assert store.order is None
+
+    for mmsi, traj in expected.items():
+        view = store[mmsi]
+        np.testing.assert_array_equal(view['points'], traj['points'])
+        np.testing.assert_array_equal(view['timestamps'], traj['timestamps'].astype('datetime64[s]').astype(np.int64))
+        np.testing.assert_allclose(view['directions'], traj['directions'], rtol=1e-6)
+        assert np.shares_memory(view['points'], store.coords)
+        assert np.shares_memory(view['timestamps'], store.times)
+
+
+def test_unsorted_input_keeps_per_vessel_order(ais):
+    shuffled = ais.sample(frac=1, random_state=0)
+    store = TrajectoryStore.from_ais(shuffled)
+    assert store.order is not None
+    for mmsi, group in shuffled.groupby('mmsi', sort=False):
+        np.testing.assert_array_equal(store[mmsi]['points'], group[['latitude', 'longitude']].to_numpy())
+
+
+def test_memory_per_point(ais):
+    assert TrajectoryStore.from_ais(ais).bytes_per_point < 30
+    assert TrajectoryStore.from_ais(ais, 'float32').bytes_per_point < 22
+
+
+@pytest.mark.parametrize("use_index", [True, False])
+def test_association_matches_dict_trajectories(ais, use_index):
+    associator = TrajectoryAssociator(Config())
+    trajectories = dict_trajectories(ais)
+    store = TrajectoryStore.from_ais(ais)
+    assert (associator.associate_trajectories(store, use_index=use_index, parallel=False)
+            == associator.associate_trajectories(trajectories, use_index=use_index, parallel=False))
+
+    ids = list(trajectories)[:10]
+    for a, b in zip(ids[:-1], ids[1:]):
+        assert associator.calculate_similarity(store[a], store[b]) == pytest.approx(
+            associator.calculate_similarity(trajectories[a], trajectories[b]), rel=1e-6)
+
+
+def reference_features(aggregator, batches):
+    """按 MMSI 分组的滚动聚合 (groupby().rolling() 参考实现), 跨批次连续"""
+    scaled = np.vstack([aggregator.scale_many(b[aggregator.COLUMNS].to_numpy(dtype=np.float64)) for b in batches])
+    frame = pd.DataFrame(scaled, columns=aggregator.COLUMNS)
+    frame.insert(0, 'mmsi', np.concatenate([b['mmsi'].to_numpy() for b in batches]))
+    rolling = frame.groupby('mmsi', sort=False)[aggregator.COLUMNS].rolling(aggregator.window_size, min_periods=1)
+    return rolling.agg(aggregator.AGGREGATIONS).reset_index(level=0, drop=True).sort_index().to_numpy()
+
+
+def test_miner_features_match_groupby_rolling(ais):
+    batches = [ais.iloc[chunk] for chunk in np.array_split(np.arange(len(ais)), 5)]
+    batches[2] = batches[2].sample(frac=1, random_state=1)
+
+    expected = reference_features(FeatureAggregator(window_size=20), batches)
+    aggregator = FeatureAggregator(window_size=20)
+    actual = np.vstack([
+        aggregator.transform_many(batch, TrajectoryStore.from_ais(batch) if k % 2 else None)
+        for k, batch in enumerate(batches)
+    ])
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-12)